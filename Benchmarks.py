@@ -0,0 +1,354 @@
+# Тесты производительности расчета сечений и элементов оболочек
+# Георгий Березин
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+import Materials as Mtr
+import Solution
+
+# Масштабированные синтетические задачи
+# Стержневые КЭ: (имя, nh, nb, количество стержней, количество комбинаций)
+FRAME_CASES = [
+    ('frame-s', 10, 8, 4, 100),
+    ('frame-m', 20, 16, 8, 500),
+    ('frame-l', 40, 32, 16, 1000),
+]
+# Элементы оболочек: (имя, количество слоев бетона, количество арматурных слоев, количество элементов,
+# количество комбинаций)
+SHELL_CASES = [
+    ('shell-s', 10, 4, 1, 50),
+    ('shell-m', 25, 4, 4, 50),
+    ('shell-l', 50, 8, 8, 100),
+]
+QUICK = ('frame-s', 'shell-s')  # Задачи быстрого режима
+CALC = 10  # Количество комбинаций для расчета одиночного элемента оболочки (Calc)
+KT = 0  # Коэффициент учета растяжения бетона
+GB3 = 1  # Коэффициент gb3 бетона
+V = 0.2  # Коэффициент Пуассона
+ACC = 1e-7  # Точность расчета
+
+
+def combos(m, rng):
+    """
+    Синтетические комбинации нагрузок: постоянная, временная и две ветровые нагрузки со случайными коэффициентами.
+
+    :param m: Количество комбинаций
+    :param rng: Генератор случайных чисел
+    :return: Словарь: имя комбинации -> коэффициенты нагрузок
+    """
+    gf = np.column_stack((rng.uniform(0.9, 1.35, m), rng.uniform(0.0, 1.5, m),
+                          rng.uniform(-1.5, 1.5, m), rng.uniform(-1.5, 1.5, m)))
+    return {f'C{i}': dict(zip(('D', 'L', 'Wx', 'Wy'), map(float, row))) for i, row in enumerate(gf)}
+
+
+def frame_section(concrete, steel, nh, nb, nbars, m, seed=0):
+    """
+    Синтетическое сечение стержневого КЭ 500x400 мм, бетон B30, арматура A500 по периметру.
+
+    :param concrete: Данные по бетону
+    :param steel: Данные по стали
+    :param nh: Количество КЭ бетона по высоте сечения
+    :param nb: Количество КЭ бетона по ширине сечения
+    :param nbars: Количество стержней
+    :param m: Количество комбинаций нагрузок
+    :param seed: Начальное значение генератора случайных чисел
+    :return: Поперечное сечение (FrameSec)
+    """
+    from MemberSection.RConSect import FrameSec
+
+    h, b, a = 500, 400, 40
+    rect = FrameSec(concrete, steel)
+    rect.add_rect_section('B30', h, b, nh, nb)
+    # Стержни равномерно по периметру ядра сечения
+    t = np.linspace(0, 1, nbars, endpoint=False)
+    per = 2 * (h + b - 4 * a)
+    s = t * per
+    for i, si in enumerate(s):
+        if si < h - 2 * a:
+            x, y = si - (h / 2 - a), -(b / 2 - a)
+        elif si < h + b - 4 * a:
+            x, y = h / 2 - a, si - (h - 2 * a) - (b / 2 - a)
+        elif si < 2 * h + b - 6 * a:
+            x, y = (h / 2 - a) - (si - (h + b - 4 * a)), b / 2 - a
+        else:
+            x, y = -(h / 2 - a), (b / 2 - a) - (si - (2 * h + b - 6 * a))
+        rect.add_rebar(str(i), 'A500', 25, round(x, 1), round(y, 1))
+    n0 = abs(concrete['B30']['Rb']) * b * h / 1000  # Несущая способность при осевом сжатии, кН
+    rect.add_load(-0.25 * n0, 0.02 * n0 * h / 1000, 0.015 * n0 * b / 1000, case='D')
+    rect.add_load(-0.1 * n0, 0.02 * n0 * h / 1000, 0.01 * n0 * b / 1000, case='L')
+    rect.add_load(0.0, 0.03 * n0 * h / 1000, 0.0, case='Wx')
+    rect.add_load(0.0, 0.0, 0.03 * n0 * b / 1000, case='Wy')
+    for name, factors in combos(m, np.random.default_rng(seed)).items():
+        rect.add_load_combo(name, factors=factors)
+    return rect
+
+
+def shell_element(concrete, steel, nh, nplies, m, ds=25, seed=0):
+    """
+    Синтетический элемент оболочки толщиной 300 мм, бетон B30, арматура A500 в направлениях 0, 90, 45, 135 градусов.
+
+    :param concrete: Данные по бетону
+    :param steel: Данные по стали
+    :param nh: Количество слоев бетона
+    :param nplies: Количество арматурных слоев
+    :param m: Количество комбинаций нагрузок
+    :param ds: Диаметр стержней, мм
+    :param seed: Начальное значение генератора случайных чисел
+    :return: Элемент оболочки (ShellElem)
+    """
+    from ShellElement.RConShell import ShellElem
+
+    h = 300
+    elem = ShellElem(concrete, steel)
+    elem.add_conc_element('B30', h, nh)
+    angles = (0, 90, 45, 135)
+    for i in range(nplies):
+        side = 1 if i % 2 == 0 else -1  # Верхние и нижние слои поочередно
+        row = i // 2  # Пара слоев одного направления
+        elem.add_ply(str(i), 'A500', ds, 5, side * (h / 2 - 40 - 25 * row), angles[row % 4])
+    n0 = abs(concrete['B30']['Rb']) * h  # Несущая способность при осевом сжатии, кН/м
+    m0 = abs(concrete['B30']['Rb']) * h ** 2 / 1000  # Характерный момент, кН*м/м
+    elem.add_load(-0.05 * n0, -0.03 * n0, 0.01 * n0, 0.02 * m0, 0.015 * m0, 0.005 * m0, case='D')
+    elem.add_load(-0.02 * n0, -0.02 * n0, 0.005 * n0, 0.01 * m0, 0.01 * m0, 0.002 * m0, case='L')
+    elem.add_load(0.0, 0.0, 0.02 * n0, 0.0, 0.0, 0.01 * m0, case='Wx')
+    elem.add_load(0.01 * n0, 0.0, 0.0, 0.01 * m0, 0.0, 0.0, case='Wy')
+    for name, factors in combos(m, np.random.default_rng(seed)).items():
+        elem.add_load_combo(name, factors=factors)
+    return elem
+
+
+def measure(stage, repeat=3):
+    """
+    Измерение этапа: лучшее время из repeat запусков и пиковая память отдельного запуска.
+
+    :param stage: Функция этапа stage() -> (количество задач, количество итераций, количество сошедшихся задач)
+    :param repeat: Количество запусков для измерения времени
+    :return: Словарь показателей: время [с], итерации, задачи, сошедшиеся задачи, пиковая память [МБ],
+        производительность [задач/с]
+    """
+    best = np.inf
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            n, it, ok = stage()
+            best = min(best, time.perf_counter() - t0)
+        tracemalloc.start()
+        try:
+            stage()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {'time': best, 'iterations': int(it), 'problems': int(n), 'converged': int(ok),
+            'peak_mb': peak / 2 ** 20, 'rate': n / best if best > 0 else np.inf}
+
+
+def frame_stages(concrete, steel, nh, nb, nbars, m):
+    """
+    Этапы расчета сечения стержневого КЭ.
+
+    :return: Список (имя этапа, функция этапа)
+    """
+    rect = frame_section(concrete, steel, nh, nb, nbars, m)
+    names = list(rect.loadcombos)
+    f = rect.forces(names)
+
+    def build():
+        frame_section(concrete, steel, nh, nb, nbars, m)
+        return 1, 0, 1
+
+    def forces():
+        rect.forces(names)
+        return m, 0, m
+
+    def solve(method, warm=False):
+        def stage():
+            if warm:
+                u, it = rect.continuation(f, KT, GB3, ACC, method)
+            else:
+                u, it = rect.iterate(f, KT, GB3, ACC, method)
+            return m, np.sum(it), np.count_nonzero(rect.status == Solution.CONVERGED)
+        return stage
+
+    return [('build', build), ('combos', forces), ('secant', solve('secant')), ('newton', solve('newton')),
+            ('warm', solve('secant', True))]
+
+
+def shell_stages(concrete, steel, nh, nplies, nelem, m):
+    """
+    Этапы расчета элементов оболочки.
+
+    :return: Список (имя этапа, функция этапа)
+    """
+    from ShellElement.Batch import Layup, ShellMesh
+
+    sizes = (12, 16, 20, 25, 28, 32)  # Диаметры стержней элементов: разные группы армирования
+    elems = [shell_element(concrete, steel, nh, nplies, m, sizes[i % len(sizes)], i) for i in range(nelem)]
+    names = list(elems[0].loadcombos)
+    mesh = ShellMesh()
+    for i, elem in enumerate(elems):
+        mesh.add_element(str(i), elem)
+        for name, fe in zip(names, elem.forces(names)):
+            mesh.add_forces(str(i), name, *(fe * 1000))
+    f = elems[0].forces(names)
+
+    def build():
+        for i in range(nelem):
+            shell_element(concrete, steel, nh, nplies, m, sizes[i % len(sizes)], i)
+        return nelem, 0, nelem
+
+    def forces():
+        for elem in elems:
+            elem.forces(names)
+        return nelem * m, 0, nelem * m
+
+    def calc():
+        it = ok = 0
+        for name in names[:CALC]:
+            c = elems[0].calculate(name, KT, GB3, V, ACC)
+            it += elems[0].trace.count[0]
+            ok += c.status == Solution.CONVERGED
+        return min(m, CALC), it, ok
+
+    def batch():
+        u, it, ok = Layup(elems[0], KT, GB3, V).solve(f, ACC)
+        return m, np.sum(it), np.count_nonzero(ok)
+
+    def analyze(warm=False):
+        def stage():
+            keys, u, it, ok = mesh.analyze(KT, GB3, V, ACC, warm=warm)
+            return len(keys), np.sum(it), np.count_nonzero(ok)
+        return stage
+
+    return [('build', build), ('combos', forces), ('calc', calc), ('batch', batch), ('mesh', analyze()),
+            ('warm', analyze(True))]
+
+
+def run(cases=None, repeat=3, db='materials.db'):
+    """
+    Выполнение тестов производительности.
+
+    :param cases: Имена задач (по умолчанию все)
+    :param repeat: Количество запусков этапа для измерения времени
+    :param db: Путь к базе данных материалов
+    :return: Словарь результатов: 'задача/этап' -> показатели
+    """
+    concrete, steel = Mtr.tables(db)
+    res = {}
+    for name, *params in FRAME_CASES + SHELL_CASES:
+        if cases is not None and name not in cases:
+            continue
+        stages = frame_stages if name.startswith('frame') else shell_stages
+        for stage, func in stages(concrete, steel, *params):
+            res[f'{name}/{stage}'] = measure(func, repeat)
+            print(report_line(f'{name}/{stage}', res[f'{name}/{stage}']), flush=True)
+    return res
+
+
+def report_line(key, r, base=None):
+    """
+    Строка отчета.
+
+    :param key: Имя задачи и этапа
+    :param r: Показатели
+    :param base: Показатели базового уровня
+    :return: Строка
+    """
+    line = (f"{key:<20}{r['time']:>10.4f} с{r['iterations']:>10}{r['converged']:>7}/{r['problems']:<7}"
+            f"{r['peak_mb']:>9.1f} МБ{r['rate']:>12.1f} 1/с")
+    if base is not None:
+        line += f"{r['time'] / base['time']:>8.2f}x" if base['time'] > 0 else ''
+    return line
+
+
+def compare(res, baseline, tolerance=0.25, floor=0.01):
+    """
+    Сравнение с базовым уровнем.
+
+    Регрессией считается увеличение времени более чем на tolerance (и более чем на floor секунд),
+    изменение количества итераций или сошедшихся задач.
+
+    :param res: Результаты
+    :param baseline: Результаты базового уровня
+    :param tolerance: Допустимое относительное увеличение времени
+    :param floor: Порог абсолютного увеличения времени, с
+    :return: Список описаний регрессий
+    """
+    bad = []
+    for key, r in res.items():
+        b = baseline.get(key)
+        if b is None:
+            continue
+        if r['time'] > b['time'] * (1 + tolerance) and r['time'] - b['time'] > floor:
+            bad.append(f"{key}: время {b['time']:.4f} -> {r['time']:.4f} с")
+        if r['iterations'] > b['iterations']:
+            bad.append(f"{key}: итерации {b['iterations']} -> {r['iterations']}")
+        if r['converged'] < b['converged']:
+            bad.append(f"{key}: сошлось {b['converged']} -> {r['converged']}")
+    return bad
+
+
+def save(res, path):
+    """
+    Сохранение результатов как базового уровня.
+
+    :param res: Результаты
+    :param path: Путь к файлу JSON
+    :return:
+    """
+    meta = {'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(),
+            'processor': platform.processor(), 'date': time.strftime('%Y-%m-%d %H:%M:%S')}
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump({'meta': meta, 'results': res}, fh, ensure_ascii=False, indent=1)
+
+
+def load(path):
+    """
+    Загрузка базового уровня.
+
+    :param path: Путь к файлу JSON
+    :return: Результаты базового уровня
+    """
+    with open(path, encoding='utf-8') as fh:
+        return json.load(fh)['results']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Тесты производительности расчета сечений и элементов оболочек')
+    parser.add_argument('cases', nargs='*', help='Имена задач (по умолчанию все): ' +
+                        ', '.join(c[0] for c in FRAME_CASES + SHELL_CASES))
+    parser.add_argument('--quick', action='store_true', help='Только малые задачи')
+    parser.add_argument('--repeat', type=int, default=3, help='Количество запусков этапа')
+    parser.add_argument('--baseline', default='benchmark_baseline.json', help='Файл базового уровня')
+    parser.add_argument('--save', action='store_true', help='Сохранить результаты как базовый уровень')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Допустимое относительное увеличение времени')
+    parser.add_argument('--db', default='materials.db', help='База данных материалов')
+    args = parser.parse_args(argv)
+    cases = args.cases or (list(QUICK) if args.quick else None)
+    print(f"{'Задача/этап':<20}{'Время':>12}{'Итерации':>10}{'Сошлось':>14}{'Память':>12}{'Задач/с':>14}")
+    res = run(cases, args.repeat, args.db)
+    if args.save:
+        save(res, args.baseline)
+        print('Базовый уровень сохранен:', args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        return 0
+    baseline = load(args.baseline)
+    print('Сравнение с базовым уровнем', args.baseline)
+    for key, r in res.items():
+        if key in baseline:
+            print(report_line(key, r, baseline[key]))
+    bad = compare(res, baseline, args.tolerance)
+    for msg in bad:
+        print('Регрессия:', msg)
+    return 1 if bad else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,8 +2,22 @@ import matplotlib.pyplot as plt
 import matplotlib.image as mpimg
 
 
+def show(fig, path=None):
+    """
+    Вывод графика на экран или в файл.
+
+    :param fig: Рисунок
+    :param path: Файл рисунка (формат PNG, SVG, PDF по расширению), None - вывод на экран
+    :return:
+    """
+    if path is None:
+        plt.show()
+    else:
+        fig.savefig(path)
+        plt.close(fig)
+
 
-def strainstress(x, y, grade):
+def strainstress(x, y, grade, path=None):
     """
     Диаграмма состояния.
     """
@@ -14,18 +28,19 @@ def strainstress(x, y, grade):
     ax.set_ylabel('Напряжения, МПа')
     plt.title('Диаграмма состояния ' + grade)
     ax.scatter(x, y, c='red', alpha=0.5)
-    plt.show()
+    show(fig, path)
 
 
-def loads(img):
+def loads(img, path=None):
     """
     Правило знаков нагрузок.
 
     :param img: Файл рисунка
+    :param path: Файл для сохранения графика (None - вывод на экран)
     :return:
     """
     fig, ax = plt.subplots(num='Правило знаков нагрузок')
     ax.imshow(mpimg.imread(img))
     ax.axis('off')
     plt.title('Правило знаков нагрузок')
-    plt.show()
+    show(fig, path)
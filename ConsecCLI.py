@@ -0,0 +1,192 @@
+# Расчет без графического интерфейса
+# Георгий Березин
+import argparse
+import json
+import os
+import sys
+import Materials as Mtr
+from Solution import CONVERGED, STATUS
+
+
+def read_excel(path):
+    """
+    Чтение исходных данных из файла Excel (листы section, rebars, loads, combo).
+
+    :param path: Путь к файлу
+    :return: Словарь исходных данных
+    """
+    import pandas as pd
+
+    sheets = pd.read_excel(path, sheet_name=['section', 'rebars', 'loads', 'combo'])
+    combo = sheets['combo']
+    return {
+        'mode': 'frame' if os.path.basename(path).startswith('f') else 'shell',
+        'section': sheets['section'].iloc[0].to_dict(),
+        'rebars': sheets['rebars'].to_dict('records'),
+        'loads': sheets['loads'].to_dict('records'),
+        'combo': dict(zip(combo['case'], combo['gf'])),
+    }
+
+
+def read_data(path):
+    """
+    Чтение исходных данных из файла JSON или Excel.
+
+    :param path: Путь к файлу
+    :return: Словарь исходных данных
+    """
+    if os.path.splitext(path)[1].lower() in ('.xlsx', '.xls'):
+        return read_excel(path)
+    with open(path, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def frame(data, concrete, steel):
+    """
+    Создание жб сечения стержневого КЭ по исходным данным.
+
+    :param data: Словарь исходных данных
+    :param concrete: Данные по бетону
+    :param steel: Данные по стали
+    :return: Поперечное сечение (FrameSec)
+    """
+    from MemberSection.RConSect import FrameSec
+
+    sec = data['section']
+    rect = FrameSec(concrete, steel)
+    rect.add_rect_section(sec['grade'], sec['h'], sec['b'], int(sec['nh']), int(sec['nb']))
+    for r in data['rebars']:
+        rect.add_rebar(r['name'], r['grade'], r['ds'], r['X'], r['Y'])
+    for ld in data['loads']:
+        rect.add_load(ld['N'], ld['Mx'], ld['My'], case=ld['case'])
+    rect.add_load_combo('0', factors=data['combo'])
+    return rect
+
+
+def shell(data, concrete, steel):
+    """
+    Создание выделенного жб элемента оболочки по исходным данным.
+
+    :param data: Словарь исходных данных
+    :param concrete: Данные по бетону
+    :param steel: Данные по стали
+    :return: Элемент оболочки (ShellElem)
+    """
+    from ShellElement.RConShell import ShellElem
+
+    sec = data['section']
+    elem = ShellElem(concrete, steel)
+    elem.add_conc_element(sec['grade'], sec['h'], int(sec['nh']))
+    for r in data['rebars']:
+        elem.add_ply(r['name'], r['grade'], r['ds'], r['ns'], r['z'], r['a'])
+    for ld in data['loads']:
+        elem.add_load(ld['Nxx'], ld['Nyy'], ld['Nxy'], ld['Mxx'], ld['Myy'], ld['Mxy'], case=ld['case'])
+    elem.add_load_combo('0', factors=data['combo'])
+    return elem
+
+
+def run(data, method='secant', db='materials.db'):
+    """
+    Расчет без вывода таблиц и графиков (используется только NumPy).
+
+    Элемент оболочки рассчитывается пакетным методом секущих (ShellElement.Batch).
+
+    :param data: Словарь исходных данных
+    :param method: Метод расчета сечения: 'secant' - секущий модуль, 'newton' - касательный модуль
+    :param db: Путь к базе данных материалов
+    :return: Словарь результатов: вектор деформаций, количество итераций, признак сходимости, состояние расчета
+    """
+    concrete, steel = Mtr.tables(db)
+    sec = data['section']
+    if data.get('mode', 'frame') == 'frame':
+        rect = frame(data, concrete, steel)
+        u, it = rect.iterate(rect.force('0'), sec['kt'], sec['gb3'], sec['accuracy'], method)
+        status = rect.status
+    else:
+        from ShellElement.Batch import Layup
+
+        elem = shell(data, concrete, steel)
+        layup = Layup(elem, sec['kt'], sec['gb3'], sec['v'])
+        u, it, ok = layup.solve(elem.force('0'), sec['accuracy'])
+        status = layup.status
+    return {'u': u[0].tolist(), 'it': int(it[0]), 'ok': bool(status[0] == CONVERGED),
+            'status': STATUS[status[0]]}
+
+
+def report(data, method='secant'):
+    """
+    Расчет с выводом таблиц и графиков (загружает pandas, prettytable, matplotlib).
+
+    :param data: Словарь исходных данных
+    :param method: Метод расчета: 'secant' - секущий модуль, 'newton' - касательный модуль
+    :return:
+    """
+    concrete, steel = Mtr.materials()
+    sec = data['section']
+    if data.get('mode', 'frame') == 'frame':
+        frame(data, concrete, steel).analyze('0', sec['kt'], sec['gb3'], sec['accuracy'], method, report=True,
+                                             charts=True)
+    else:
+        shell(data, concrete, steel).analyze('0', sec['kt'], sec['gb3'], sec['v'], sec['accuracy'], method,
+                                             report=True, charts=True)
+
+
+def charts(data, directory, label, fmt='png', method='secant', db='materials.db'):
+    """
+    Расчет с выводом графиков в файлы без графического интерфейса (Export.export).
+
+    :param data: Словарь исходных данных
+    :param directory: Каталог вывода графиков
+    :param label: Метка графиков в именах файлов
+    :param fmt: Формат файлов: 'png', 'svg', 'pdf'
+    :param method: Метод расчета: 'secant' - секущий модуль, 'newton' - касательный модуль
+    :param db: Путь к базе данных материалов
+    :return: Код состояния расчета (Solution.CONVERGED, ...)
+    """
+    import Export
+
+    concrete, steel = Mtr.tables(db)
+    sec = data['section']
+    if data.get('mode', 'frame') == 'frame':
+        rect = frame(data, concrete, steel)
+        res = rect.analyze('0', sec['kt'], sec['gb3'], sec['accuracy'], method)
+        figs = res.figures(rect)
+    else:
+        elem = shell(data, concrete, steel)
+        res = elem.analyze('0', sec['kt'], sec['gb3'], sec['v'], sec['accuracy'], method)
+        figs = res.figures(elem, sec['kt'], sec['gb3'])
+    if res.converged:
+        Export.export({label: figs}, directory, fmt)
+    return res.status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Расчет жб сечений по нелинейной деформационной модели')
+    parser.add_argument('path', help='Файл исходных данных (.json или .xlsx)')
+    parser.add_argument('--method', default='secant', choices=['secant', 'newton'], help='Метод расчета')
+    parser.add_argument('--db', default='materials.db', help='База данных материалов')
+    parser.add_argument('--report', action='store_true', help='Вывод таблиц и графиков')
+    parser.add_argument('--charts', metavar='DIR', help='Вывод графиков в файлы каталога DIR')
+    parser.add_argument('--format', default='png', choices=['png', 'svg', 'pdf'], help='Формат файлов графиков')
+    args = parser.parse_args(argv)
+    try:
+        data = read_data(args.path)
+    except ImportError as err:  # Нет пакета чтения файлов Excel (openpyxl)
+        print('Чтение исходных данных невозможно:', err, file=sys.stderr)
+        return 2
+    if args.report:
+        report(data, args.method)
+        return 0
+    if args.charts:
+        label = os.path.splitext(os.path.basename(args.path))[0]
+        status = charts(data, args.charts, label, args.format, args.method, args.db)
+        print(STATUS[status])
+        return 0 if status == CONVERGED else 1
+    res = run(data, args.method, args.db)
+    json.dump(res, sys.stdout)
+    sys.stdout.write('\n')
+    return 0 if res['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -97,7 +97,8 @@ class main:
                 for i in range(0, len(combo)):
                     combos[combo["case"][i]] = combo["gf"][i]
                 rect.add_load_combo("0", factors=combos)
-                rect.analyze("0", section["kt"][0], section["gb3"][0], section["accuracy"][0])
+                rect.analyze("0", section["kt"][0], section["gb3"][0], section["accuracy"][0],
+                             report=True, charts=True)
             else:
                 from ShellElement.RConShell import ShellElem
                 # Создание нового выделенного жб элемента оболочки
@@ -115,7 +116,8 @@ class main:
                 for i in range(0, len(combo)):
                     combos[combo["case"][i]] = combo["gf"][i]
                 shell.add_load_combo("0", factors=combos)
-                shell.analyze("0", section["kt"][0], section["gb3"][0], section["v"][0], section["accuracy"][0])
+                shell.analyze("0", section["kt"][0], section["gb3"][0], section["v"][0], section["accuracy"][0],
+                              report=True, charts=True)
         except:
             print("Неверные данные !")
 
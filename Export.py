@@ -0,0 +1,105 @@
+# Пакетный вывод графиков результатов расчета в файлы без графического интерфейса
+# Георгий Березин
+import hashlib
+import json
+import os
+import pickle
+
+FORMATS = ('png', 'svg', 'pdf')  # Форматы файлов графиков
+MANIFEST = 'charts.json'  # Файл хешей нарисованных графиков в каталоге вывода
+
+
+def headless():
+    """Переключение процесса на вывод графиков без графического интерфейса (backend Agg)."""
+    import matplotlib
+
+    matplotlib.use('Agg', force=True)
+
+
+def digest(func, args, fmt, dpi):
+    """
+    Хеш графика по функции построения, данным и параметрам файла.
+
+    :param func: Функция построения графика
+    :param args: Аргументы функции построения графика
+    :param fmt: Формат файла
+    :param dpi: Разрешение, точек на дюйм
+    :return: Шестнадцатеричная строка хеша
+    """
+    data = pickle.dumps((func.__module__, func.__qualname__, args, fmt, dpi), protocol=4)
+    return hashlib.sha1(data).hexdigest()
+
+
+def render(func, args, path, dpi):
+    """
+    Построение графика в файл (выполняется в процессе вывода).
+
+    :param func: Функция построения графика
+    :param args: Аргументы функции построения графика
+    :param path: Файл рисунка
+    :param dpi: Разрешение, точек на дюйм
+    :return: Файл рисунка
+    """
+    import matplotlib
+
+    matplotlib.rcParams['savefig.dpi'] = dpi
+    func(*args, path=path)
+    return path
+
+
+def export(reports, directory, fmt='png', workers=None, dpi=100):
+    """
+    Вывод графиков результатов расчета в файлы параллельными процессами.
+
+    Файлы называются '<метка>_<имя графика>.<формат>'. Хеши данных нарисованных графиков сохраняются
+    в каталоге вывода (MANIFEST), при повторном выводе перерисовываются только изменившиеся графики.
+
+    :param reports: Словарь: метка отчета -> графики результатов расчета [(имя, функция, аргументы)],
+        например {'1.0D+1.0L': res.figures(rect)}
+    :param directory: Каталог вывода
+    :param fmt: Формат файлов: 'png', 'svg', 'pdf'
+    :param workers: Количество процессов (1 - вывод в текущем процессе)
+    :param dpi: Разрешение, точек на дюйм
+    :return: Файлы всех графиков, перерисованные файлы
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Неизвестный формат графиков '{fmt}'")
+    os.makedirs(directory, exist_ok=True)
+    manifest = os.path.join(directory, MANIFEST)
+    try:
+        with open(manifest, encoding='utf-8') as fh:
+            hashes = json.load(fh)
+    except (OSError, ValueError):
+        hashes = {}
+    paths = []
+    tasks = []
+    for label, figs in reports.items():
+        for name, func, args in figs:
+            file = f'{label}_{name}.{fmt}'.replace(os.sep, '-')
+            path = os.path.join(directory, file)
+            paths.append(path)
+            key = digest(func, args, fmt, dpi)
+            if hashes.get(file) != key or not os.path.exists(path):
+                hashes.pop(file, None)
+                tasks.append((file, key, func, args, path))
+    drawn = []
+    try:
+        if workers == 1:
+            headless()
+            for file, key, func, args, path in tasks:
+                drawn.append(render(func, args, path, dpi))
+                hashes[file] = key
+        elif tasks:
+            from concurrent.futures import ProcessPoolExecutor
+
+            workers = min(workers or os.cpu_count(), len(tasks))
+            with ProcessPoolExecutor(max_workers=workers, initializer=headless) as pool:
+                futures = [(file, key, pool.submit(render, func, args, path, dpi))
+                           for file, key, func, args, path in tasks]
+                for file, key, future in futures:
+                    drawn.append(future.result())
+                    hashes[file] = key
+    finally:
+        with open(manifest, 'w', encoding='utf-8') as fh:
+            json.dump(hashes, fh, indent=1, sort_keys=True)
+    return paths, drawn
@@ -0,0 +1,308 @@
+import numpy as np
+
+
+class LoadCombo:
+    """Класс представляющий комбинацию нагрузок"""
+
+    def __init__(self, name, combo_type='strength', factors=None):
+        """
+        Инициализация комбинации нагрузок.
+
+        :param name: Уникальное имя комбинации ('1.1D+1.2L')
+        :param combo_type: Тип комбинации нагрузок
+        :param factors: Словарь включающий нагрузки и их коэффициенты ({'D': 1.1, 'L': 1.2})
+        """
+        self.name = name  # Имя комбинации
+        self.combo_type = combo_type  # Тип комбинации
+        self.factors = {} if factors is None else factors  # Коэффициенты нагрузок
+
+    def __repr__(self):
+        return f"LoadCombo(name={self.name!r}, factors={self.factors!r})"
+
+    def add_load_case(self, case_name, factor):
+        """
+        Добавляет нагрузку в комбинацию.
+
+        :param case_name: Имя загружения
+        :param factor: Коэффициент нагрузки
+        :return:
+        """
+        self.factors[case_name] = factor
+
+    def delete_load_case(self, case_name):
+        """
+        Удаляет нагрузку из комбинации.
+
+        :param case_name: Имя загружения
+        :return:
+        """
+        del self.factors[case_name]
+
+
+class LoadCases:
+    """Класс представляющий нагрузки загружений: матрица загружение x компонента нагрузки"""
+
+    def __init__(self, components):
+        """
+        Инициализация таблицы нагрузок.
+
+        :param components: Количество компонент вектора нагрузки
+        """
+        self.components = components  # Количество компонент вектора нагрузки
+        self.cases = {}  # Строки матрицы нагрузок по именам загружений
+        self._rows = []  # Суммарные нагрузки загружений
+        self._matrix = None
+
+    def __len__(self):
+        return len(self.cases)
+
+    def add(self, case, load):
+        """
+        Добавляет нагрузку в загружение, нагрузки одного загружения суммируются.
+
+        :param case: Имя загружения
+        :param load: Вектор нагрузки, (components,)
+        :return:
+        """
+        i = self.cases.setdefault(case, len(self._rows))
+        if i == len(self._rows):
+            self._rows.append(np.zeros(self.components))
+        self._rows[i] = self._rows[i] + np.asarray(load, dtype=float)
+        self._matrix = None
+
+    @property
+    def matrix(self):
+        """Матрица нагрузок загружений, (количество загружений, components)"""
+        if self._matrix is None:
+            self._matrix = np.array(self._rows, dtype=float).reshape(-1, self.components)
+        return self._matrix
+
+    def factors(self, combos):
+        """
+        Разреженная матрица коэффициентов комбинаций в координатном формате.
+
+        Загружения без нагрузок не учитываются.
+
+        :param combos: Комбинации нагрузок (LoadCombo), итерируемый объект
+        :return: Количество комбинаций, номера комбинаций (nnz,), номера загружений (nnz,), коэффициенты (nnz,)
+        """
+        rows = []
+        cols = []
+        vals = []
+        m = 0
+        for combo in combos:
+            for case, factor in combo.factors.items():
+                j = self.cases.get(case)
+                if j is not None:
+                    rows.append(m)
+                    cols.append(j)
+                    vals.append(factor)
+            m += 1
+        return m, np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp), np.array(vals, dtype=float)
+
+    def combine(self, combos, values=None):
+        """
+        Векторы нагрузки комбинаций: произведение матрицы коэффициентов на матрицу нагрузок.
+
+        Вместо нагрузок могут суммироваться любые линейные по нагрузке величины загружений,
+        например решения линейной упругой задачи (принцип суперпозиции).
+
+        :param combos: Комбинации нагрузок (LoadCombo), итерируемый объект
+        :param values: Величины загружений (количество загружений, n), по умолчанию матрица нагрузок
+        :return: Векторы нагрузки или величины комбинаций, (m, n)
+        """
+        values = self.matrix if values is None else np.asarray(values, dtype=float)
+        m, rows, cols, vals = self.factors(combos)
+        f = np.zeros((m, values.shape[1]))
+        if len(vals):
+            w = vals[:, None] * values[cols]
+            for j in range(values.shape[1]):
+                f[:, j] = np.bincount(rows, weights=w[:, j], minlength=m)
+        return f
+
+
+def governing(utilization, top=None, threshold=None):
+    """
+    Отбор определяющих комбинаций по оценкам использования предельных деформаций.
+
+    :param utilization: Оценки использования предельных деформаций комбинациями, (m,)
+    :param top: Количество комбинаций с наибольшими оценками (None - без отбора по количеству)
+    :param threshold: Минимальная оценка определяющей комбинации (None - без отбора по оценке)
+    :return: Признаки определяющих комбинаций, (m,)
+    """
+    utilization = np.asarray(utilization, dtype=float)
+    if top is None and threshold is None:
+        return np.ones(len(utilization), dtype=bool)
+    keep = np.zeros(len(utilization), dtype=bool)
+    if top:
+        keep[np.argsort(-utilization, kind='stable')[:top]] = True
+    if threshold is not None:
+        keep |= utilization >= threshold
+    return keep | ~np.isfinite(utilization)
+
+
+def combinations(permanent, variable, exclusive=(), combo_type='strength', accompany=True):
+    """
+    Генератор комбинаций нагрузок по правилам частных коэффициентов.
+
+    Для каждого постоянного загружения перебираются неблагоприятный и благоприятный коэффициенты.
+    Каждое временное загружение поочередно принимается основным с коэффициентом gamma, остальные
+    временные загружения входят в комбинацию сопутствующими с коэффициентом gamma * psi или не входят.
+    Из каждой группы взаимоисключающих загружений (exclusive) в комбинацию входит не более одного.
+    Комбинации создаются по мере перебора, количество комбинаций растет экспоненциально с количеством
+    загружений.
+
+    :param permanent: Постоянные загружения: {имя: (неблагоприятный, благоприятный коэффициент)}
+    :param variable: Временные загружения: {имя: (gamma, psi)}
+    :param exclusive: Группы взаимоисключающих временных загружений, например [('Wx', 'Wy')]
+    :param combo_type: Тип комбинаций нагрузок
+    :param accompany: Учет сопутствующих временных загружений (False - только основное загружение)
+    :return: Генератор комбинаций нагрузок (LoadCombo)
+    """
+    from itertools import product
+
+    group = {}  # Номер группы взаимоисключающих загружений по имени загружения
+    for i, cases in enumerate(exclusive):
+        for case in cases:
+            group[case] = i
+    perm = list(permanent.items())
+    var = list(variable.items())
+    # Основное временное загружение (None - без временных), загружения с нулевыми коэффициентами не учитываются
+    leads = [None] + [case for case, gf in var if gf[0] != 0]
+    for gp in product(*(sorted(set(gf)) for _, gf in perm)):
+        base = {case: g for (case, _), g in zip(perm, gp)}
+        for lead in leads:
+            others = []  # Сопутствующие временные загружения: (имя, коэффициент)
+            if lead is not None and accompany:
+                others = [(case, gf[0] * gf[1]) for case, gf in var if case != lead and gf[0] * gf[1] != 0
+                          and (case not in group or group[case] != group.get(lead))]
+            for pick in product(*([None, other] for other in others)):
+                chosen = [c for c in pick if c is not None]
+                groups = [group[case] for case, _ in chosen if case in group]
+                if len(groups) != len(set(groups)):
+                    continue
+                factors = dict(base)
+                if lead is not None:
+                    factors[lead] = variable[lead][0]
+                factors.update(chosen)
+                factors = {case: g for case, g in factors.items() if g != 0}
+                name = '+'.join(f'{g:g}{case}' for case, g in factors.items())
+                yield LoadCombo(name, combo_type, factors)
+
+
+def nnls(a, b, tol=1e-12):
+    """
+    Неотрицательный метод наименьших квадратов (Лоусон, Хансон): min |a @ x - b|, x >= 0.
+
+    :param a: Матрица, (m, n)
+    :param b: Вектор, (m,)
+    :param tol: Точность условий оптимальности
+    :return: Решение (n,), норма невязки
+    """
+    n = a.shape[1]
+    x = np.zeros(n)
+    passive = np.zeros(n, dtype=bool)  # Переменные, не ограниченные нулем
+    w = a.T @ b
+    for _ in range(3 * n):
+        if np.all(passive) or np.max(w[~passive]) <= tol:
+            break
+        passive[np.argmax(np.where(passive, -np.inf, w))] = True
+        while True:
+            z = np.zeros(n)
+            z[passive] = np.linalg.lstsq(a[:, passive], b, rcond=None)[0]
+            neg = passive & (z <= 0)
+            if not np.any(neg):
+                x = z
+                break
+            step = np.min(x[neg] / (x[neg] - z[neg]))
+            x = x + step * (z - x)
+            passive &= x > tol
+            x[~passive] = 0.0
+        w = a.T @ (b - a @ x)
+    return x, np.linalg.norm(a @ x - b)
+
+
+def inside(points, vertices, tol=1e-9):
+    """
+    Признаки точек, принадлежащих выпуклой оболочке вершин.
+
+    Точка принадлежит оболочке, если она представима выпуклой комбинацией вершин: невязка задачи
+    неотрицательных наименьших квадратов [vertices.T; 1] @ w = [p; 1], w >= 0 не превышает tol
+    (координаты нормируются по разбросу вершин).
+
+    :param points: Точки, (m, n)
+    :param vertices: Вершины, (k, n)
+    :param tol: Допустимая невязка
+    :return: Признаки принадлежности оболочке, (m,)
+    """
+    points = np.asarray(points, dtype=float)
+    vertices = np.asarray(vertices, dtype=float)
+    res = np.zeros(len(points), dtype=bool)
+    if len(vertices) == 0:
+        return res
+    c = np.mean(vertices, axis=0)
+    r = np.max(np.abs(vertices - c), axis=0)
+    r[r == 0] = 1.0
+    a = np.vstack((((vertices - c) / r).T, np.ones((1, len(vertices)))))
+    for i, p in enumerate((points - c) / r):
+        res[i] = nnls(a, np.append(p, 1.0))[1] <= tol
+    return res
+
+
+def hull(points, directions=2000, seed=0):
+    """
+    Признаки вершин выпуклой оболочки точек (векторов нагрузки комбинаций).
+
+    Вершины находятся как точки с наибольшей проекцией на направления, равномерно распределенные
+    по сфере в пространстве нормированных координат. Точки вне оболочки найденных вершин (inside)
+    добавляются к вершинам, поэтому все остальные точки гарантированно лежат внутри оболочки.
+
+    :param points: Точки, (m, n)
+    :param directions: Количество направлений
+    :param seed: Начальное значение генератора случайных направлений
+    :return: Признаки вершин, (m,)
+    """
+    points = np.asarray(points, dtype=float)
+    m, n = points.shape
+    vert = np.zeros(m, dtype=bool)
+    if m <= n + 1:
+        vert[:] = True
+        return vert
+    c = np.mean(points, axis=0)
+    r = np.max(np.abs(points - c), axis=0)
+    r[r == 0] = 1.0
+    p = (points - c) / r
+    d = np.random.default_rng(seed).normal(size=(directions, n))
+    d = np.vstack((np.eye(n), -np.eye(n), d / np.linalg.norm(d, axis=1)[:, None]))
+    vert[np.unique(np.argmax(p @ d.T, axis=0))] = True
+    rest = np.flatnonzero(~vert)
+    vert[rest[~inside(points[rest], points[vert])]] = True
+    return vert
+
+
+def prune(f, check, directions=2000):
+    """
+    Проверка несущей способности на комбинации нагрузок с отсечением по выпуклой оболочке.
+
+    При выпуклой области несущей способности комбинация, вектор нагрузки которой лежит внутри
+    выпуклой оболочки прошедших проверку комбинаций, не может быть определяющей. Сначала проверяются
+    вершины оболочки векторов нагрузки, внутренние комбинации проверяются только при непрохождении
+    проверки вершиной и только если они лежат вне оболочки прошедших проверку вершин.
+
+    :param f: Векторы нагрузки комбинаций, (m, n)
+    :param check: Функция check(f) -> признаки прохождения проверки (len(f),)
+    :param directions: Количество направлений поиска вершин оболочки (hull)
+    :return: Признаки прохождения проверки (m,), признаки выполненного расчета (m,)
+    """
+    f = np.asarray(f, dtype=float)
+    m = len(f)
+    ok = np.ones(m, dtype=bool)
+    done = hull(f, directions) if m else np.zeros(0, dtype=bool)
+    ok[done] = check(f[done])
+    if not np.all(ok[done]):
+        rest = np.flatnonzero(~done)
+        rest = rest[~inside(f[rest], f[done & ok])]
+        if len(rest):
+            ok[rest] = check(f[rest])
+            done[rest] = True
+    return ok, done
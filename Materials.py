@@ -1,27 +1,176 @@
-import pandas as pd
+import os
 import sqlite3
-from sqlite3 import Error
+from collections import namedtuple
+from collections.abc import Mapping
+import numpy as np
 
 
-def materials():
+_catalogues = {}  # Каталоги материалов процесса по путям к базам данных
+
+
+def record_type(path, name, params):
     """
-    Свойства материалов.
+    Тип неизменяемой записи свойств класса материала.
 
-    :return: Бетон, арматурная сталь
+    Доступ к свойствам по имени параметра: rec['E'] или rec.E.
+
+    :param path: Путь к базе данных материалов
+    :param name: Имя таблицы
+    :param params: Имена параметров
+    :return: Класс записи
     """
-    path = 'materials.db'  # База данных материалов
-    con = None  # Соединение с базой данных
-    try:
+    base = namedtuple(name.capitalize(), params)
+
+    def getitem(self, key):
+        if isinstance(key, str):
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def reduce(self):
+        return record, (path, name, tuple(self))
+
+    return type(base.__name__, (base,), {'__slots__': (), '__getitem__': getitem, '__reduce__': reduce})
+
+
+def table(path, name):
+    """
+    Таблица материалов каталога процесса (используется при передаче данных между процессами).
+
+    :param path: Путь к базе данных материалов
+    :param name: Имя таблицы
+    :return: Таблица материалов
+    """
+    return getattr(catalogue(path), name)
+
+
+def record(path, name, values):
+    """
+    Запись свойств класса материала (используется при передаче данных между процессами).
+
+    :param path: Путь к базе данных материалов
+    :param name: Имя таблицы
+    :param values: Значения параметров
+    :return: Запись свойств
+    """
+    return table(path, name).record(*values)
+
+
+class Table(Mapping):
+    """Класс представляющий таблицу материалов: класс материала -> запись свойств"""
+
+    def __init__(self, path, name):
+        """
+        Инициализация таблицы материалов, свойства классов загружаются при первом обращении.
+
+        :param path: Путь к базе данных материалов
+        :param name: Имя таблицы
+        """
+        self.path = path
+        self.name = name
         con = sqlite3.connect(path)
-        print(f"Соединение с SQLite DB '{path}' успешно !")
-    except Error as e:
-        print(f"Случилась ошибка '{e}'")
-    finally:
-        concrete = pd.read_sql(f"SELECT * FROM '{'concrete'}';", con, index_col='param', coerce_float=True)
-        print(f"Таблица '{'concrete'}' загружена:")
-        print(concrete)
-        steel = pd.read_sql(f"SELECT * FROM '{'steel'}';", con, index_col='param', coerce_float=True)
-        print(f"Таблица '{'steel'}' загружена:")
-        print(steel)
-        con.close()
-        return concrete, steel
+        try:
+            cur = con.execute(f"SELECT * FROM '{name}';")
+            self.grades = [col[0] for col in cur.description][1:]  # Классы материала
+            rows = cur.fetchall()
+        finally:
+            con.close()
+        self.params = [row[0] for row in rows]  # Имена параметров
+        self.record = record_type(path, name, self.params)
+        self._rows = {grade: i + 1 for i, grade in enumerate(self.grades)}
+        self._data = rows  # Таблица базы данных, освобождается после загрузки всех классов
+        self._records = {}
+        self._array = None
+
+    def __getitem__(self, grade):
+        rec = self._records.get(grade)
+        if rec is None:
+            if grade not in self._rows:
+                raise KeyError(grade)
+            j = self._rows[grade]
+            rec = self.record(*(float(row[j]) for row in self._data))
+            self._records[grade] = rec
+            if len(self._records) == len(self.grades):
+                self._data = None
+        return rec
+
+    def __reduce__(self):
+        return table, (self.path, self.name)
+
+    def __iter__(self):
+        return iter(self.grades)
+
+    def __len__(self):
+        return len(self.grades)
+
+    @property
+    def array(self):
+        """Свойства всех классов материала, структурированный массив NumPy (только для чтения)"""
+        if self._array is None:
+            dtype = [('grade', 'U8')] + [(p, 'f8') for p in self.params]
+            arr = np.array([(grade, *self[grade]) for grade in self.grades], dtype=dtype)
+            arr.flags.writeable = False
+            self._array = arr
+        return self._array
+
+
+class Catalogue:
+    """Класс представляющий каталог материалов базы данных"""
+
+    def __init__(self, path):
+        """
+        Инициализация каталога материалов.
+
+        :param path: Путь к базе данных материалов
+        """
+        self.path = path
+        self.mtime = os.stat(path).st_mtime_ns  # Время изменения базы данных
+        self.concrete = Table(path, 'concrete')  # Бетон
+        self.steel = Table(path, 'steel')  # Арматурная сталь
+
+
+def catalogue(path='materials.db'):
+    """
+    Каталог материалов процесса.
+
+    База данных читается один раз, каталог обновляется при изменении файла базы данных.
+
+    :param path: Путь к базе данных материалов
+    :return: Каталог материалов
+    """
+    key = os.path.abspath(path)
+    cat = _catalogues.get(key)
+    if cat is None or cat.mtime != os.stat(key).st_mtime_ns:
+        cat = Catalogue(key)
+        _catalogues[key] = cat
+    return cat
+
+
+def tables(path='materials.db'):
+    """
+    Свойства материалов для расчета без вывода.
+
+    :param path: Путь к базе данных материалов
+    :return: Бетон, арматурная сталь
+    """
+    cat = catalogue(path)
+    return cat.concrete, cat.steel
+
+
+def materials(path='materials.db'):
+    """
+    Свойства материалов с выводом таблиц.
+
+    :param path: Путь к базе данных материалов
+    :return: Бетон, арматурная сталь
+    """
+    import pandas as pd
+
+    concrete, steel = tables(path)
+    print(f"Соединение с SQLite DB '{path}' успешно !")
+    for tbl in (concrete, steel):
+        print(f"Таблица '{tbl.name}' загружена:")
+        print(pd.DataFrame({grade: list(tbl[grade]) for grade in tbl}, index=pd.Index(tbl.params, name='param')))
+    return concrete, steel
@@ -34,7 +34,7 @@ def main():
     combo_name = '1.0D+1.0L'
     kt = 0
     gb3 = 1
-    rect.analyze(combo_name, kt, gb3, 0.0000001)
+    rect.analyze(combo_name, kt, gb3, 0.0000001, report=True, charts=True)
 
 
 if __name__ == '__main__':
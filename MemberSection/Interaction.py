@@ -0,0 +1,211 @@
+import os
+from collections import OrderedDict
+import numpy as np
+import Sigma as Sig
+
+
+CACHE = 32  # Наибольшее количество поверхностей взаимодействия в кэше
+PARALLEL = 1e7  # Объем расчета (точки поверхности x КЭ и стержни), с которого по умолчанию используются процессы
+_cache = OrderedDict()  # Поверхности взаимодействия, построенные в процессе (последние использованные в конце)
+
+
+def clear():
+    """Очистка кэша поверхностей взаимодействия."""
+    _cache.clear()
+
+
+def strain_path(nd, eb2, eb0, es2):
+    """
+    Деформации крайних волокон сечения при исчерпании несущей способности.
+
+    Область A: деформация растянутого волокна es2, деформация сжатого волокна от es2 до eb2.
+    Область B: деформация сжатого волокна eb2, деформация растянутого волокна от es2 до 0.
+    Область C: поворот от (eb2, 0) до равномерного сжатия eb0.
+
+    :param nd: Количество положений нейтральной оси
+    :param eb2: Предельная относительная деформация бетона
+    :param eb0: Относительная деформация бетона при равномерном сжатии
+    :param es2: Предельная относительная деформация арматуры
+    :return: Деформации сжатого волокна, деформации растянутого волокна, (nd,)
+    """
+    n_a = nd // 3
+    n_b = nd // 3
+    n_c = nd - n_a - n_b
+    t_a = np.linspace(0.0, 1.0, n_a, endpoint=False)
+    t_b = np.linspace(0.0, 1.0, n_b, endpoint=False)
+    t_c = np.linspace(0.0, 1.0, n_c)
+    e_top = np.hstack((es2 + (eb2 - es2) * t_a, np.full(n_b, eb2), eb2 + (eb0 - eb2) * t_c))
+    e_bot = np.hstack((np.full(n_a, es2), es2 * (1 - t_b), eb0 * t_c))
+    return e_top, e_bot
+
+
+def sweep(theta, xb, yb, ab, xs, ys, a_s, e_b, s_b, eb, p_s, es, nd):
+    """
+    Усилия в сечении при предельных плоскостях деформаций для заданных углов нейтральной оси.
+
+    :param theta: Углы направления сжатой зоны от оси X, радиан, (na,)
+    :param xb: Координаты x КЭ бетона, м
+    :param yb: Координаты y КЭ бетона, м
+    :param ab: Площади КЭ бетона, м^2
+    :param xs: Координаты x арматурных стержней, м
+    :param ys: Координаты y арматурных стержней, м
+    :param a_s: Площади арматурных стержней, м^2
+    :param e_b: Относительные деформации диаграммы состояния бетона
+    :param s_b: Напряжения диаграммы состояния бетона
+    :param eb: Начальный модуль упругости бетона, МПа
+    :param p_s: Параметры диаграмм состояния арматуры
+    :param es: Модули упругости арматуры, МПа
+    :param nd: Количество положений нейтральной оси
+    :return: N [кН], Mx [кН*м], My [кН*м], (na, nd)
+    """
+    es2 = np.min(p_s[3]) if len(xs) else e_b[5]  # Предельная деформация растянутого волокна
+    e_top, e_bot = strain_path(nd, e_b[0], e_b[1], es2)
+    na = len(theta)
+    n = np.zeros((na, nd))
+    mx = np.zeros((na, nd))
+    my = np.zeros((na, nd))
+    for i in range(na):
+        c = np.cos(theta[i])
+        s = np.sin(theta[i])
+        db = xb * c + yb * s  # Расстояния КЭ бетона вдоль направления сжатой зоны
+        ds = xs * c + ys * s  # Расстояния стержней вдоль направления сжатой зоны
+        d_top = np.max(db)
+        d_bot = np.min(ds) if len(ds) else np.min(db)
+        k = (e_top - e_bot) / (d_top - d_bot)  # Кривизна
+        u0 = e_bot - k * d_bot
+        sb = Sig.vsigmac(u0[:, None] + k[:, None] * db, *e_b, *s_b, eb, 1)
+        ss = Sig.vsigmas(u0[:, None] + k[:, None] * ds, *p_s, es)
+        n[i] = sb @ ab + ss @ a_s
+        mx[i] = sb @ (ab * xb) + ss @ (a_s * xs)
+        my[i] = sb @ (ab * yb) + ss @ (a_s * ys)
+    return n * 1000, mx * 1000, my * 1000
+
+
+class Surface:
+    """Класс представляющий поверхность взаимодействия N-Mx-My"""
+
+    def __init__(self, theta, n, mx, my):
+        """
+        Инициализация поверхности взаимодействия.
+
+        :param theta: Углы направления сжатой зоны от оси X, радиан, (na,)
+        :param n: Продольные силы, кН, (na, nd)
+        :param mx: Изгибающие моменты вдоль оси X, кН*м, (na, nd)
+        :param my: Изгибающие моменты вдоль оси Y, кН*м, (na, nd)
+        """
+        self.theta = theta
+        self.n = n
+        self.mx = mx
+        self.my = my
+
+    def save(self, path):
+        """
+        Сохранение поверхности в файл .npz.
+
+        :param path: Путь к файлу
+        :return:
+        """
+        np.savez(path, theta=self.theta, n=self.n, mx=self.mx, my=self.my)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Загрузка поверхности из файла .npz.
+
+        :param path: Путь к файлу
+        :return: Поверхность взаимодействия
+        """
+        with np.load(path) as data:
+            return cls(data['theta'], data['n'], data['mx'], data['my'])
+
+    @property
+    def n_range(self):
+        """Предельные продольные силы растяжения и сжатия, кН"""
+        return np.min(self.n), np.max(self.n)
+
+    def contour(self, n):
+        """
+        Сечение поверхности взаимодействия плоскостью заданной продольной силы.
+
+        :param n: Продольная сила, кН
+        :return: Моменты Mx, My на контуре [кН*м], признаки наличия точки контура, (na,)
+        """
+        g = self.n - n
+        cross = (g[:, :-1] * g[:, 1:] <= 0) & (g[:, :-1] != g[:, 1:])
+        found = np.any(cross, axis=1)
+        j = np.argmax(cross, axis=1)
+        rows = np.arange(len(self.theta))
+        g0 = g[rows, j]
+        g1 = g[rows, j + 1]
+        t = np.where(found, g0 / np.where(found, g0 - g1, 1.0), 0.0)
+        mx = self.mx[rows, j] + t * (self.mx[rows, j + 1] - self.mx[rows, j])
+        my = self.my[rows, j] + t * (self.my[rows, j + 1] - self.my[rows, j])
+        return mx, my, found
+
+    def contains(self, n, mx, my):
+        """
+        Проверка нахождения нагрузки внутри поверхности взаимодействия.
+
+        :param n: Продольная сила, кН
+        :param mx: Изгибающий момент вдоль оси X, кН*м
+        :param my: Изгибающий момент вдоль оси Y, кН*м
+        :return: True, если нагрузка воспринимается сечением
+        """
+        n_min, n_max = self.n_range
+        if not n_min <= n <= n_max:
+            return False
+        px, py, found = self.contour(n)
+        px = px[found]
+        py = py[found]
+        if len(px) < 3:
+            return bool(np.hypot(mx, my) <= np.max(np.hypot(px, py), initial=0.0))
+        qx = np.roll(px, -1)
+        qy = np.roll(py, -1)
+        cond = (py > my) != (qy > my)
+        xi = px + (my - py) * (qx - px) / np.where(qy != py, qy - py, 1.0)
+        return bool(np.count_nonzero(cond & (mx < xi)) % 2)
+
+
+def surface(fs, kt, gb3, na=36, nd=60, workers=None):
+    """
+    Построение поверхности взаимодействия N-Mx-My прямоугольного жб сечения.
+
+    Углы нейтральной оси распределяются между процессами. По умолчанию процессы используются только
+    при объеме расчета не менее PARALLEL. В кэше хранятся CACHE последних использованных поверхностей
+    (clear - очистка кэша).
+
+    :param fs: Поперечное сечение жб стержневого КЭ (FrameSec)
+    :param kt: Коэффициент учета растяжения бетона
+    :param gb3: Коэффициент gb3 бетона
+    :param na: Количество углов нейтральной оси
+    :param nd: Количество положений нейтральной оси для каждого угла
+    :param workers: Количество процессов (1 - расчет в текущем процессе, None - по объему расчета)
+    :return: Поверхность взаимодействия
+    """
+    sec = fs.section
+    key = (sec.grade, sec.h, sec.b, sec.nh, sec.nb, tuple(fs.c_p), kt, gb3, na, nd,
+           tuple((r.grade, r.ds, r.x, r.y, tuple(r.st)) for r in fs.rebars.values()))
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+    e_b, s_b = fs.diagrams(kt, gb3)
+    xs, ys, a_s, es, p_s = fs.rebar_arrays()
+    theta = np.linspace(0.0, 2 * np.pi, na, endpoint=False)
+    args = (fs.c_g[0], fs.c_g[1], fs.c_g[2], xs, ys, a_s, e_b, s_b, fs.c_p['E'], p_s, es, nd)
+    if workers is None and na * nd * (len(fs.c_g[2]) + len(xs)) < PARALLEL:
+        workers = 1
+    if workers == 1:
+        n, mx, my = sweep(theta, *args)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = min(workers or os.cpu_count(), na)
+        chunks = [th for th in np.array_split(theta, workers) if len(th)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(sweep, chunks, *[[a] * len(chunks) for a in args]))
+        n, mx, my = [np.vstack([p[i] for p in parts]) for i in range(3)]
+    srf = Surface(theta, n, mx, my)
+    _cache[key] = srf
+    if len(_cache) > CACHE:
+        _cache.popitem(last=False)
+    return srf
@@ -0,0 +1,238 @@
+import numpy as np
+from Solution import Calculation
+
+
+class Path:
+    """Класс представляющий траектории нагружения пакета задач"""
+
+    def __init__(self, t, u, f, it, complete):
+        """
+        Инициализация траекторий нагружения.
+
+        Точки траекторий хранятся в массивах (m, s), отсутствующие точки заполнены NaN.
+
+        :param t: Параметры нагружения в точках траекторий, (m, s)
+        :param u: Векторы общих деформаций, (m, s, 3)
+        :param f: Внутренние усилия N [кН], Mx [кН*м], My [кН*м], (m, s, 3)
+        :param it: Количество итераций, (m, s)
+        :param complete: Признаки достижения конечного значения параметра нагружения, (m,)
+        """
+        self.t = t
+        self.u = u
+        self.f = f
+        self.it = it
+        self.complete = complete
+
+    @property
+    def count(self):
+        """Количество точек траекторий, (m,)"""
+        return np.count_nonzero(np.isfinite(self.t), axis=1)
+
+    @property
+    def ultimate(self):
+        """Последние достигнутые значения параметра нагружения, (m,)"""
+        n = self.count
+        last = self.t[np.arange(len(n)), np.maximum(n - 1, 0)]
+        return np.where(n > 0, last, np.nan)
+
+    def curve(self, i):
+        """
+        Точки траектории одной задачи.
+
+        :param i: Номер задачи
+        :return: Параметры нагружения (s,), векторы общих деформаций (s, 3), внутренние усилия (s, 3)
+        """
+        n = self.count[i]
+        return self.t[i, :n], self.u[i, :n], self.f[i, :n]
+
+
+def trace(state, z0, target, t_end, dt, acc, limit=None, maxit=30, it_lo=3, it_hi=8, grow=1.5, max_steps=1000):
+    """
+    Пошаговое нагружение пакета задач с продолжением от предыдущего шага и адаптивным шагом.
+
+    На каждом шаге задачи решаются методом Ньютона-Рафсона от решения предыдущего шага. Шаг увеличивается,
+    если решение получено не более чем за it_lo итераций, и уменьшается при it_hi и более итерациях.
+    Несошедшийся шаг или шаг с недопустимым состоянием (limit) отклоняется и делится пополам, расчет
+    задачи прекращается, когда шаг становится меньше dt / 1000.
+
+    :param state: Функция state(z) -> (внутренние усилия (m, n), касательные матрицы (m, n, n))
+    :param z0: Решения при нулевом параметре нагружения, (m, n)
+    :param target: Функция target(t, rows) -> векторы нагрузки (len(rows), n) при параметрах t
+    :param t_end: Конечное значение параметра нагружения
+    :param dt: Начальный шаг параметра нагружения
+    :param acc: Точность расчета
+    :param limit: Функция limit(z) -> признаки допустимого состояния (m,)
+    :param maxit: Максимальное количество итераций на шаге
+    :param it_lo: Количество итераций для увеличения шага
+    :param it_hi: Количество итераций для уменьшения шага
+    :param grow: Множитель увеличения шага
+    :param max_steps: Максимальное количество шагов
+    :return: Параметры нагружения (m, s), решения (m, s, n), итерации (m, s), признаки завершения (m,)
+    """
+    z = np.array(z0, dtype=float)
+    m, n = z.shape
+    t = np.zeros(m)  # Текущие параметры нагружения
+    h = np.full(m, float(dt))  # Текущие шаги
+    h_min = dt / 1000
+    active = np.all(np.isfinite(z), axis=1)  # Задачи с решением при нулевом параметре нагружения
+    ts = [np.where(active, t, np.nan)]
+    zs = [z.copy()]
+    its = [np.zeros(m, dtype=int)]
+    complete = np.zeros(m, dtype=bool)
+    for _ in range(max_steps):
+        idx = np.flatnonzero(active)
+        if len(idx) == 0:
+            break
+        t_new = np.minimum(t[idx] + h[idx], t_end)
+        z_new, it, ok = Calculation.newton(state, z[idx], target(t_new, idx), acc, maxit)
+        if limit is not None:
+            ok &= limit(z_new)
+        row_t = np.full(m, np.nan)
+        row_z = np.full((m, n), np.nan)
+        row_it = np.zeros(m, dtype=int)
+        acc_idx = idx[ok]
+        t[acc_idx] = t_new[ok]
+        z[acc_idx] = z_new[ok]
+        row_t[acc_idx] = t_new[ok]
+        row_z[acc_idx] = z_new[ok]
+        row_it[acc_idx] = it[ok]
+        # Адаптация шага
+        h[acc_idx[it[ok] <= it_lo]] *= grow
+        h[acc_idx[it[ok] >= it_hi]] *= 0.5
+        h[idx[~ok]] *= 0.5
+        done = t >= t_end
+        complete |= done
+        active &= ~done & (h >= h_min)
+        if len(acc_idx):
+            ts.append(row_t)
+            zs.append(row_z)
+            its.append(row_it)
+    # Уплотнение точек траекторий: отклоненные шаги не сохраняются
+    t_all = np.array(ts).T
+    z_all = np.transpose(np.array(zs), (1, 0, 2))
+    it_all = np.array(its).T
+    order = np.argsort(~np.isfinite(t_all), axis=1, kind='stable')
+    rows = np.arange(m)[:, None]
+    s = max(int(np.max(np.count_nonzero(np.isfinite(t_all), axis=1))), 1)
+    return t_all[rows, order][:, :s], z_all[rows, order][:, :s], it_all[rows, order][:, :s], complete
+
+
+def limits(fs, kt, gb3):
+    """
+    Функция проверки предельных деформаций бетона и арматуры сечения.
+
+    :param fs: Поперечное сечение жб стержневого КЭ (FrameSec)
+    :param kt: Коэффициент учета растяжения бетона
+    :param gb3: Коэффициент gb3 бетона
+    :return: Функция limit(u) -> признаки допустимого состояния (m,)
+    """
+    e_b, s_b = fs.diagrams(kt, gb3)
+    zb = fs.c_g[3]
+    xsj, ysj, asj, esj, p_s = fs.rebar_arrays()
+    zs = np.transpose(np.array([np.ones(len(xsj)), xsj, ysj]))
+
+    def limit(u):
+        eb = u @ zb.T
+        es = u @ zs.T
+        return (np.all(eb >= e_b[0], axis=1) & np.all(es >= p_s[0], axis=1) & np.all(es <= p_s[3], axis=1)
+                & np.all(np.isfinite(u), axis=1))
+
+    return limit
+
+
+def moment_curvature(fs, n, kt, gb3, theta=0.0, kmax=None, steps=50, acc=1e-9, maxit=30):
+    """
+    Диаграммы момент-кривизна сечения при постоянных продольных силах.
+
+    Кривизна задается в направлении theta плоскости (u1, u2), продольная сила и момент, сопряженный
+    с кривизной в перпендикулярном направлении, поддерживаются равными n и 0. Все уровни продольной силы
+    рассчитываются одним пакетом, расчет каждого уровня завершается при достижении предельных деформаций.
+
+    :param fs: Поперечное сечение жб стержневого КЭ (FrameSec)
+    :param n: Продольные силы, кН (+ растяжение), число или массив (m,)
+    :param kt: Коэффициент учета растяжения бетона
+    :param gb3: Коэффициент gb3 бетона
+    :param theta: Угол направления кривизны в плоскости (u1, u2), радиан
+    :param kmax: Максимальная кривизна, 1/м (по умолчанию - по предельным деформациям крайних волокон)
+    :param steps: Количество шагов при постоянном шаге кривизны
+    :param acc: Точность расчета
+    :param maxit: Максимальное количество итераций на шаге
+    :return: Траектории нагружения, параметр нагружения - кривизна, 1/м
+    """
+    n = np.atleast_1d(np.asarray(n, dtype=float)) / 1000
+    m = len(n)
+    c = np.array([np.cos(theta), np.sin(theta)])  # Направление кривизны
+    p = np.array([-c[1], c[0]])  # Перпендикулярное направление
+    tr = np.array([[1.0, 0.0, 0.0], [0.0, p[0], c[0]], [0.0, p[1], c[1]]])  # u = tr @ z, z = [u0, w, kappa]
+    sec_state = fs.state(kt, gb3)
+    sec_limit = limits(fs, kt, gb3)
+    if kmax is None:
+        e_b, s_b = fs.diagrams(kt, gb3)
+        xsj, ysj, asj, esj, p_s = fs.rebar_arrays()
+        db = fs.c_g[3][:, 1:] @ c
+        ds = np.column_stack((xsj, ysj)) @ c
+        es2 = np.max(p_s[3]) if len(ds) else e_b[5]
+        span = np.max(db) - (np.min(ds) if len(ds) else np.min(db))
+        kmax = (es2 - e_b[0]) / span
+
+    def state(z):
+        fi, k = sec_state(z @ tr.T)
+        fz = fi @ tr
+        fz[:, 2] = z[:, 2]
+        kz = np.einsum('ji,mjk,kl->mil', tr, k, tr)
+        kz[:, 2, :] = [0.0, 0.0, 1.0]
+        return fz, kz
+
+    def target(t, rows):
+        return np.column_stack((n[rows], np.zeros(len(rows)), t))
+
+    z0 = np.zeros((m, 3))
+    z0, _, ok = Calculation.newton(state, z0, target(np.zeros(m), np.arange(m)), acc, maxit * 4)
+    ok &= sec_limit(z0 @ tr.T)
+    z0[~ok] = np.nan  # Продольная сила превышает несущую способность при нулевой кривизне
+    t, z, it, complete = trace(state, z0, target, kmax, kmax / steps, acc, lambda z: sec_limit(z @ tr.T), maxit)
+    u = z @ tr.T
+    return Path(t, u, forces(sec_state, u), it, complete)
+
+
+def load_path(fs, f, kt, gb3, steps=20, acc=1e-9, maxit=30):
+    """
+    Пропорциональное нагружение сечения до заданных векторов нагрузки.
+
+    Параметр нагружения изменяется от 0 до 1, расчет прекращается при достижении предельных деформаций
+    или потере несущей способности, последняя достигнутая точка определяет предельный коэффициент нагрузки.
+
+    :param fs: Поперечное сечение жб стержневого КЭ (FrameSec)
+    :param f: Векторы нагрузки, (m, 3) [МН, МН*м, МН*м]
+    :param kt: Коэффициент учета растяжения бетона
+    :param gb3: Коэффициент gb3 бетона
+    :param steps: Количество шагов при постоянном шаге нагружения
+    :param acc: Точность расчета
+    :param maxit: Максимальное количество итераций на шаге
+    :return: Траектории нагружения, параметр нагружения - коэффициент нагрузки
+    """
+    f = np.asarray(f, dtype=float).reshape(-1, 3)
+    sec_state = fs.state(kt, gb3)
+
+    def target(t, rows):
+        return t[:, None] * f[rows]
+
+    t, u, it, complete = trace(sec_state, np.zeros(f.shape), target, 1.0, 1.0 / steps, acc,
+                               limits(fs, kt, gb3), maxit)
+    return Path(t, u, forces(sec_state, u), it, complete)
+
+
+def forces(state, u):
+    """
+    Внутренние усилия в точках траекторий.
+
+    :param state: Функция внутренних усилий и касательных матриц сечения
+    :param u: Векторы общих деформаций, (m, s, 3)
+    :return: Внутренние усилия N [кН], Mx [кН*м], My [кН*м], (m, s, 3)
+    """
+    flat = u.reshape(-1, 3)
+    fi = np.full(flat.shape, np.nan)
+    ok = np.all(np.isfinite(flat), axis=1)
+    if np.any(ok):
+        fi[ok] = state(flat[ok])[0] * 1000
+    return fi.reshape(u.shape)
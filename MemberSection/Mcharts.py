@@ -2,13 +2,39 @@ import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 from matplotlib.ticker import LinearLocator, FormatStrFormatter
-from scipy.interpolate import griddata
 from matplotlib.path import Path
 from matplotlib.patches import PathPatch
+from Ccharts import show
 
+RES = 200  # Максимальное количество узлов растра по стороне сечения
 
 
-def strain2d(eb, es, xbi, ybi, xsj, ysj, asj, ci):
+def raster(px, py, res=RES):
+    """
+    Растр узлов для графиков полей деформаций и напряжений, ограниченный контуром сечения.
+
+    Количество узлов по большей стороне габарита сечения не превышает res, шаг растра по обоим
+    направлениям одинаковый.
+
+    :param px: Координаты x вершин контура сечения, м
+    :param py: Координаты y вершин контура сечения, м
+    :param res: Максимальное количество узлов растра по стороне сечения
+    :return: Координаты узлов x, y (ny, nx), признаки узлов внутри контура или на контуре (ny, nx)
+    """
+    x_min, x_max = np.min(px), np.max(px)
+    y_min, y_max = np.min(py), np.max(py)
+    size = max(x_max - x_min, y_max - y_min)
+    nx = max(int(round(res * (x_max - x_min) / size)), 2)
+    ny = max(int(round(res * (y_max - y_min) / size)), 2)
+    x2, y2 = np.meshgrid(np.linspace(x_min, x_max, nx), np.linspace(y_min, y_max, ny))
+    pts = np.column_stack((x2.ravel(), y2.ravel()))
+    outline = Path(np.column_stack((px, py)))
+    r = size * 1e-9  # Допуск для узлов на контуре (знак радиуса зависит от направления обхода)
+    inside = outline.contains_points(pts, radius=r) | outline.contains_points(pts, radius=-r)
+    return x2, y2, inside.reshape(x2.shape)
+
+
+def strain2d(eb, es, xbi, ybi, xsj, ysj, asj, ci, grid, path=None):
     """Относительные деформации в железобетонном сечении."""
 
     xc = xbi
@@ -20,10 +46,7 @@ def strain2d(eb, es, xbi, ybi, xsj, ysj, asj, ci):
     y_min = np.array(yc[zc == epsmin][:1])[0]
     x_max = np.array(xc[zc == epsmax][:1])[0]
     y_max = np.array(yc[zc == epsmax][:1])[0]
-    x1 = np.linspace(xc.min(), xc.max(), len(xc))
-    y1 = np.linspace(yc.min(), yc.max(), len(yc))
-    x2, y2 = np.meshgrid(x1, y1)
-    z2 = griddata((xc, yc), zc, (x1[None, :], y1[:, None]), method='linear')
+    x2, y2, z2 = grid  # Поле на растре сечения (raster)
     clipindex = ci
     fig, ax = plt.subplots(num=strain2d.__doc__)
     ax.set_xlabel('X, м')
@@ -53,10 +76,10 @@ def strain2d(eb, es, xbi, ybi, xsj, ysj, asj, ci):
     divider = make_axes_locatable(ax)
     cax = divider.append_axes('right', size='10%', pad=0.75)
     plt.colorbar(cont, cax=cax)
-    plt.show()
+    show(fig, path)
 
 
-def stress2d(sb, ss, xbi, ybi, xsj, ysj, asj, ci):
+def stress2d(sb, ss, xbi, ybi, xsj, ysj, asj, ci, grid, path=None):
     """Напряжения в железобетонном сечении, МПа."""
 
     xc = xbi
@@ -68,10 +91,7 @@ def stress2d(sb, ss, xbi, ybi, xsj, ysj, asj, ci):
     y_min = np.array(yc[zc == stressmin][:1])[0]
     x_max = np.array(xc[zc == stressmax][:1])[0]
     y_max = np.array(yc[zc == stressmax][:1])[0]
-    x1 = np.linspace(xc.min(), xc.max(), len(xc))
-    y1 = np.linspace(yc.min(), yc.max(), len(yc))
-    x2, y2 = np.meshgrid(x1, y1)
-    z2 = griddata((xc, yc), zc, (x1[None, :], y1[:, None]), method='linear')
+    x2, y2, z2 = grid  # Поле на растре сечения (raster)
     clipindex = ci
     fig, ax = plt.subplots(num=stress2d.__doc__)
     ax.set_xlabel('X, м')
@@ -101,18 +121,13 @@ def stress2d(sb, ss, xbi, ybi, xsj, ysj, asj, ci):
     divider = make_axes_locatable(ax)
     cax = divider.append_axes('right', size='10%', pad=0.75)
     plt.colorbar(cont, cax=cax)
-    plt.show()
+    show(fig, path)
 
 
-def strain3d(eb, xbi, ybi):
+def strain3d(grid, path=None):
     """Относительные деформации в железобетонном сечении."""
 
-    xc = xbi
-    yc = ybi
-    zc = eb
-    x1 = np.linspace(xc.min(), xc.max(), len(xc))
-    y1 = np.linspace(yc.min(), yc.max(), len(yc))
-    x2, y2 = np.meshgrid(x1, y1)
+    x2, y2, z2 = grid  # Поле на растре сечения (raster)
     fig = plt.figure(num=strain3d.__doc__)
     plt.subplots_adjust(left=0.1, right=0.9, bottom=0.1, top=0.9)
     ax = plt.axes(projection='3d')
@@ -120,24 +135,18 @@ def strain3d(eb, xbi, ybi):
     ax.set_xlabel('X, м')
     ax.set_ylabel('Y, м')
     ax.set_zlabel(zlabel='Относительные деформации')
-    z2 = griddata((xc, yc), zc, (x2, y2), method='linear')
     surf = ax.plot_surface(x2, y2, z2, cmap="rainbow", alpha=0.8, linewidth=1)
     plt.title(strain3d.__doc__, pad=10)
     ax.zaxis.set_major_locator(LinearLocator(10))
     ax.zaxis.set_major_formatter(FormatStrFormatter('%.02f'))
     fig.colorbar(surf, orientation='vertical', shrink=0.5, aspect=5, pad=0.1)
-    plt.show()
+    show(fig, path)
 
 
-def stress3d(sb, xbi, ybi):
+def stress3d(grid, path=None):
     """Напряжения в железобетонном сечении, МПа."""
 
-    xc = xbi
-    yc = ybi
-    zc = sb
-    x1 = np.linspace(xc.min(), xc.max(), len(xc))
-    y1 = np.linspace(yc.min(), yc.max(), len(yc))
-    x2, y2 = np.meshgrid(x1, y1)
+    x2, y2, z2 = grid  # Поле на растре сечения (raster)
     fig = plt.figure(num=stress3d.__doc__)
     plt.subplots_adjust(left=0.1, right=0.9, bottom=0.1, top=0.9)
     ax = plt.axes(projection='3d')
@@ -145,10 +154,9 @@ def stress3d(sb, xbi, ybi):
     ax.set_xlabel('X, м')
     ax.set_ylabel('Y, м')
     ax.set_zlabel(zlabel='Напряжения, МПа')
-    z2 = griddata((xc, yc), zc, (x2, y2), method='linear')
     surf = ax.plot_surface(x2, y2, z2, cmap="rainbow", alpha=0.8, linewidth=1)
     plt.title(stress3d.__doc__, pad=10)
     ax.zaxis.set_major_locator(LinearLocator(10))
     ax.zaxis.set_major_formatter(FormatStrFormatter('%.02f'))
     fig.colorbar(surf, orientation='vertical', shrink=0.5, aspect=5, pad=0.1)
-    plt.show()
+    show(fig, path)
@@ -0,0 +1,105 @@
+import numpy as np
+
+
+def segment(x0, y0, x1, y1):
+    """
+    Вклад направленного отрезка в моменты многоугольника по формуле Грина.
+
+    :param x0: Координаты x начала отрезка, м
+    :param y0: Координаты y начала отрезка, м
+    :param x1: Координаты x конца отрезка, м
+    :param y1: Координаты y конца отрезка, м
+    :return: Вклады в моменты [S, Sx, Sy, Sxx, Sxy, Syy] (..., 6)
+    """
+    c = x0 * y1 - x1 * y0
+    return np.stack((c / 2,
+                     c * (x0 + x1) / 6,
+                     c * (y0 + y1) / 6,
+                     c * (x0 * x0 + x0 * x1 + x1 * x1) / 12,
+                     c * (x0 * y1 + 2 * x0 * y0 + 2 * x1 * y1 + x1 * y0) / 24,
+                     c * (y0 * y0 + y0 * y1 + y1 * y1) / 12), axis=-1)
+
+
+def moments(px, py):
+    """
+    Моменты многоугольника.
+
+    :param px: Координаты x вершин многоугольника (обход против часовой стрелки), м
+    :param py: Координаты y вершин многоугольника, м
+    :return: Моменты [S, Sx, Sy, Sxx, Sxy, Syy] (6,): интегралы 1, x, y, x^2, xy, y^2 по площади
+    """
+    return np.sum(segment(px, py, np.roll(px, -1), np.roll(py, -1)), axis=0)
+
+
+def clip(px, py, u, b):
+    """
+    Моменты части многоугольника, в которой деформации u0 + u1 * x + u2 * y не превышают b.
+
+    Отрезанная часть контура заменяется отрезками линии отсечения, проходящими через точку линии R,
+    поэтому многоугольник может быть невыпуклым.
+
+    :param px: Координаты x вершин многоугольника (обход против часовой стрелки), м
+    :param py: Координаты y вершин многоугольника, м
+    :param u: Векторы общих деформаций, (m, 3)
+    :param b: Уровни деформаций, (m, nb)
+    :return: Моменты [S, Sx, Sy, Sxx, Sxy, Syy] (m, nb, 6)
+    """
+    x0 = px
+    y0 = py
+    x1 = np.roll(px, -1)
+    y1 = np.roll(py, -1)
+    u0 = u[:, 0, None, None]
+    u1 = u[:, 1, None, None]
+    u2 = u[:, 2, None, None]
+    g0 = u0 + u1 * x0 + u2 * y0 - b[..., None]  # Превышение уровня в вершинах (m, nb, V)
+    g1 = u0 + u1 * x1 + u2 * y1 - b[..., None]
+    in0 = g0 <= 0.0
+    in1 = g1 <= 0.0
+    cross = in0 != in1
+    t = np.zeros(g0.shape)
+    np.divide(g0, g0 - g1, out=t, where=cross)
+    cx = x0 + t * (x1 - x0)  # Точки пересечения сторон с линией отсечения
+    cy = y0 + t * (y1 - y0)
+    ax = np.where(in0, x0, cx)
+    ay = np.where(in0, y0, cy)
+    bx = np.where(in1, x1, cx)
+    by = np.where(in1, y1, cy)
+    res = segment(ax, ay, bx, by) * (in0 | in1)[..., None]
+    # Точка линии отсечения, ближайшая к началу координат
+    gg = (u[:, 1] ** 2 + u[:, 2] ** 2)[:, None]
+    k = np.zeros(b.shape)
+    np.divide(b - u[:, 0, None], gg, out=k, where=gg > 0.0)
+    rx = (k * u[:, 1, None])[..., None]
+    ry = (k * u[:, 2, None])[..., None]
+    res += segment(cx, cy, rx, ry) * (in0 & cross)[..., None]  # Выход за линию отсечения
+    res += segment(rx, ry, cx, cy) * (in1 & cross)[..., None]  # Возврат к линии отсечения
+    return np.sum(res, axis=-2)
+
+
+def stress_block(px, py, u, eps, a0, a1):
+    """
+    Точное интегрирование напряжений по многоугольнику при кусочно-линейной диаграмме состояния.
+
+    :param px: Координаты x вершин многоугольника (обход против часовой стрелки), м
+    :param py: Координаты y вершин многоугольника, м
+    :param u: Векторы общих деформаций, (m, 3)
+    :param eps: Точки перелома диаграммы по возрастанию, (nb,)
+    :param a0: Коэффициенты участков s = a0 + a1 * eps, МПа, (nb + 1,)
+    :param a1: Коэффициенты участков, МПа, (nb + 1,)
+    :return: Внутренние усилия (m, 3) [МН, МН*м, МН*м], касательные матрицы жесткости (m, 3, 3)
+    """
+    m = len(u)
+    h = clip(px, py, u, np.broadcast_to(eps, (m, len(eps))))
+    full = np.broadcast_to(moments(px, py), (m, 1, 6))
+    h = np.concatenate((np.zeros((m, 1, 6)), h, full), axis=1)
+    r = np.diff(h, axis=1)  # Моменты участков диаграммы (m, nb + 1, 6)
+    s, sx, sy, sxx, sxy, syy = np.moveaxis(r, -1, 0)
+    c0 = a0 + a1 * u[:, 0, None]  # Напряжения s = c0 + c1 * x + c2 * y на участках
+    c1 = a1 * u[:, 1, None]
+    c2 = a1 * u[:, 2, None]
+    fi = np.stack((np.sum(c0 * s + c1 * sx + c2 * sy, axis=1),
+                   np.sum(c0 * sx + c1 * sxx + c2 * sxy, axis=1),
+                   np.sum(c0 * sy + c1 * sxy + c2 * syy, axis=1)), axis=-1)
+    q = np.einsum('k,mki->mi', a1, r)  # Моменты, взвешенные касательным модулем (m, 6)
+    kt = q[:, [0, 1, 2, 1, 3, 4, 2, 4, 5]].reshape(m, 3, 3)
+    return fi, kt
@@ -1,10 +1,17 @@
 import numpy as np
-from Pynite.LoadCombo import LoadCombo
+import LoadCombos
+from LoadCombos import LoadCombo, LoadCases
 from MemberSection.Rebars import Rebar
 from MemberSection.Shapes import Rectangle
+from MemberSection import Shapes
 import Sigma as Sig
+import Solution
 from Solution import Calculation
 from MemberSection.Results import Result
+from MemberSection import Interaction
+from MemberSection import LoadPath
+from MemberSection import Polygon
+from MemberSection import Sizing
 
 
 class FrameSec:
@@ -17,10 +24,14 @@ class FrameSec:
         self.concrete = concrete  # Данные по бетону
         self.steel = steel  # Данные по стали
         self.rebars = {}  # Словарь арматурных стержней
-        self.Loads = []  # Список нагрузок
+        self.loads = LoadCases(3)  # Нагрузки загружений
         self.loadcombos = {}  # Словарь комбинаций нагрузок
         self.c_p = None  # Свойства бетона
         self.c_g = None  # Свойства геометрии
+        self.seed = None  # Вектор общих деформаций последнего расчета для продолжения
+        self.status = None  # Коды состояния задач последнего расчета (Solution.CONVERGED, ...)
+        self.cond = None  # Числа обусловленности матриц жесткости последней итерации задач
+        self.trace = None  # Журнал сходимости задач последнего расчета (Solution.Trace)
 
     def add_rect_section(self, grade, h, b, nh, nb):
         """
@@ -66,7 +77,7 @@ class FrameSec:
         :param case: Имя загружения, строка
         :return:
         """
-        self.Loads.append((n, mx, my, case))
+        self.loads.add(case, (n, mx, my))
 
     def add_load_combo(self, name, factors, combo_type='strength'):
         """
@@ -82,46 +93,17 @@ class FrameSec:
         # Добавляет комбинацию к словарю
         self.loadcombos[name] = new_combo
 
-    @staticmethod
-    def d(ai, xi, yi, ei, vi):
-        """
-        Жесткостные характеристики поперечного сечения.
-
-        :param ai: Площади, м^2
-        :param xi: Координаты по x, м
-        :param yi: Координаты по y, м
-        :param ei: Mодули упругости, МПа
-        :param vi: Коэффициенты упругости
-        :return: Матрица жесткости
-        """
-        d00 = sum(ai * ei * vi)
-        d11 = sum(ai * xi ** 2 * ei * vi)
-        d22 = sum(ai * yi ** 2 * ei * vi)
-        d01 = sum(ai * xi * ei * vi)
-        d02 = sum(ai * yi * ei * vi)
-        d12 = sum(ai * xi * yi * ei * vi)
-        d = np.array([
-            [d00, d01, d02],
-            [d01, d11, d12],
-            [d02, d12, d22]])
-        return d
-
-    @staticmethod
-    def vi(s, e, eps):
+    def add_load_combos(self, combos):
         """
-        Коэффициент упругости.
+        Добавляет комбинации нагрузок, например созданные генератором LoadCombos.combinations.
 
-        :param s: Напряжение, МПа
-        :param e: Mодуль упругости, МПа
-        :param eps: Относительная деформация
-        :return: Коэффициент упругости
+        :param combos: Комбинации нагрузок (LoadCombo), итерируемый объект
+        :return: Количество добавленных комбинаций
         """
-
-        if eps != 0.0:
-            v = s / e / eps
-        else:
-            v = 1.0
-        return v
+        n = len(self.loadcombos)
+        for combo in combos:
+            self.loadcombos[combo.name] = combo
+        return len(self.loadcombos) - n
 
     def force(self, combo_name):
         """
@@ -130,38 +112,62 @@ class FrameSec:
         :param combo_name: Имя комбинации для вектора нагрузки
         :return: Вектор нагрузки, [МН, МН*м, МН*м]
         """
-        f = np.zeros(3)
-        combo = self.loadcombos[combo_name]
-        for case, factor in combo.factors.items():
-            for load in self.Loads:
-                if load[3] == case:
-                    f[0] += factor * load[0] / 1000
-                    f[1] += factor * load[1] / 1000
-                    f[2] += factor * load[2] / 1000
-        return f
+        return self.forces([combo_name])[0]
 
-    def analyze(self, combo_name, kt, gb3, acc):
+    def forces(self, combo_names=None):
         """
-        Расчет железобетонного сечения.
+        Векторы нагрузки комбинаций: произведение матрицы коэффициентов комбинаций на матрицу нагрузок.
+
+        :param combo_names: Имена комбинаций нагрузок (по умолчанию все)
+        :return: Векторы нагрузки, (m, 3) [МН, МН*м, МН*м]
+        """
+        if combo_names is None:
+            combo_names = self.loadcombos.keys()
+        return self.loads.combine(self.loadcombos[name] for name in combo_names) / 1000
+
+    @staticmethod
+    def dm(zi, wi):
+        """
+        Матрицы жесткости поперечного сечения для пакета задач.
+
+        :param zi: Матрица координат [1, x, y], (n, 3)
+        :param wi: Произведения площадей, модулей упругости и коэффициентов упругости, (m, n)
+        :return: Матрицы жесткости, (m, 3, 3)
+        """
+        return np.einsum('mi,ij,ik->mjk', wi, zi, zi)
+
+    @staticmethod
+    def dj(jb, wi):
+        """
+        Матрицы жесткости от собственных моментов инерции КЭ бетона для пакета задач
+        (напряжения линейны в пределах КЭ).
+
+        :param jb: Собственные моменты инерции КЭ бетона, (n, 2)
+        :param wi: Касательные модули упругости бетона, (m, n)
+        :return: Матрицы жесткости, (m, 3, 3)
+        """
+        d = np.zeros((len(wi), 3, 3))
+        d[:, 1, 1], d[:, 2, 2] = (wi @ jb).T
+        return d
+
+    def diagrams(self, kt, gb3):
+        """
+        Параметры диаграмм состояния бетона.
 
-        :param combo_name: Имя расчетной комбинации нагрузок
         :param kt: Коэффициент учета растяжения бетона
         :param gb3: Коэффициент gb3 бетона
-        :param acc: Точность расчета
-        :return:
+        :return: Относительные деформации и напряжения диаграммы состояния бетона
         """
-
-        vv = np.vectorize(self.vi)
-        vsigmac = np.vectorize(Sig.sigmac)
-        vsigmas = np.vectorize(Sig.sigmas)
         s_b = [self.c_p['Rb'] * gb3, self.c_p['Rb'] * 0.6 * gb3, self.c_p['Rbt'] * 0.6 * kt, self.c_p['Rbt'] * kt]
         e_b = [self.c_p['eb2'], self.c_p['eb0'], s_b[1] / self.c_p['E'], s_b[2] / self.c_p['E'] * kt, self.c_p['ebt0'] * kt, self.c_p['ebt2'] * kt]
-        xbi = self.c_g[0]
-        ybi = self.c_g[1]
-        abi = self.c_g[2]
-        zb = self.c_g[3]
-        n_b = len(xbi)
-        ebi = np.linspace(self.c_p['E'], self.c_p['E'], n_b)
+        return e_b, s_b
+
+    def rebar_arrays(self):
+        """
+        Массивы характеристик арматурных стержней.
+
+        :return: Координаты x, y, площади, модули упругости, параметры диаграмм состояния арматуры
+        """
         xsj = []
         ysj = []
         asj = []
@@ -183,39 +189,492 @@ class FrameSec:
             es0.append(self.rebars[name].st['es0'])
             es2.append(self.rebars[name].st['es2'])
             esj.append(self.rebars[name].st['E'])
-        n_s = len(xsj)
-        zs = np.transpose(np.array([np.ones(n_s), xsj, ysj]))
+        p_s = [np.array(esc2), np.array(esc0), np.array(es0), np.array(es2), np.array(rsc), np.array(rs)]
+        return np.array(xsj), np.array(ysj), np.array(asj), np.array(esj), p_s
+
+    def state(self, kt, gb3, geometry=None, exact=False):
+        """
+        Функция внутренних усилий и касательных матриц жесткости сечения.
+
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param geometry: Геометрия КЭ бетона (по умолчанию self.c_g)
+        :param exact: Точное интегрирование напряжений в бетоне по контуру сечения вместо суммирования по КЭ
+        :return: Функция state(u) -> (внутренние усилия (m, 3) [МН, МН*м, МН*м], касательные матрицы (m, 3, 3))
+        """
+        e_b, s_b = self.diagrams(kt, gb3)
+        g = self.c_g if geometry is None else geometry
+        abi = g[2]
+        zb = g[3]
+        ebi = self.c_p['E']
+        xsj, ysj, asj, esj, p_s = self.rebar_arrays()
+        zs = np.transpose(np.array([np.ones(len(xsj)), xsj, ysj]))
+        px, py = self.section.outline
+        eps, a0, a1 = Sig.conc_segments(*e_b, *s_b, ebi)
+
+        def tangent(u):
+            """Внутренние усилия и касательные матрицы жесткости."""
+            if exact:
+                fb, kb = Polygon.stress_block(px, py, u, eps, a0, a1)
+            else:
+                sb, _, etb = Sig.conc_law(u @ zb.T, *e_b, *s_b, ebi, 1)
+                fb = (sb * abi) @ zb
+                kb = self.dm(zb, abi * etb)
+                if g.jb is not None:
+                    dj = self.dj(g.jb, etb)
+                    fb += np.einsum('mjk,mk->mj', dj, u)
+                    kb += dj
+            ss, _, ets = Sig.steel_law(u @ zs.T, *p_s, esj)
+            return fb + (ss * asj) @ zs, kb + self.dm(zs, asj * ets)
+
+        return tangent
+
+    def elastic(self):
+        """
+        Матрица жесткости сечения с начальными модулями упругости бетона и арматуры.
+
+        :return: Матрица жесткости, (3, 3)
+        """
+        xsj, ysj, asj, esj, p_s = self.rebar_arrays()
+        zs = np.transpose(np.array([np.ones(len(xsj)), xsj, ysj]))
+        g = self.c_g
+        return self.dm(g[3], (g[2] * self.c_p['E'])[None])[0] + self.dm(zs, (asj * esj)[None])[0]
+
+    def iterate(self, f, kt, gb3, acc, method='secant', u0=None, geometry=None, maxit=1000, fallback=None,
+                cmax=None, accel=None):
+        """
+        Итерационный расчет сечения для пакета векторов нагрузки.
+
+        Все задачи пакета решаются одновременно, сошедшиеся задачи исключаются из дальнейших итераций.
+        В режимах 'newton' и 'exact' используется метод Ньютона-Рафсона с касательной матрицей жесткости, задачи,
+        не сошедшиеся этим методом, решаются методом секущих.
+        Коэффициенты упругости определяются вектором общих деформаций, поэтому для продолжения расчета
+        от решенного состояния достаточно задать начальные векторы u0.
+        Расчет не прерывается при вырожденной матрице жесткости или расходимости: коды состояния задач
+        сохраняются в self.status, числа обусловленности (при cmax) - в self.cond. Для несошедшихся задач
+        возвращается вектор общих деформаций последней итерации. Журнал сходимости итераций сохраняется
+        в self.trace.
+
+        :param f: Векторы нагрузки, (m, 3) [МН, МН*м, МН*м]
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param acc: Точность расчета
+        :param method: Метод расчета: 'secant' - секущий модуль, 'newton' - касательный модуль,
+            'exact' - касательный модуль с точным интегрированием напряжений в бетоне по контуру сечения
+        :param u0: Начальные векторы общих деформаций (m, 3), строки NaN - расчет от упругого состояния
+        :param geometry: Геометрия КЭ бетона (по умолчанию self.c_g)
+        :param maxit: Максимальное количество итераций метода секущих
+        :param fallback: Метод решения для вырожденных матриц жесткости: None, 'lstsq', 'regularize'
+        :param cmax: Максимальное число обусловленности матриц жесткости (None - без контроля)
+        :param accel: Ускорение итераций метода секущих: None, 'aitken', 'anderson' (Solution.Acceleration)
+        :return: Векторы общих деформаций (m, 3), количество итераций (m,)
+        """
+
+        e_b, s_b = self.diagrams(kt, gb3)
+        g = self.c_g if geometry is None else geometry
+        abi = g[2]
+        zb = g[3]
+        ebi = np.linspace(self.c_p['E'], self.c_p['E'], len(abi))
+        xsj, ysj, asj, esj, p_s = self.rebar_arrays()
+        zs = np.transpose(np.array([np.ones(len(xsj)), xsj, ysj]))
+        f = np.asarray(f, dtype=float).reshape(-1, 3)
+        m = len(f)
+
+        w_b = np.tile(abi * ebi, (m, 1))
+        w_s = np.tile(asj * esj, (m, 1))
+        d = self.dm(zb, w_b) + self.dm(zs, w_s)
+        if g.jb is not None:
+            d += self.dj(g.jb, np.tile(ebi, (m, 1)))
+        u_e, bad, cond = Calculation.solve(d, f, fallback, cmax)
+        status = np.full(m, Solution.MAXITER)  # Коды состояния задач
+        status[bad & np.any(np.isnan(u_e), axis=1)] = Solution.SINGULAR
+        if u0 is not None:
+            u0 = np.broadcast_to(np.asarray(u0, dtype=float).reshape(-1, 3), f.shape)
+            warm = np.all(np.isfinite(u0), axis=1)
+            u_e = np.where(warm[:, None], u0, u_e)
+            status[warm] = Solution.MAXITER
+        u0 = u_e
+        u = u0.copy()
+        it = np.zeros(m, dtype=int)  # Количество итераций
+        active = status != Solution.SINGULAR  # Несошедшиеся задачи
+        trace = Solution.Trace(m)
+        if method in ('newton', 'exact'):
+            u_n, it, ok = Calculation.newton(self.state(kt, gb3, g, method == 'exact'), u0, f, acc, trace=trace)
+            ok &= active
+            u[ok] = u_n[ok]
+            status[ok] = Solution.CONVERGED
+            active &= ~ok
+        elif method != 'secant':
+            raise ValueError(f"Неизвестный метод расчета '{method}'")
+        n_it = np.zeros(m, dtype=int)  # Количество итераций метода секущих
+        mix = Solution.Acceleration(m, 3, accel)
+        bb = np.full((m, len(abi)), -1, dtype=np.int8)  # Ветви диаграммы бетона в волокнах
+        bs = np.full((m, len(asj)), -1, dtype=np.int8)  # Ветви диаграммы арматуры в стержнях
+        while np.any(active):
+            idx = np.flatnonzero(active)
+            ua = u[idx]
+            eb = ua @ zb.T  # Деформации бетона
+            sb, vb, etb = Sig.conc_law(eb, *e_b, *s_b, ebi, 1)  # Напряжения и коэффициенты упругости бетона
+            es = ua @ zs.T  # Деформации арматуры
+            ss, vs, _ = Sig.steel_law(es, *p_s, esj)  # Напряжения и коэффициенты упругости арматуры
+            d = self.dm(zb, abi * ebi * vb) + self.dm(zs, asj * esj * vs)
+            if g.jb is not None:
+                # Собственные моменты инерции КЭ бетона - с касательным модулем, D(u) u - внутренние усилия
+                dj = self.dj(g.jb, etb)
+                d += dj
+            u_f, bad, cond[idx] = Calculation.solve(d, f[idx], fallback, cmax)  # Векторы общих деформаций
+            fin = np.all(np.isfinite(u_f), axis=1)
+            status[idx[bad & ~fin]] = Solution.SINGULAR
+            # Деформации за пределами физического смысла - нагрузка превышает несущую способность
+            div = ~bad & ~fin | (np.max(np.abs(eb), axis=1) > Solution.EPS_MAX)
+            status[idx[div]] = Solution.DIVERGED
+            du = np.max(abs(ua - u_f), axis=1)
+            fi = (sb * abi) @ zb + (ss * asj) @ zs  # Внутренние усилия
+            if g.jb is not None:
+                fi += np.einsum('mjk,mk->mj', dj, ua)
+            b_b = Sig.conc_branch(eb, *e_b[1:5])
+            b_s = Sig.steel_branch(es, p_s[1], p_s[2])
+            br = np.count_nonzero(b_b != bb[idx], axis=1) + np.count_nonzero(b_s != bs[idx], axis=1)
+            br[n_it[idx] == 0] = 0  # Первая итерация метода секущих
+            bb[idx] = b_b
+            bs[idx] = b_s
+            trace.record(idx, du, np.max(np.abs(f[idx] - fi), axis=1), br)
+            done = fin & ~div & (du < acc)
+            u[idx[done]] = u_f[done]
+            nxt = fin & ~done
+            u[idx[nxt]] = mix.step(idx[nxt], ua[nxt], u_f[nxt])
+            it[idx] += 1
+            n_it[idx] += 1
+            status[idx[done]] = Solution.CONVERGED
+            active[idx[~fin | div | done | (n_it[idx] >= maxit)]] = False
+        self.status = status
+        self.cond = cond
+        self.trace = trace
+        return u, it
+
+    def analyze(self, combo_name, kt, gb3, acc, method='secant', seed=None, refine=0, accel=None, report=False,
+                charts=False):
+        """
+        Расчет железобетонного сечения.
+
+        Таблицы и графики результатов выводятся только по запросу (report, charts) или позднее
+        методами Result.report и Result.charts.
+
+        :param combo_name: Имя расчетной комбинации нагрузок
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param acc: Точность расчета
+        :param method: Метод расчета: 'secant' - секущий модуль, 'newton' - касательный модуль
+        :param seed: Начальный вектор общих деформаций, например self.seed предыдущего расчета
+        :param refine: Количество уровней адаптивного сгущения сетки КЭ бетона (0 - без сгущения)
+        :param accel: Ускорение итераций метода секущих: None, 'aitken', 'anderson'
+        :param report: Вывод таблиц результатов
+        :param charts: Вывод графиков результатов
+        :return: Результаты расчета (Result)
+        """
+
+        e_b, s_b = self.diagrams(kt, gb3)
         f = self.force(combo_name)
-        vbi = np.linspace(1, 1, n_b)
-        vsj = np.linspace(1, 1, n_s)
-        d = self.d(abi, xbi, ybi, ebi, vbi) + self.d(np.array(asj), np.array(xsj), np.array(ysj), np.array(esj), vsj)
-        u = Calculation.calc(d, f)  # Вектор общих деформаций
-        eb = zb.dot(u)  # Деформации бетона
-        sb = vsigmac(eb, *e_b, *s_b, ebi, 1)  # Напряжения в бетоне
-        es = zs.dot(u)  # Деформации арматуры
-        ss = np.zeros(n_s)  # Напряжения в арматуре
-        for i in range(n_s):
-            ss[i] = Sig.sigmas(es[i], esc2[i], esc0[i], es0[i], es2[i], rsc[i], rs[i], esj[i])
-        du = 0.1
-        it = 0
-        while du >= acc:
-            it += 1
-            vb = vv(sb, ebi, eb)
-            vs = vv(ss, esj, es)
-            d = self.d(abi, xbi, ybi, ebi, vb) + self.d(np.array(asj), np.array(xsj), np.array(ysj), np.array(esj), vs)
-            u_f = Calculation.calc(d, f)  # Вектор общих деформаций
-            eb = zb.dot(u_f)  # Деформации бетона
-            sb = vsigmac(eb, *e_b, *s_b, ebi, 1)  # Напряжения в бетоне
-            es = zs.dot(u_f)  # Деформации арматуры
-            ss = np.zeros(n_s)  # Напряжения в арматуре
-            for i in range(n_s):
-                ss[i] = Sig.sigmas(es[i], esc2[i], esc0[i], es0[i], es2[i], rsc[i], rs[i], esj[i])
-            du = np.max(abs(u - u_f))
-            u = u_f  # Вектор общих деформаций
-        print('Решение получено')
-        print('Выполнено', it, 'итераций')
-        print('Бетон класса:', self.section.grade)
-        print('Коэффициент работы бетона на растяжение: ', kt)
-        print('Коэффициент gb3: ', gb3)
-        res = Result(vsigmac, vsigmas, self.section, self.rebars)
-        res.results(f, u, abi, xbi, ybi, e_b, eb, s_b, sb, asj, xsj, ysj, es, ss, self.c_g, self.c_p)
+        if refine:
+            u, it, g = self.adaptive(f, kt, gb3, acc, method, refine, accel=accel)
+        else:
+            u, it = self.iterate(f, kt, gb3, acc, method, seed, accel=accel)
+            g = self.c_g
+        status = int(self.status[0])
+        u = u[0]  # Вектор общих деформаций
+        xsj, ysj, asj, esj, p_s = self.rebar_arrays()
+        zs = np.transpose(np.array([np.ones(len(xsj)), xsj, ysj]))
+        with np.errstate(invalid='ignore', over='ignore'):
+            eb = g[3] @ u  # Деформации бетона
+            sb = Sig.conc_law(eb, *e_b, *s_b, self.c_p['E'], 1)[0]  # Напряжения в бетоне
+            es = zs @ u  # Деформации арматуры
+            ss = Sig.steel_law(es, *p_s, esj)[0]  # Напряжения в арматуре
+        if status == Solution.CONVERGED:
+            self.seed = u
+            for rebar, e, s in zip(self.rebars.values(), es, ss):
+                rebar.strain = e
+                rebar.stress = s
+        res = Result(combo_name, status, int(it[0]), f, u, g[:5], eb, sb, (xsj, ysj, asj), es, ss,
+                     (e_b, s_b, self.c_p['E']))
+        if report:
+            res.report(self, kt, gb3)
+        if charts:
+            res.charts(self)
+        return res
+
+    def adaptive(self, f, kt, gb3, acc, method='secant', levels=2, r=3, accel=None):
+        """
+        Расчет с адаптивным сгущением сетки КЭ бетона.
+
+        Сечение рассчитывается на исходной сетке, затем ячейки, в которых плоскость деформаций пересекает
+        точки перелома диаграммы состояния бетона, разбиваются на r x r ячеек, и расчет продолжается
+        от полученного решения. В остальных ячейках напряжения постоянны или линейны и интегрируются точно
+        с учетом собственных моментов инерции ячеек (Shapes.cell_geometry), поэтому погрешность определяется
+        разбитыми ячейками и уменьшается примерно в r^2 раз на каждом уровне сгущения. Для пакета задач
+        сгущается объединение отмеченных ячеек.
+
+        :param f: Векторы нагрузки, (m, 3) [МН, МН*м, МН*м]
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param acc: Точность расчета
+        :param method: Метод расчета: 'secant' - секущий модуль, 'newton' - касательный модуль
+        :param levels: Количество уровней сгущения
+        :param r: Число делений ячейки по каждому направлению на уровне сгущения
+        :param accel: Ускорение итераций метода секущих: None, 'aitken', 'anderson'
+        :return: Векторы общих деформаций (m, 3), количество итераций (m,), геометрия КЭ бетона
+        """
+        e_b, s_b = self.diagrams(kt, gb3)
+        eps = np.unique(e_b[1:5])  # Точки перелома диаграммы: eb0, eb1, ebt1, ebt0
+        sec = self.section
+        cl = Shapes.cells(sec.h, sec.b, sec.nh, sec.nb)
+        g = self.c_g
+        u, it = self.iterate(f, kt, gb3, acc, method, accel=accel)
+        trace = self.trace
+        for _ in range(levels):
+            mask = Shapes.crossing(cl, u[self.status == Solution.CONVERGED], eps)
+            if not np.any(mask):
+                break
+            cl = Shapes.split(cl, mask, r)
+            g = Shapes.cell_geometry(sec.h, sec.b, sec.nh, sec.nb, cl)
+            u, it_r = self.iterate(f, kt, gb3, acc, method, u, g, accel=accel)
+            it += it_r
+            trace.extend(np.arange(len(it)), self.trace)
+        self.trace = trace
+        return u, it, g
+
+    def continuation(self, f, kt, gb3, acc, method='secant', levels=2, accel=None, tol=0.1):
+        """
+        Пакетный расчет с продолжением: задачи упорядочиваются по близости векторов нагрузки,
+        задача рассчитывается от решения ближайшей решенной задачи, если их векторы нагрузки близки
+        (Calculation.waves) и невязка от этого решения меньше невязки от упругого решения (Calculation.closer),
+        иначе - от упругого состояния.
+
+        :param f: Векторы нагрузки, (m, 3) [МН, МН*м, МН*м]
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param acc: Точность расчета
+        :param method: Метод расчета: 'secant' - секущий модуль, 'newton' - касательный модуль
+        :param levels: Количество волн расчета
+        :param accel: Ускорение итераций метода секущих: None, 'aitken', 'anderson'
+        :param tol: Наибольшее относительное расстояние нормированных векторов нагрузки для продолжения
+        :return: Векторы общих деформаций (m, 3), количество итераций (m,)
+        """
+        f = np.asarray(f, dtype=float).reshape(-1, 3)
+        u = np.full(f.shape, np.nan)
+        it = np.zeros(len(f), dtype=int)
+        status = np.full(len(f), Solution.MAXITER)
+        cond = np.full(len(f), np.nan)
+        trace = Solution.Trace(len(f))
+        tangent = self.state(kt, gb3)
+        d0 = self.elastic()
+        for rows, parents in Calculation.waves(f, levels, tol):
+            warm = (parents >= 0) & (status[parents] == Solution.CONVERGED)
+            if np.any(warm):
+                fw = f[rows[warm]]
+                r1 = fw - tangent(u[parents[warm]])[0]
+                r0 = fw - tangent(np.linalg.solve(d0, fw.T).T)[0]
+                warm[warm] = Calculation.closer(f, r1, r0)
+            u0 = np.where(warm[:, None], u[parents], np.nan)
+            u[rows], it[rows] = self.iterate(f[rows], kt, gb3, acc, method, u0, accel=accel)
+            status[rows] = self.status
+            cond[rows] = self.cond
+            trace.extend(rows, self.trace)
+        self.status = status
+        self.cond = cond
+        self.trace = trace
+        return u, it
+
+    def screen(self, kt, gb3, combo_names=None):
+        """
+        Оценка использования предельных деформаций комбинациями по линейному упругому расчету.
+
+        Матрица жесткости сечения с начальными модулями упругости собирается один раз, решения для
+        загружений суммируются по коэффициентам комбинаций (принцип суперпозиции). Оценка - наибольшее
+        отношение деформаций в вершинах контура бетона к eb2 и деформаций арматуры к esc2, es2.
+
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param combo_names: Имена комбинаций нагрузок (по умолчанию все)
+        :return: Оценки использования предельных деформаций, (m,)
+        """
+        if combo_names is None:
+            combo_names = list(self.loadcombos.keys())
+        e_b, s_b = self.diagrams(kt, gb3)
+        xsj, ysj, asj, esj, p_s = self.rebar_arrays()
+        zs = np.transpose(np.array([np.ones(len(xsj)), xsj, ysj]))
+        u_cases = np.linalg.solve(self.elastic(), self.loads.matrix.T / 1000).T  # Решения для загружений
+        u = self.loads.combine((self.loadcombos[name] for name in combo_names), u_cases)
+        px, py = self.section.outline
+        eb = u @ np.array([np.ones(len(px)), px, py])  # Деформации в вершинах контура бетона
+        es = u @ zs.T  # Деформации арматуры
+        with np.errstate(invalid='ignore'):
+            util = np.max(eb / e_b[0], axis=1, initial=0.0)
+            if len(xsj):
+                util = np.maximum(util, np.max(np.maximum(es / p_s[0], es / p_s[3]), axis=1))
+        return util
+
+    def analyze_combos(self, kt, gb3, acc, combo_names=None, method='secant', warm=False, accel=None, top=None,
+                       threshold=None, report=False):
+        """
+        Пакетный расчет железобетонного сечения на несколько комбинаций нагрузок.
+
+        При заданных top или threshold нелинейный расчет выполняется только для определяющих комбинаций
+        по линейному упругому расчету (screen), остальные комбинации получают код состояния Solution.SKIPPED
+        и векторы общих деформаций NaN. Коды состояния всех комбинаций сохраняются в self.status.
+
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param acc: Точность расчета
+        :param combo_names: Имена расчетных комбинаций нагрузок (по умолчанию все)
+        :param method: Метод расчета: 'secant' - секущий модуль, 'newton' - касательный модуль
+        :param warm: Расчет с продолжением от ближайших решенных комбинаций
+        :param accel: Ускорение итераций метода секущих: None, 'aitken', 'anderson'
+        :param top: Количество комбинаций с наибольшими оценками линейного расчета для нелинейного расчета
+        :param threshold: Минимальная оценка линейного расчета для нелинейного расчета комбинации
+        :param report: Вывод сводки расчета
+        :return: Словарь векторов общих деформаций по комбинациям
+        """
+        if combo_names is None:
+            combo_names = list(self.loadcombos.keys())
+        f = self.forces(combo_names)
+        m = len(f)
+        keep = np.ones(m, dtype=bool)
+        if top is not None or threshold is not None:
+            keep = LoadCombos.governing(self.screen(kt, gb3, combo_names), top, threshold)
+        rows = np.flatnonzero(keep)
+        u = np.full(f.shape, np.nan)
+        it = np.zeros(m, dtype=int)
+        status = np.full(m, Solution.SKIPPED)
+        cond = np.full(m, np.nan)
+        trace = Solution.Trace(m)
+        if len(rows):
+            if warm:
+                u[rows], it[rows] = self.continuation(f[rows], kt, gb3, acc, method, accel=accel)
+            else:
+                u[rows], it[rows] = self.iterate(f[rows], kt, gb3, acc, method, accel=accel)
+            status[rows] = self.status
+            cond[rows] = self.cond
+            trace.extend(rows, self.trace)
+        self.status = status
+        self.cond = cond
+        self.trace = trace
+        if report:
+            if len(rows) < m:
+                print('Пропущено по линейному расчету', m - len(rows), 'из', m, 'комбинаций')
+            print('Решение получено для', np.count_nonzero(status == Solution.CONVERGED), 'из', len(rows),
+                  'комбинаций')
+            print('Выполнено не более', np.max(it, initial=0), 'итераций, всего', np.sum(it))
+            for code in np.unique(status[(status != Solution.CONVERGED) & (status != Solution.SKIPPED)]):
+                print('Решение не получено:', Solution.STATUS[code], '-', np.count_nonzero(status == code),
+                      'комбинаций')
+        return dict(zip(combo_names, u))
+
+    def check_combos(self, kt, gb3, acc, combo_names=None, method='secant', accel=None, report=False):
+        """
+        Проверка несущей способности сечения на комбинации нагрузок с отсечением по выпуклой оболочке
+        векторов нагрузки (LoadCombos.prune).
+
+        Комбинация проходит проверку, если решение получено и деформации бетона и арматуры
+        не превышают предельных (LoadPath.limits).
+
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param acc: Точность расчета
+        :param combo_names: Имена расчетных комбинаций нагрузок (по умолчанию все)
+        :param method: Метод расчета: 'secant' - секущий модуль, 'newton' - касательный модуль
+        :param accel: Ускорение итераций метода секущих: None, 'aitken', 'anderson'
+        :param report: Вывод сводки расчета
+        :return: Словарь признаков прохождения проверки по комбинациям
+        """
+        if combo_names is None:
+            combo_names = list(self.loadcombos.keys())
+        limit = LoadPath.limits(self, kt, gb3)
+
+        def check(f):
+            u, it = self.iterate(f, kt, gb3, acc, method, accel=accel)
+            return (self.status == Solution.CONVERGED) & limit(u)
+
+        ok, done = LoadCombos.prune(self.forces(combo_names), check)
+        if report:
+            print('Рассчитано', np.count_nonzero(done), 'из', len(combo_names), 'комбинаций, не прошли проверку',
+                  np.count_nonzero(~ok))
+        return dict(zip(combo_names, ok))
+
+    def interaction(self, kt, gb3, na=36, nd=60, workers=None):
+        """
+        Поверхность взаимодействия N-Mx-My сечения.
+
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param na: Количество углов нейтральной оси
+        :param nd: Количество положений нейтральной оси для каждого угла
+        :param workers: Количество процессов (1 - расчет в текущем процессе, None - по объему расчета)
+        :return: Поверхность взаимодействия
+        """
+        return Interaction.surface(self, kt, gb3, na, nd, workers)
+
+    def size_rebars(self, kt, gb3, acc, grade='A500', cover=50, combo_names=None, diameters=Sizing.DIAMETERS,
+                    counts=range(2, 7), method='secant', workers=None, report=False):
+        """
+        Подбор армирования прямоугольного сечения минимальной площади стержнями по периметру (Sizing.optimize).
+
+        Подобранные стержни заменяют арматурные стержни сечения.
+
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param acc: Точность расчета
+        :param grade: Класс арматуры
+        :param cover: Расстояние от грани сечения до центра стержня, мм
+        :param combo_names: Имена расчетных комбинаций нагрузок (по умолчанию все)
+        :param diameters: Диаметры стержней, мм
+        :param counts: Количество стержней вдоль грани (не менее 2)
+        :param method: Метод расчета: 'secant' - секущий модуль, 'newton' - касательный модуль
+        :param workers: Количество процессов (1 - расчет в текущем процессе, None - по объему расчета)
+        :param report: Вывод сводки расчета
+        :return: Вариант армирования (ds, nx, ny) или None, площадь армирования, мм^2
+        """
+        layout, area, evaluated = Sizing.optimize(self, kt, gb3, acc, grade, cover, combo_names, diameters, counts,
+                                                  method, workers)
+        if layout is not None:
+            Sizing.place(self, grade, layout, cover)
+        if report:
+            print('Рассчитано', evaluated, 'вариантов армирования')
+            if layout is None:
+                print('Ни один вариант армирования не прошел проверку')
+            else:
+                print('Стержни d =', layout[0], 'мм:', layout[1], 'x', layout[2], ', площадь', round(area, 1),
+                      'мм^2')
+        return layout, area
+
+    def moment_curvature(self, n, kt, gb3, theta=0.0, kmax=None, steps=50, acc=1e-9):
+        """
+        Диаграммы момент-кривизна сечения при постоянных продольных силах.
+
+        :param n: Продольные силы, кН (+ растяжение), число или массив
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param theta: Угол направления кривизны в плоскости (u1, u2), радиан
+        :param kmax: Максимальная кривизна, 1/м
+        :param steps: Количество шагов при постоянном шаге кривизны
+        :param acc: Точность расчета
+        :return: Траектории нагружения (LoadPath.Path), параметр нагружения - кривизна, 1/м
+        """
+        return LoadPath.moment_curvature(self, n, kt, gb3, theta, kmax, steps, acc)
+
+    def load_path(self, kt, gb3, combo_names=None, steps=20, acc=1e-9):
+        """
+        Пропорциональное нагружение сечения до комбинаций нагрузок.
+
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param combo_names: Имена расчетных комбинаций нагрузок (по умолчанию все)
+        :param steps: Количество шагов при постоянном шаге нагружения
+        :param acc: Точность расчета
+        :return: Словарь траекторий нагружения по комбинациям (LoadPath.Path с одной задачей)
+        """
+        if combo_names is None:
+            combo_names = list(self.loadcombos.keys())
+        f = self.forces(combo_names)
+        path = LoadPath.load_path(self, f, kt, gb3, steps, acc)
+        return {name: LoadPath.Path(path.t[i:i + 1], path.u[i:i + 1], path.f[i:i + 1], path.it[i:i + 1],
+                                    path.complete[i:i + 1]) for i, name in enumerate(combo_names)}
@@ -1,97 +1,136 @@
 import numpy as np
-from prettytable import PrettyTable
-import MemberSection.Mcharts as Mch
-import Ccharts as Cch
+from Solution import CONVERGED, STATUS
 
 
 class Result:
-    """Класс представляющий результаты расчета"""
+    """Класс представляющий результаты расчета сечения"""
 
-    def __init__(self, vsigmac, vsigmas, section, rebars):
+    def __init__(self, combo, status, it, f, u, geometry, eb, sb, rebars, es, ss, diagrams):
         """
         Инициализация результатов расчета.
 
-        :param vsigmac: Векторизованная функция бетона
-        :param vsigmas: Векторизованная функция арматуры
-        :param section: Бетонное сечение
-        :param rebars: Арматурные стержни
+        :param combo: Имя расчетной комбинации нагрузок
+        :param status: Код состояния расчета (Solution.CONVERGED, ...)
+        :param it: Количество итераций
+        :param f: Вектор нагрузки, [МН, МН*м, МН*м]
+        :param u: Вектор общих деформаций
+        :param geometry: Геометрия КЭ бетона (x, y, площади, матрица [1, x, y], контуры КЭ)
+        :param eb: Относительные деформации КЭ бетона
+        :param sb: Напряжения в КЭ бетона, МПа
+        :param rebars: Арматурные стержни (x, y, площади)
+        :param es: Относительные деформации арматурных стержней
+        :param ss: Напряжения в арматурных стержнях, МПа
+        :param diagrams: Параметры диаграммы состояния бетона (e_b, s_b, E)
         """
-        self.vsigmac = vsigmac
-        self.vsigmas = vsigmas
-        self.section = section
-        self.rebars = rebars
+        self.combo = combo
+        self.status = status
+        self.it = it
+        self.f = f
+        self.u = u
+        self.xbi, self.ybi, self.abi, zb, self.ci = geometry
+        self.eb = eb
+        self.sb = sb
+        self.xsj, self.ysj, self.asj = rebars
+        self.es = es
+        self.ss = ss
+        self.e_b, self.s_b, self.ebi = diagrams
+        # Внутренние усилия, [МН, МН*м, МН*м]
+        self.fi = (sb * self.abi) @ zb + (ss * self.asj) @ np.column_stack((np.ones(len(es)), self.xsj, self.ysj))
 
-    def results(self, f, u, abi, xbi, ybi, e_b, eb, s_b, sb, asj, xsj, ysj, es, ss, c_g, c_p):
+    @property
+    def converged(self):
+        """Признак получения решения"""
+        return self.status == CONVERGED
+
+    @property
+    def residual(self):
+        """Невязка внутренних усилий и нагрузки, [МН, МН*м, МН*м]"""
+        return self.fi - self.f
+
+    def report(self, fs, kt, gb3):
         """
-        Вывод результатов расчета.
+        Вывод таблиц результатов расчета.
 
-        :param f: Вектор нагрузки
-        :param u: Вектор деформаций
-        :param abi: Площади КЭ бетона
-        :param xbi: Координаты x КЭ бетона
-        :param ybi: Координаты y КЭ бетона
-        :param e_b: Относительные деформации бетона
-        :param eb: Результаты относительных деформаций бетона
-        :param s_b: Напряжения бетона
-        :param sb: Результаты напряжений бетона
-        :param asj: Площади арматурных стержней
-        :param xsj: Координаты x арматурных стержней
-        :param ysj: Координаты y арматурных стержней
-        :param es: Результаты относительных деформаций арматуры
-        :param ss: Результаты напряжений арматуры
-        :param c_g: Геометрия КЭ бетона
-        :param c_p: Свойства бетона
+        :param fs: Поперечное сечение жб стержневого КЭ (FrameSec)
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
         :return:
         """
-        i = 0
-        for name in self.rebars.keys():
-            self.rebars[name].strain = es[i]
-            self.rebars[name].stress = ss[i]
-            i += 1
-        ep = np.zeros(2)
-        sp = np.zeros(2)
-        ep[0] = round(min(eb), 6)
-        ep[1] = round(max(es), 6)
-        sp[0] = round(min(sb), 6)
-        sp[1] = round(max(ss), 6)
+        from prettytable import PrettyTable
+
+        if not self.converged:
+            print('Решение не получено:', STATUS[self.status])
+            print('Выполнено', self.it, 'итераций')
+            return
+        print('Решение получено')
+        print('Выполнено', self.it, 'итераций')
+        print('Бетон класса:', fs.section.grade)
+        print('Коэффициент работы бетона на растяжение: ', kt)
+        print('Коэффициент gb3: ', gb3)
         print('Относительные деформации, напряжения [МПа]:')
         df = PrettyTable(['Значение', 'Бетон[min]', 'Арматура[max]'])
-        df.add_row(['Деформации', ep[0], ep[1]])
-        df.add_row(['Напряжения', sp[0], sp[1]])
+        df.add_row(['Деформации', round(np.min(self.eb), 6), round(np.max(self.es), 6)])
+        df.add_row(['Напряжения', round(np.min(self.sb), 6), round(np.max(self.ss), 6)])
         print(df)
         print('Проверка:')
         nr = 8
-        cloads = np.round(1000 * np.array((sum(sb * np.array(abi)) + sum(ss * np.array(asj)),
-                                           sum(sb * np.array(abi) * np.array(xbi)) + sum(
-                                               ss * np.array(asj) * np.array(xsj)),
-                                           sum(sb * np.array(abi) * np.array(ybi)) + sum(
-                                               ss * np.array(asj) * np.array(ysj)))), nr)
+        f = np.round(self.f * 1000, nr)
+        cloads = np.round(self.fi * 1000, nr)
+        u = np.round(self.u, nr)
         ptl = PrettyTable(["Нагрузка", "N, кН", "Mx, кН*м", "My, кН*м"])
-        ptl.add_row(["Заданная", np.round(f[0] * 1000, nr), np.round(f[1] * 1000, nr), np.round(f[2] * 1000, nr)])
-        ptl.add_row(["Полученная", cloads[0], cloads[1], cloads[2]])
-        ptl.add_row(["u", np.round(u[0], nr), np.round(u[1], nr), np.round(u[2], nr)])
+        ptl.add_row(["Заданная", *f])
+        ptl.add_row(["Полученная", *cloads])
+        ptl.add_row(["u", *u])
         print(ptl)
         print('Арматурные стержни:')
         ptr = PrettyTable(["Имя", "X, мм", "Y, мм", "Диаметр, мм", "Класс", "Деформации", "Напряжения, МПа"])
-        for i in self.rebars:
-            ptr.add_row(
-                [i, self.rebars[i].x * 1000, self.rebars[i].y * 1000, self.rebars[i].ds * 1000, self.rebars[i].grade,
-                 np.round(self.rebars[i].strain, 6), np.round(self.rebars[i].stress, 2)])
+        for (name, rebar), e, s in zip(fs.rebars.items(), self.es, self.ss):
+            ptr.add_row([name, rebar.x * 1000, rebar.y * 1000, rebar.ds * 1000, rebar.grade, np.round(e, 6),
+                         np.round(s, 2)])
         print(ptr)
-        arge = [eb, es, xbi, ybi, np.array(xsj), np.array(ysj), np.array(asj), c_g[4]]
-        args = [sb, ss, xbi, ybi, np.array(xsj), np.array(ysj), np.array(asj), c_g[4]]
-        sigmac = self.vsigmac(e_b, *e_b, *s_b, c_p['E'], 1)  # Напряжения в бетоне для диаграммы состояния
-        Cch.loads('MemberSection/member_section.png')  # Правило знаков нагрузок
-        Cch.strainstress(e_b, sigmac, self.section.grade)  # Диаграмма состояния бетона
-        rbrs = {}  # Словарь арматурных стержней с уникальными классами
-        for key in self.rebars.keys():
-            rbrs[self.rebars[key].grade] = self.rebars[key]
-        for key in rbrs.keys():
-            s_s = [rbrs[key].st['Rsc'], rbrs[key].st['Rs']]
-            e_s = [rbrs[key].st['esc2'], rbrs[key].st['esc0'], rbrs[key].st['es0'], rbrs[key].st['es2']]
-            sigmas = self.vsigmas(e_s, *e_s, *s_s, rbrs[key].st['E'])
-            Cch.strainstress(e_s, sigmas, key)  # Диаграмма состояния арматуры
-        Mch.strain2d(*arge)  # График деформаций в сечении 2D
-        Mch.strain3d(eb, xbi, ybi)  # График деформаций в сечении 3D
-        Mch.stress2d(*args)  # График напряжений в сечении 2D
-        Mch.stress3d(sb, xbi, ybi)  # График напряжений в сечении 3D
+
+    def figures(self, fs):
+        """
+        Графики результатов расчета для вывода на экран или в файлы (Export.export).
+
+        :param fs: Поперечное сечение жб стержневого КЭ (FrameSec)
+        :return: Список графиков [(имя, функция, аргументы)]
+        """
+        import MemberSection.Mcharts as Mch
+        import Ccharts as Cch
+        import Sigma as Sig
+
+        # Поля деформаций u0 + u1 * x + u2 * y и напряжений на общем растре сечения
+        x2, y2, inside = Mch.raster(*fs.section.outline)
+        e2 = self.u[0] + self.u[1] * x2 + self.u[2] * y2
+        s2 = Sig.conc_law(e2, *self.e_b, *self.s_b, self.ebi, 1)[0]
+        strain = x2, y2, np.where(inside, e2, np.nan)
+        stress = x2, y2, np.where(inside, s2, np.nan)
+        arge = (self.eb, self.es, self.xbi, self.ybi, self.xsj, self.ysj, self.asj, self.ci, strain)
+        args = (self.sb, self.ss, self.xbi, self.ybi, self.xsj, self.ysj, self.asj, self.ci, stress)
+        sigmac = Sig.vsigmac(self.e_b, *self.e_b, *self.s_b, self.ebi, 1)  # Напряжения в бетоне для диаграммы
+        figs = [('loads', Cch.loads, ('MemberSection/member_section.png',)),  # Правило знаков нагрузок
+                (fs.section.grade, Cch.strainstress, (self.e_b, sigmac, fs.section.grade))]  # Диаграмма бетона
+        rbrs = {rebar.grade: rebar for rebar in fs.rebars.values()}  # Стержни с уникальными классами
+        for key, rebar in rbrs.items():
+            s_s = [rebar.st['Rsc'], rebar.st['Rs']]
+            e_s = [rebar.st['esc2'], rebar.st['esc0'], rebar.st['es0'], rebar.st['es2']]
+            sigmas = Sig.vsigmas(e_s, *e_s, *s_s, rebar.st['E'])
+            figs.append((key, Cch.strainstress, (e_s, sigmas, key)))  # Диаграмма состояния арматуры
+        figs += [('strain2d', Mch.strain2d, arge),  # График деформаций в сечении 2D
+                 ('strain3d', Mch.strain3d, (strain,)),  # График деформаций в сечении 3D
+                 ('stress2d', Mch.stress2d, args),  # График напряжений в сечении 2D
+                 ('stress3d', Mch.stress3d, (stress,))]  # График напряжений в сечении 3D
+        return figs
+
+    def charts(self, fs):
+        """
+        Графики результатов расчета.
+
+        :param fs: Поперечное сечение жб стержневого КЭ (FrameSec)
+        :return:
+        """
+        if not self.converged:
+            return
+        for name, func, args in self.figures(fs):
+            func(*args)
@@ -1,6 +1,78 @@
+from collections import namedtuple
 import numpy as np
 
 
+_meshes = {}  # Сетки КЭ прямоугольных сечений по (h, b, nh, nb)
+
+
+class Geometry(namedtuple('Geometry', ['xbi', 'ybi', 'abi', 'zb', 'ci', 'a', 'ix', 'iy', 'jb'], defaults=(None,))):
+    """
+    Геометрические характеристики бетонного сечения.
+
+    xbi, ybi - координаты КЭ бетона и точек контура, м; abi - площади КЭ бетона (0 для точек контура), м^2;
+    zb - матрица [1, x, y] КЭ бетона; ci - номера угловых точек контура; a - площадь, м^2;
+    ix, iy - моменты инерции, м^4; jb - собственные моменты инерции КЭ бетона относительно их центров
+    a*dx^2/12, a*dy^2/12, (n, 2) м^4 (None - не учитываются).
+    """
+    __slots__ = ()
+
+
+def frozen(a):
+    """
+    Непрерывный массив только для чтения.
+
+    :param a: Массив
+    :return: Массив
+    """
+    a = np.ascontiguousarray(a)
+    a.flags.writeable = False
+    return a
+
+
+def mesh(h, b, nh, nb):
+    """
+    Сетка КЭ прямоугольного сечения.
+
+    :param h: Высота сечения, м
+    :param b: Ширина сечения, м
+    :param nh: Число КЭ по высоте сечения
+    :param nb: Число КЭ по ширине сечения
+    :return: Геометрические характеристики прямоугольного сечения (Geometry)
+    """
+    key = (h, b, nh, nb)
+    g = _meshes.get(key)
+    if g is not None:
+        return g
+    dh = h / nh
+    db = b / nb
+    ab = dh * db
+    n = nh * nb
+    ab_i = np.full(n, ab)
+    # КЭ нумеруются по высоте сечения внутри каждого столбца по ширине
+    xs = np.tile(-h / 2 + dh * np.arange(nh) + dh / 2, nb)
+    ys = np.repeat(-b / 2 + db * np.arange(nb) + db / 2, nh)
+    # Точки контура сечения
+    xb1_2 = np.linspace(-h / 2, h / 2, nh + 1)
+    yb1_2 = np.full(nh + 1, -b / 2)
+    xb2_4 = np.full(max(nb - 2, 0), h / 2)
+    yb2_4 = np.linspace(-b / 2 + db, b / 2 - db, max(nb - 2, 0))
+    xb4_3 = np.linspace(h / 2, -h / 2, nh + 1)
+    yb4_3 = np.full(nh + 1, b / 2)
+    xb3_1 = np.full(max(nb - 2, 0), -h / 2)
+    yb3_1 = np.linspace(b / 2 - db, -b / 2 + db, max(nb - 2, 0))
+    abi = np.concatenate([ab_i, np.zeros(2 * (len(xb1_2) + len(xb2_4)))])
+    xbi = np.concatenate([xs, xb1_2, xb2_4, xb4_3, xb3_1])
+    ybi = np.concatenate([ys, yb1_2, yb2_4, yb4_3, yb3_1])
+    a = np.sum(abi)
+    ix = np.sum(ab_i * ys ** 2)
+    iy = np.sum(ab_i * xs ** 2)
+    ci = np.array([n, n + nh, n + nh + nb - 1, n + 2 * nh + nb - 1])
+    zb = np.column_stack((np.ones(len(xbi)), xbi, ybi))
+    g = Geometry(frozen(xbi), frozen(ybi), frozen(abi), frozen(zb), frozen(ci), a, ix, iy)
+    _meshes[key] = g
+    return g
+
+
 class Rectangle:
     """Класс представляющий бетонное прямоугольное сечение"""
 
@@ -29,39 +101,109 @@ class Rectangle:
         c = self.concrete[self.grade]
         return c
 
+    @property
+    def outline(self):
+        """Вершины контура сечения (обход против часовой стрелки): координаты x, y, м"""
+
+        return (np.array([-self.h / 2, self.h / 2, self.h / 2, -self.h / 2]),
+                np.array([-self.b / 2, -self.b / 2, self.b / 2, self.b / 2]))
+
     @property
     def conc_geometry(self):
         """
         Геометрические характеристики прямоугольного сечения.
 
-        :return: Геометрические характеристики прямоугольного сечения
+        Сетка КЭ бетона строится один раз для каждого сочетания (h, b, nh, nb) и используется совместно
+        всеми сечениями, массивы доступны только для чтения.
+
+        :return: Геометрические характеристики прямоугольного сечения (Geometry)
         """
 
-        dh = self.h / self.nh
-        db = self.b / self.nb
-        ab = dh * db
-        nb = self.nh * self.nb
-        ab_i = np.linspace(ab, ab, nb)
-        secb = np.zeros((nb, 2))
-        for i in range(0, self.nb):
-            for j in range(0, self.nh):
-                secb[j + i * self.nh, 0] = -self.h / 2 + dh * j + dh / 2
-                secb[j + i * self.nh, 1] = -self.b / 2 + db * i + db / 2
-        xb1_2 = np.linspace(-self.h / 2, self.h / 2, self.nh + 1)
-        yb1_2 = np.linspace(-self.b / 2, -self.b / 2, self.nh + 1)
-        xb2_4 = np.linspace(self.h / 2, self.h / 2, self.nb - 2)
-        yb2_4 = np.linspace(-self.b / 2 + db, self.b / 2 - db, self.nb - 2)
-        xb4_3 = np.linspace(self.h / 2, -self.h / 2, self.nh + 1)
-        yb4_3 = np.linspace(self.b / 2, self.b / 2, self.nh + 1)
-        xb3_1 = np.linspace(-self.h / 2, -self.h / 2, self.nb - 2)
-        yb3_1 = np.linspace(self.b / 2 - db, -self.b / 2 + db, self.nb - 2)
-        abi = np.hstack([ab_i, np.zeros(2 * (len(xb1_2) + len(xb2_4)))])
-        xbi = np.hstack([secb[:, 0], xb1_2, xb2_4, xb4_3, xb3_1])
-        ybi = np.hstack([secb[:, 1], yb1_2, yb2_4, yb4_3, yb3_1])
-        a = np.sum(abi)
-        ix = np.sum(ab_i * secb[:, 1] ** 2)
-        iy = np.sum(ab_i * secb[:, 0] ** 2)
-        ci = [nb, nb + self.nh, nb + self.nh + self.nb - 1, nb + 2 * self.nh + self.nb - 1]
-        zb = np.transpose(np.array([np.ones(len(xbi)), xbi, ybi]))
-        g = [xbi, ybi, abi, zb, ci, a, ix, iy]
-        return g
+        return mesh(self.h, self.b, self.nh, self.nb)
+
+
+def cells(h, b, nh, nb):
+    """
+    Ячейки равномерной сетки прямоугольного сечения.
+
+    :param h: Высота сечения, м
+    :param b: Ширина сечения, м
+    :param nh: Число КЭ по высоте сечения
+    :param nb: Число КЭ по ширине сечения
+    :return: Координаты центров x, y (n,), размеры dx, dy (n,), м
+    """
+    g = mesh(h, b, nh, nb)
+    n = nh * nb
+    return g.xbi[:n].copy(), g.ybi[:n].copy(), np.full(n, h / nh), np.full(n, b / nb)
+
+
+def crossing(cl, u, eps):
+    """
+    Ячейки, в которых плоскость деформаций пересекает заданные уровни деформаций.
+
+    :param cl: Ячейки (x, y, dx, dy)
+    :param u: Векторы общих деформаций, (m, 3)
+    :param eps: Уровни деформаций (точки перелома диаграммы состояния)
+    :return: Признаки пересечения хотя бы для одного вектора деформаций, (n,)
+    """
+    x, y, dx, dy = cl
+    u = np.asarray(u, dtype=float).reshape(-1, 3)
+    mask = np.zeros(len(x), dtype=bool)
+    for ui in u[np.all(np.isfinite(u), axis=1)]:
+        ec = ui[0] + ui[1] * x + ui[2] * y  # Деформации в центрах ячеек
+        w = (abs(ui[1]) * dx + abs(ui[2]) * dy) / 2  # Полуразмах деформаций в ячейках
+        for e in eps:
+            mask |= np.abs(ec - e) < w
+    return mask
+
+
+def split(cl, mask, r):
+    """
+    Разбиение отмеченных ячеек на r x r ячеек.
+
+    :param cl: Ячейки (x, y, dx, dy)
+    :param mask: Признаки разбиваемых ячеек, (n,)
+    :param r: Число делений ячейки по каждому направлению
+    :return: Ячейки (x, y, dx, dy)
+    """
+    x, y, dx, dy = cl
+    o = (np.arange(r) + 0.5) / r - 0.5  # Смещения центров новых ячеек в долях размера
+    ox = np.tile(o, r)
+    oy = np.repeat(o, r)
+    xs = (x[mask, None] + dx[mask, None] * ox).ravel()
+    ys = (y[mask, None] + dy[mask, None] * oy).ravel()
+    keep = ~mask
+    return (np.concatenate([x[keep], xs]), np.concatenate([y[keep], ys]),
+            np.concatenate([dx[keep], np.repeat(dx[mask] / r, r * r)]),
+            np.concatenate([dy[keep], np.repeat(dy[mask] / r, r * r)]))
+
+
+def cell_geometry(h, b, nh, nb, cl):
+    """
+    Геометрические характеристики сечения с неравномерной сеткой ячеек.
+
+    Точки контура принимаются по исходной равномерной сетке. Собственные моменты инерции ячеек (jb)
+    учитываются в матрицах жесткости и внутренних усилиях, поэтому линейные в пределах ячейки напряжения
+    интегрируются точно.
+
+    :param h: Высота сечения, м
+    :param b: Ширина сечения, м
+    :param nh: Число КЭ исходной сетки по высоте сечения
+    :param nb: Число КЭ исходной сетки по ширине сечения
+    :param cl: Ячейки (x, y, dx, dy)
+    :return: Геометрические характеристики сечения (Geometry)
+    """
+    g = mesh(h, b, nh, nb)
+    x, y, dx, dy = cl
+    n = len(x)
+    ab_i = dx * dy
+    xbi = np.concatenate([x, g.xbi[nh * nb:]])
+    ybi = np.concatenate([y, g.ybi[nh * nb:]])
+    abi = np.concatenate([ab_i, g.abi[nh * nb:]])
+    ci = g.ci - nh * nb + n
+    zb = np.column_stack((np.ones(len(xbi)), xbi, ybi))
+    jb = np.zeros((len(xbi), 2))
+    jb[:n, 0] = ab_i * dx ** 2 / 12
+    jb[:n, 1] = ab_i * dy ** 2 / 12
+    return Geometry(frozen(xbi), frozen(ybi), frozen(abi), frozen(zb), frozen(ci), np.sum(ab_i),
+                    np.sum(ab_i * y ** 2 + jb[:n, 1]), np.sum(ab_i * x ** 2 + jb[:n, 0]), frozen(jb))
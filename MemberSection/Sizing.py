@@ -0,0 +1,182 @@
+import os
+from collections import OrderedDict
+import numpy as np
+import Solution
+from MemberSection import LoadPath
+from MemberSection.Rebars import Rebar
+
+
+DIAMETERS = (10, 12, 14, 16, 18, 20, 22, 25, 28, 32, 36, 40)  # Сортамент диаметров стержней, мм
+CACHE = 4096  # Наибольшее количество результатов проверки вариантов армирования в кэше
+PARALLEL = 1e6  # Объем шага подбора (расстановки x векторы нагрузки x КЭ), с которого используются процессы
+_cache = OrderedDict()  # Результаты проверки вариантов армирования, полученные в процессе (последние в конце)
+
+
+def clear():
+    """Очистка кэша результатов проверки вариантов армирования."""
+    _cache.clear()
+
+
+def area(layout):
+    """
+    Площадь армирования варианта симметричного армирования прямоугольного сечения стержнями по периметру.
+
+    Вариант (ds, nx, ny): nx стержней диаметром ds вдоль граней по оси X (высота сечения),
+    ny стержней вдоль граней по оси Y (ширина сечения), угловые стержни учитываются в обоих направлениях.
+
+    :param layout: Вариант армирования (ds, nx, ny)
+    :return: Площадь армирования, мм^2
+    """
+    ds, nx, ny = layout
+    return (2 * nx + 2 * ny - 4) * np.pi * ds ** 2 / 4
+
+
+def positions(h, b, cover, nx, ny):
+    """
+    Координаты стержней по периметру прямоугольного сечения.
+
+    :param h: Высота сечения, мм
+    :param b: Ширина сечения, мм
+    :param cover: Расстояние от грани сечения до центра стержня, мм
+    :param nx: Количество стержней вдоль граней по оси X
+    :param ny: Количество стержней вдоль граней по оси Y
+    :return: Координаты x, y стержней, мм
+    """
+    x = np.linspace(-h / 2 + cover, h / 2 - cover, nx)
+    y = np.linspace(-b / 2 + cover, b / 2 - cover, ny)
+    xs = np.hstack((x, x, np.full(ny - 2, x[0]), np.full(ny - 2, x[-1])))
+    ys = np.hstack((np.full(nx, y[0]), np.full(nx, y[-1]), y[1:-1], y[1:-1]))
+    return xs, ys
+
+
+def place(fs, grade, layout, cover):
+    """
+    Замена арматурных стержней сечения вариантом армирования.
+
+    :param fs: Поперечное сечение жб стержневого КЭ (FrameSec)
+    :param grade: Класс арматуры
+    :param layout: Вариант армирования (ds, nx, ny)
+    :param cover: Расстояние от грани сечения до центра стержня, мм
+    :return:
+    """
+    ds, nx, ny = layout
+    fs.rebars = {}
+    for i, (x, y) in enumerate(zip(*positions(fs.section.h * 1000, fs.section.b * 1000, cover, nx, ny))):
+        fs.add_rebar(str(i), grade, ds, x, y)
+
+
+def check(concrete, steel, section, grade, layout, cover, f, kt, gb3, acc, method, u0):
+    """
+    Проверка варианта армирования на векторы нагрузки (выполняется в процессе подбора).
+
+    :param concrete: Данные по бетону
+    :param steel: Данные по стали
+    :param section: Бетонное сечение (класс бетона, h, b, nh, nb), мм
+    :param grade: Класс арматуры
+    :param layout: Вариант армирования (ds, nx, ny)
+    :param cover: Расстояние от грани сечения до центра стержня, мм
+    :param f: Векторы нагрузки, (m, 3) [МН, МН*м, МН*м]
+    :param kt: Коэффициент учета растяжения бетона
+    :param gb3: Коэффициент gb3 бетона
+    :param acc: Точность расчета
+    :param method: Метод расчета: 'secant' - секущий модуль, 'newton' - касательный модуль
+    :param u0: Начальные векторы общих деформаций (m, 3), строки NaN - расчет от упругого состояния
+    :return: Признак прохождения проверки всеми векторами нагрузки, векторы общих деформаций (строки NaN -
+        решение не получено), суммарное количество итераций
+    """
+    from MemberSection.RConSect import FrameSec
+
+    fs = FrameSec(concrete, steel)
+    fs.add_rect_section(*section)
+    place(fs, grade, layout, cover)
+    u, it = fs.iterate(f, kt, gb3, acc, method, u0=u0)
+    converged = fs.status == Solution.CONVERGED
+    ok = converged & LoadPath.limits(fs, kt, gb3)(u)
+    return bool(np.all(ok)), np.where(converged[:, None], u, np.nan), int(np.sum(it))
+
+
+def optimize(fs, kt, gb3, acc, grade='A500', cover=50, combo_names=None, diameters=DIAMETERS, counts=range(2, 7),
+             method='secant', workers=None):
+    """
+    Подбор армирования прямоугольного сечения минимальной площади.
+
+    При заданном количестве стержней (nx, ny) площадь армирования возрастает с диаметром, поэтому
+    наименьший диаметр, при котором все векторы нагрузки проходят проверку, находится делением интервала
+    диаметров пополам. На каждом шаге середины интервалов всех расстановок проверяются в процессах,
+    из интервалов исключаются варианты не легче лучшего найденного. Расчет варианта начинается от векторов
+    деформаций ближайшего по площади проверенного варианта. По умолчанию процессы используются только
+    при объеме шага подбора не менее PARALLEL. В кэше хранятся CACHE последних использованных результатов
+    проверки вариантов (clear - очистка кэша).
+
+    :param fs: Поперечное сечение жб стержневого КЭ (FrameSec) с прямоугольным бетонным сечением
+    :param kt: Коэффициент учета растяжения бетона
+    :param gb3: Коэффициент gb3 бетона
+    :param acc: Точность расчета
+    :param grade: Класс арматуры
+    :param cover: Расстояние от грани сечения до центра стержня, мм
+    :param combo_names: Имена расчетных комбинаций нагрузок (по умолчанию все)
+    :param diameters: Диаметры стержней, мм
+    :param counts: Количество стержней вдоль грани (не менее 2)
+    :param method: Метод расчета: 'secant' - секущий модуль, 'newton' - касательный модуль
+    :param workers: Количество процессов (1 - расчет в текущем процессе, None - по объему расчета)
+    :return: Вариант армирования (ds, nx, ny) или None, если ни один вариант не прошел проверку,
+        площадь армирования, мм^2, количество рассчитанных вариантов
+    """
+    sec = fs.section
+    section = (sec.grade, sec.h * 1000, sec.b * 1000, sec.nh, sec.nb)
+    f = fs.forces(combo_names)
+    diameters = sorted(diameters)
+    props = tuple(fs.c_p), tuple(Rebar('', grade, 10, 0, 0, fs.steel).st)  # Свойства бетона и арматуры
+    key = (section, props, grade, cover, kt, gb3, acc, method, f.tobytes())
+    # Интервалы диаметров расстановок: номер не прошедшего и номер прошедшего проверку диаметра
+    brackets = {(nx, ny): [-1, len(diameters)] for nx in counts for ny in counts}
+    results = {}  # Вариант армирования -> признак прохождения проверки, векторы общих деформаций
+    best = None
+    evaluated = 0
+    if workers is None and len(brackets) * len(f) * len(fs.c_g[2]) < PARALLEL:
+        workers = 1
+    pool = None
+    if workers != 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(brackets)))
+    try:
+        while True:
+            layouts = []
+            for (nx, ny), (lo, hi) in brackets.items():
+                # Диаметры легче лучшего варианта
+                top = min(hi, sum(best is None or area((ds, nx, ny)) < area(best) for ds in diameters))
+                if top - lo > 1:
+                    layouts.append((diameters[(lo + top) // 2], nx, ny))
+            if not layouts:
+                break
+            tasks = []
+            for layout in layouts:
+                if key + (layout,) in _cache:
+                    _cache.move_to_end(key + (layout,))
+                    results[layout] = _cache[key + (layout,)]
+                    continue
+                done = [v for v in results if not np.all(np.isnan(results[v][1]))]
+                u0 = results[min(done, key=lambda v: abs(area(v) - area(layout)))][1] if done else None
+                tasks.append((layout, (fs.concrete, fs.steel, section, grade, layout, cover, f, kt, gb3, acc,
+                                       method, u0)))
+            if pool is None or not tasks:
+                parts = [check(*args) for layout, args in tasks]
+            else:
+                parts = list(pool.map(check, *zip(*[args for layout, args in tasks])))
+            for (layout, args), (ok, u, it) in zip(tasks, parts):
+                results[layout] = _cache[key + (layout,)] = ok, u
+                if len(_cache) > CACHE:
+                    _cache.popitem(last=False)
+            evaluated += len(tasks)
+            for layout in layouts:
+                ds, nx, ny = layout
+                brackets[(nx, ny)][0 if not results[layout][0] else 1] = diameters.index(ds)
+                if results[layout][0] and (best is None or area(layout) < area(best)):
+                    best = layout
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if best is None:
+        return None, np.nan, evaluated
+    return best, area(best), evaluated
@@ -30,7 +30,7 @@ def main():
     combo_name = '1.0D+1.0L'
     kt = 0
     gb3 = 1
-    shell.analyze(combo_name, kt, gb3, 0, 0.0000001)
+    shell.analyze(combo_name, kt, gb3, 0, 0.0000001, report=True, charts=True)
 
 
 if __name__ == '__main__':
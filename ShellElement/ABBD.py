@@ -1,6 +1,36 @@
 import numpy as np
 
 
+def rotation(a):
+    """
+    Матрицы преобразования напряжений при повороте осей и обратные им.
+
+    :param a: Углы поворота, радиан, массив произвольной формы (...)
+    :return: Матрицы преобразования (..., 3, 3), обратные матрицы (..., 3, 3)
+    """
+    c = np.cos(a)
+    s = np.sin(a)
+    c2 = c ** 2
+    s2 = s ** 2
+    cs = c * s
+    t = np.empty(np.shape(a) + (3, 3))
+    t[..., 0, 0] = c2
+    t[..., 0, 1] = s2
+    t[..., 0, 2] = 2 * cs
+    t[..., 1, 0] = s2
+    t[..., 1, 1] = c2
+    t[..., 1, 2] = -2 * cs
+    t[..., 2, 0] = -cs
+    t[..., 2, 1] = cs
+    t[..., 2, 2] = c2 - s2
+    t_ = t.copy()  # Обратное преобразование - поворот на угол -a
+    t_[..., 0, 2] = -t[..., 0, 2]
+    t_[..., 1, 2] = -t[..., 1, 2]
+    t_[..., 2, 0] = -t[..., 2, 0]
+    t_[..., 2, 1] = -t[..., 2, 1]
+    return t, t_
+
+
 class D:
     """Класс представляющий матрицу жесткости"""
 
@@ -8,6 +38,11 @@ class D:
         """
         Инициализация класса матрицы жесткости.
 
+        Преобразования арматурных слоев и весовые коэффициенты слоев вычисляются один раз,
+        рабочие массивы бетонных слоев используются повторно на всех итерациях. Методы расчета слоев
+        и матриц жесткости принимают также пакеты элементов с одинаковым армированием: массивы
+        с ведущей осью элементов (m, ...) (ShellElement.Batch.Layup).
+
         :param k: Количество бетонных слоев
         :param t: Толщины бетонных слоев
         :param zb: Координаты бетонных слоев от центра элемента
@@ -24,6 +59,26 @@ class D:
         self.a_s = a_s
         self.zs = zs
         self.alpha = alpha
+        # Множители r @ t @ r^-1 поэлементно, r = diag(1, 1, 2)
+        self.rr = np.array([[1.0, 1.0, 0.5], [1.0, 1.0, 0.5], [2.0, 2.0, 1.0]])
+        # Весовые коэффициенты слоев для блоков A, B, D: площадь * [1, z, z^2]
+        t = np.asarray(t, dtype=float)
+        zb = np.asarray(zb, dtype=float)
+        a_s = np.asarray(a_s, dtype=float)
+        zs = np.asarray(zs, dtype=float)
+        self.wb = np.stack((t, t * zb, t * zb ** 2), axis=-1)  # (k, 3)
+        self.ws = np.stack((a_s, a_s * zs, a_s * zs ** 2), axis=-1)  # (ns, 3)
+        c = np.cos(alpha)
+        s = np.sin(alpha)
+        self.dc = np.stack((c ** 2, s ** 2, 2 * s * c), axis=-1)  # Направляющие деформаций арматуры
+        self.dcs = np.stack((c ** 2, s ** 2, s * c), axis=-1)  # Направляющие напряжений арматуры
+        # Матрицы жесткости арматурных слоев в осях X и Y при единичном модуле
+        ts, ts_ = rotation(np.asarray(alpha, dtype=float))
+        self.ps = np.einsum('ni,nj->nij', ts_[:, :, 0], (ts * self.rr)[:, 0, :])
+        # Рабочие массивы бетонных слоев
+        self._qb = np.zeros((k, 3, 3))
+        self._m = np.empty((k, 3, 3))
+        self._m_ = np.empty((k, 3, 3))
 
     def v_b(self, sb, eps1, eps2, eс):
         """
@@ -36,43 +91,40 @@ class D:
         :return: Коэффициенты упругости бетона в слоях по главным направлениям
         """
 
+        eps = np.stack((eps1, eps2), axis=-1)
         vb = np.ones((self.k, 2))  # Коэффициенты упругости бетона в слоях по главным направлениям
-        for i in range(0, self.k):
-            if eps1[i] != 0:
-                vb[i, 0] = (sb[i][0] / eс[i][0] / eps1[i])[0]
-            else:
-                vb[i, 0] = 1.0
-            if eps2[i] != 0:
-                vb[i, 1] = (sb[i][1] / eс[i][1] / eps2[i])[0]
-            else:
-                vb[i, 1] = 1.0
+        np.divide(np.reshape(sb, (self.k, 2)), eс * eps, out=vb, where=eps != 0)
         return vb
 
     def sxyb(self, orientation, sb):
         """
         Напряжения в бетоне по осям X и Y.
 
-        :param orientation: Углы направления напряжения 1 в слоях бетона от оси X
-        :param sb: Напряжения в бетоне по главным направлениям
-        :return: Напряжения в бетоне по осям X и Y
+        :param orientation: Углы направления напряжения 1 в слоях бетона от оси X, (..., k)
+        :param sb: Напряжения в бетоне по главным направлениям, (..., k, 2, 1)
+        :return: Напряжения в бетоне по осям X и Y, (..., k, 3, 1)
         """
         c = np.cos(orientation)
         s = np.sin(orientation)
-        s_xyb = np.zeros((self.k, 3, 1))  # Напряжения в слоях бетона по осям X и Y
-        for i in range(0, self.k):
-            cb = np.array([[c[i] ** 2, s[i] ** 2], [s[i] ** 2, c[i] ** 2], [s[i] * c[i], -s[i] * c[i]]])
-            s_xyb[i][:, :] = cb @ sb[i][:, :]
+        c2 = c ** 2
+        s2 = s ** 2
+        s1 = sb[..., 0, 0]
+        s2_ = sb[..., 1, 0]
+        s_xyb = np.empty(sb.shape[:-2] + (3, 1))  # Напряжения в слоях бетона по осям X и Y
+        s_xyb[..., 0, 0] = c2 * s1 + s2 * s2_
+        s_xyb[..., 1, 0] = s2 * s1 + c2 * s2_
+        s_xyb[..., 2, 0] = s * c * (s1 - s2_)
         return s_xyb
 
-    def conc(self, u, v01, v10, plb, vsigmac, e_b, s_b, eb_, eb):
+    def conc(self, u, v01, v10, plb, claw, e_b, s_b, eb_, eb):
         """
         Расчет бетонных слоев.
 
-        :param u: Вектор общих деформаций
-        :param v01: Коэффициенты Пуассона в слоях бетона по главной оси 1
-        :param v10: Коэффициенты Пуассона в слоях бетона по главной оси 2
-        :param plb: Матрица коэффициентов деформаций бетонных слоев
-        :param vsigmac: Векторизованная функция диаграммы состояния бетона
+        :param u: Вектор общих деформаций, (..., 6)
+        :param v01: Коэффициенты Пуассона в слоях бетона по главной оси 1, (..., k)
+        :param v10: Коэффициенты Пуассона в слоях бетона по главной оси 2, (..., k)
+        :param plb: Матрица коэффициентов деформаций бетонных слоев, (k, 3, 6)
+        :param claw: Функция диаграммы состояния бетона для массивов (напряжения, коэффициенты упругости, касательные модули)
         :param e_b: Относительные деформации диаграммы состояния бетона
         :param s_b: Напряжения диаграммы состояния бетона
         :param eb_: Начальные модули упругости в слоях бетона
@@ -80,10 +132,11 @@ class D:
         :return:
         """
         vv = 1 - v01 * v10  # Коэффициент Пуассона
-        epsc = (plb @ u).reshape(self.k, 3, 1)  # Деформации в слоях бетона
-        exx = epsc[:, 0].reshape(self.k)  # Деформации в слоях бетона по оси X
-        eyy = epsc[:, 1].reshape(self.k)  # Деформации в слоях бетона по оси Y
-        gxy = epsc[:, 2].reshape(self.k)  # Сдвиговые деформации в слоях бетона
+        u = np.asarray(u)
+        epsc = plb @ u[..., None, :, None]  # Деформации в слоях бетона
+        exx = epsc[..., 0, 0]  # Деформации в слоях бетона по оси X
+        eyy = epsc[..., 1, 0]  # Деформации в слоях бетона по оси Y
+        gxy = epsc[..., 2, 0]  # Сдвиговые деформации в слоях бетона
         ee1 = exx + eyy
         ee2 = exx - eyy
         emax = (ee1 / 2 + np.sqrt((ee2 / 2) ** 2 + (gxy / 2) ** 2))
@@ -91,58 +144,80 @@ class D:
         eps1 = (emax + v01 * emin) / vv  # Деформации в слоях бетона по главной оси 1
         eps2 = (v10 * emax + emin) / vv  # Деформации в слоях бетона по главной оси 2
         orientation = 0.5 * np.arctan2(gxy, ee2)  # Угол главного направления 1 от оси X
-        k_rc = np.ones(self.k)  # Коэффициент уменьшения прочности бетона из-за поперечного растяжения
-        for i in range(0, self.k):
-            if eps1[i] > 0.002 and eps2[i] < 0:
-                k_rc[i] = 1.0 / (0.8 + 100 * eps1[i])
-            else:
-                k_rc[i] = 1.0
-        sb = np.vstack((vsigmac(eps1, *e_b, *s_b, eb_, 1), vsigmac(eps2, *e_b, *s_b, eb_, k_rc[i]))).transpose().reshape(self.k, 2,
-                                                                                                             1)
-        vb = self.v_b(sb, eps1, eps2, eb)
+        # Коэффициент уменьшения прочности бетона из-за поперечного растяжения
+        k_rc = np.where((eps1 > 0.002) & (eps2 < 0), 1.0 / (0.8 + 100 * eps1), 1.0)
+        s1, v1, et1 = claw(eps1, *e_b, *s_b, eb_, 1)
+        s2, v2, et2 = claw(eps2, *e_b, *s_b, eb_, k_rc)
+        sb = np.stack((s1, s2), axis=-1)[..., None]
+        vb = np.stack((v1, v2), axis=-1)  # Коэффициенты упругости бетона в слоях по главным направлениям
+        etb = np.stack((et1, et2), axis=-1)  # Касательные модули бетона в слоях по главным направлениям
         s_xyb = self.sxyb(orientation, sb)
-        return vb, sb, s_xyb, orientation, eps1, eps2
-
-    def cqb(self, eb, v01, eb_):
-        qb = np.zeros((self.k, 3, 3))
-        g01 = np.zeros(self.k)
-        v10 = np.zeros(self.k)
-        for i in range(0, self.k):
-            if eb[i, 0] != 0.0:
-                v10[i] = eb[i, 1] * v01[i] / eb[i, 0]
-            else:
-                v10[i] = 0.0
-            g01[i] = eb_[i] / (2 * (1 + v10[i]))
+        return vb, sb, s_xyb, orientation, eps1, eps2, etb
+
+    def cqb(self, eb, v01, eb_, gb=None):
+        """
+        Матрицы жесткости бетонных слоев в главных осях.
+
+        Возвращаемый массив матриц используется повторно при следующем вызове.
+
+        :param eb: Модули деформаций бетона в слоях по главным направлениям, (..., k, 2)
+        :param v01: Коэффициенты Пуассона в слоях бетона по главной оси 1, (..., k)
+        :param eb_: Начальные модули упругости в слоях бетона
+        :param gb: Модули сдвига бетона в слоях (по умолчанию по начальному модулю)
+        :return: Матрицы жесткости (..., k, 3, 3), коэффициенты Пуассона v01, v10 (..., k)
+        """
+        shape = eb.shape[:-1]
+        qb = self._qb if shape == (self.k,) else np.zeros(shape + (3, 3))
+        v10 = np.zeros(shape)
+        np.divide(eb[..., 1] * v01, eb[..., 0], out=v10, where=eb[..., 0] != 0.0)
+        g01 = eb_ / (2 * (1 + v10))
         v01 = v10
         vv = 1 - v01 * v10
-        qb[:, 0, 0] = eb[:, 0] / vv
-        qb[:, 0, 1] = v01 * eb[:, 1] / vv
-        qb[:, 1, 1] = eb[:, 1] / vv
-        qb[:, 1, 0] = v10 * eb[:, 1] / vv
-        qb[:, 2, 2] = g01
+        qb[..., 0, 0] = eb[..., 0] / vv
+        qb[..., 0, 1] = v01 * eb[..., 1] / vv
+        qb[..., 1, 1] = eb[..., 1] / vv
+        qb[..., 1, 0] = v10 * eb[..., 1] / vv
+        qb[..., 2, 2] = g01 if gb is None else gb
         return qb, v01, v10
 
     def ct(self, a):
-        n = len(a)
-        c = np.cos(a)
-        s = np.sin(a)
-        t = np.zeros((n, 3, 3))
-        for i in range(0, n):
-            t[i, 0, :] = np.array((c[i] ** 2, s[i] ** 2, (2 * c[i] * s[i])))
-            t[i, 1, :] = np.array((s[i] ** 2, c[i] ** 2, (-2 * c[i] * s[i])))
-            t[i, 2, :] = np.array(((-c[i] * s[i]), c[i] * s[i], (c[i] ** 2 - s[i] ** 2)))
-        return t
-
-    def cd(self, a, z, t, q):
-        r = np.array([[1, 0, 0], [0, 1, 0], [0, 0, 2]])
-        r_ = np.linalg.inv(r)
-        t_ = np.linalg.inv(t)
-        n = len(a)
-        m = t_ @ q @ r @ t @ r_
-        a_ = sum(m * a.reshape(n, 1, 1))
-        b_ = sum(m * z.reshape(n, 1, 1) * a.reshape(n, 1, 1))
-        d_ = sum(m * z.reshape(n, 1, 1) ** 2 * a.reshape(n, 1, 1))
-        di = np.vstack((np.hstack((a_, b_)), np.hstack((b_, d_))))
+        """
+        Матрицы преобразования напряжений при повороте осей.
+
+        :param a: Углы поворота, радиан, (n,)
+        :return: Матрицы преобразования (n, 3, 3)
+        """
+        return rotation(a)[0]
+
+    def cd(self, w, t, t_, q):
+        """
+        Сборка матрицы жесткости из матриц слоев.
+
+        :param w: Весовые коэффициенты слоев площадь * [1, z, z^2], (n, 3)
+        :param t: Матрицы преобразования напряжений слоев, (..., n, 3, 3)
+        :param t_: Обратные матрицы преобразования, (..., n, 3, 3)
+        :param q: Матрицы жесткости слоев в главных осях, (..., n, 3, 3)
+        :return: Матрица жесткости (..., 6, 6)
+        """
+        single = q.shape == self._m.shape  # Рабочие массивы - только для одного элемента
+        m = np.matmul(t_, q, out=self._m_ if single else None)
+        t *= self.rr  # r @ t @ r^-1
+        m = np.matmul(m, t, out=self._m if single else None)
+        return self.blocks(np.einsum('nk,...nij->...kij', w, m))
+
+    @staticmethod
+    def blocks(abd):
+        """
+        Матрица жесткости из блоков A, B, D.
+
+        :param abd: Блоки A, B, D, (..., 3, 3, 3)
+        :return: Матрица жесткости (..., 6, 6)
+        """
+        di = np.empty(abd.shape[:-3] + (6, 6))
+        di[..., :3, :3] = abd[..., 0, :, :]
+        di[..., :3, 3:] = abd[..., 1, :, :]
+        di[..., 3:, :3] = abd[..., 1, :, :]
+        di[..., 3:, 3:] = abd[..., 2, :, :]
         return di
 
     def v_s(self, strain, stress, es):
@@ -156,74 +231,66 @@ class D:
         """
 
         vs = np.ones(self.ns)  # Коэффициенты упругости арматуры в слоях
-        for i in range(0, self.ns):
-            if strain[i] != 0:
-                vs[i] = stress[i] / es[i] / strain[i]
-            else:
-                vs[i] = 1.0
+        np.divide(stress, np.asarray(es) * strain, out=vs, where=np.asarray(strain) != 0)
         return vs
 
-    def sxys(self, c, s, stress):
+    def sxys(self, stress):
         """
         Напряжения в арматуре по осям X и Y.
 
-        :param c: Косинусы углов арматуры в слоях от оси X
-        :param s: Синусы углов арматуры в слоях от оси X
-        :param stress: Напряжения в арматурных слоях
-        :return: Напряжения в арматурных слоях по осям X и Y
+        :param stress: Напряжения в арматурных слоях, (..., ns)
+        :return: Напряжения в арматурных слоях по осям X и Y, (..., ns, 3, 1)
+        """
+        return (self.dcs * np.asarray(stress)[..., None])[..., None]
+
+    def forces(self, s_xyb, s_xys):
         """
-        s_xys = np.zeros((self.ns, 3, 1))  # Напряжения в арматурных слоях по осям X и Y
-        for i in range(0, self.ns):
-            cs = np.array([[c[i] ** 2, s[i] ** 2], [s[i] ** 2, c[i] ** 2], [s[i] * c[i], -s[i] * c[i]]])
-            s_ts = np.hstack([stress[i], 0])
-            s_xys[i][:, :] = (cs @ s_ts).reshape(3, 1)
-        return s_xys
+        Внутренние усилия по напряжениям в слоях.
 
-    def reb(self, u, pls, vsigmas, e_s, s_s, es):
+        :param s_xyb: Напряжения в бетоне по осям X и Y, (..., k, 3, 1)
+        :param s_xys: Напряжения в арматуре по осям X и Y, (..., ns, 3, 1)
+        :return: Внутренние усилия, (..., 6) [МН, МН, МН, МН*м, МН*м, МН*м]
+        """
+        return np.concatenate([np.einsum('k,...ki->...i', self.wb[:, j], s_xyb[..., 0]) +
+                               np.einsum('n,...ni->...i', self.ws[:, j], s_xys[..., 0]) for j in (0, 1)], axis=-1)
+
+    def reb(self, u, pls, slaw, e_s, s_s, es):
         """
         Расчет арматурных слоев.
 
-        :param u: Вектор общих деформаций
-        :param pls: Матрица коэффициентов деформаций арматурных слоев
-        :param vsigmas: Векторизованная функция диаграммы состояния арматуры
+        :param u: Вектор общих деформаций, (..., 6)
+        :param pls: Матрица коэффициентов деформаций арматурных слоев, (ns, 3, 6)
+        :param slaw: Функция диаграммы состояния арматуры для массивов (напряжения, коэффициенты упругости, касательные модули)
         :param e_s: Относительные деформации диаграммы состояния арматуры
         :param s_s: Напряжения диаграммы состояния арматуры
         :param es: Начальный модуль упругости арматуры
         :return:
         """
-        epss = (pls @ u).reshape(self.ns, 3, 1)
-        c = np.cos(self.alpha)
-        s = np.sin(self.alpha)
-        strain = np.zeros(self.ns)
-        stress = np.zeros(self.ns)
-        for i in range(0, self.ns):
-            dc = np.array([c[i] ** 2, s[i] ** 2, 2 * s[i] * c[i]])
-            strain[i] = dc @ epss[i]
-            stress[i] = vsigmas(strain[i], *e_s[i, :, :][0], *s_s[i, :, :][0], es[i])
-        vs = self.v_s(strain, stress, es)
-        s_xys = self.sxys(c, s, stress)
-        return vs, s_xys, strain, stress
-
-    def d(self, e_b, eb_, vb, e_s, vs, orientation, v01):
+        epss = (pls @ np.asarray(u)[..., None, :, None])[..., 0]
+        strain = np.einsum('ni,...ni->...n', self.dc, epss)
+        stress, vs, ets = slaw(strain, *e_s[:, 0, :].T, *s_s[:, 0, :].T, np.asarray(es))
+        s_xys = self.sxys(stress)
+        return vs, s_xys, strain, stress, ets
+
+    def d(self, e_b, eb_, vb, e_s, vs, orientation, v01, gb=None):
         """
         Жесткостные характеристики плоских выделенных элементов жб оболочек.
 
         :param e_b: Модули упругости бетона
         :param eb_: Начальные модули упругости бетона в слоях, МПа
-        :param vb: Коэффициент упругости бетона
+        :param vb: Коэффициент упругости бетона, (..., k, 2)
         :param e_s: Модули упругости арматурной стали
-        :param vs: Коэффициент упругости арматурной стали
-        :param orientation: Угол направления напряжения 1 в слоях бетона от оси X, радиан
-        :param v01:Коэффициенты Пуассона в слоях бетона по главной оси 1
-        :return:
+        :param vs: Коэффициент упругости арматурной стали, (..., ns)
+        :param orientation: Угол направления напряжения 1 в слоях бетона от оси X, радиан, (..., k)
+        :param v01:Коэффициенты Пуассона в слоях бетона по главной оси 1, (..., k)
+        :param gb: Модули сдвига бетона в слоях, МПа (по умолчанию начальные)
+        :return: Матрицы жесткости (..., 6, 6), коэффициенты Пуассона v01, v10 (..., k)
         """
 
-        qb, v01, v10 = self.cqb(e_b * vb, v01, eb_)
-        t_ = self.ct(orientation)
-        db = self.cd(self.t, self.zb, t_, qb)
-        qs = np.zeros((self.ns, 3, 3))
-        qs[:, 0, 0] = e_s * vs
-        t_ = self.ct(self.alpha)
-        ds = self.cd(self.a_s, self.zs, t_, qs)
+        qb, v01, v10 = self.cqb(e_b * vb, v01, eb_, gb)
+        t, t_ = rotation(orientation)
+        db = self.cd(self.wb, t, t_, qb)
+        ws = np.asarray(e_s) * vs  # Модули деформаций арматурных слоев
+        ds = self.blocks(np.einsum('...n,nk,nij->...kij', ws, self.ws, self.ps))
         abbd = db + ds
         return abbd, v01, v10
@@ -0,0 +1,353 @@
+import numpy as np
+import Sigma as Sgm
+import Solution
+import LoadCombos
+from Solution import Calculation
+from ShellElement import ABBD
+
+
+class Layup:
+    """Класс представляющий пакетный расчет элементов оболочки с одинаковым армированием"""
+
+    def __init__(self, shell, kt, gb3, v):
+        """
+        Инициализация пакетного расчета.
+
+        :param shell: Выделенный жб элемент оболочки (ShellElem) с заданными бетоном и арматурными слоями
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param v: Коэффициент Пуассона
+        """
+        self.t, self.zb = shell.c_g  # Толщины и координаты слоев бетона
+        self.k = len(self.zb)  # Количество слоев бетона
+        self.eb = shell.c_p['E']  # Начальный модуль упругости бетона, МПа
+        self.e_b, self.s_b = shell.diagrams(kt, gb3)
+        self.v = v
+        self.zs, alpha, self.a_s, self.es, self.eps_s, self.sig_s = shell.ply_arrays()
+        self.ns = len(self.zs)  # Количество арматурных слоев
+        self.p_s = [*self.eps_s[:, 0, :].T, *self.sig_s[:, 0, :].T]  # Параметры диаграмм состояния арматуры
+        # Матрицы коэффициентов деформаций бетонных и арматурных слоев
+        pl1 = np.eye(3)
+        self.plb = np.concatenate((np.tile(pl1, (self.k, 1, 1)), pl1 * self.zb[:, None, None]), axis=-1)
+        self.pls = np.concatenate((np.tile(pl1, (self.ns, 1, 1)), pl1 * self.zs[:, None, None]), axis=-1)
+        self.abbd = ABBD.D(self.k, self.t, self.zb, self.ns, self.a_s, self.zs, alpha)  # Матрицы жесткости слоев
+        self.poisson = None  # Коэффициенты Пуассона v01 в слоях бетона последнего расчета, (m, k)
+        self.status = None  # Коды состояния задач последнего расчета (Solution.CONVERGED, ...), (m,)
+        self.trace = None  # Журнал сходимости задач последнего расчета (Solution.Trace)
+
+    def stiffness(self, vb, vs, orientation, v01):
+        """
+        Матрицы жесткости элементов (ABBD.D.d).
+
+        :param vb: Коэффициенты упругости бетона по главным направлениям, (m, k, 2)
+        :param vs: Коэффициенты упругости арматуры, (m, ns)
+        :param orientation: Углы главного направления 1 от оси X, радиан, (m, k)
+        :param v01: Коэффициенты Пуассона по главной оси 1, (m, k)
+        :return: Матрицы жесткости (m, 6, 6), коэффициенты Пуассона v01, v10 (m, k)
+        """
+        return self.abbd.d(self.eb, self.eb, vb, self.es, vs, orientation, v01)
+
+    def state(self, u, v01, v10):
+        """
+        Напряженно-деформированное состояние слоев (ABBD.D.conc, ABBD.D.reb).
+
+        :param u: Векторы общих деформаций, (m, 6)
+        :param v01: Коэффициенты Пуассона по главной оси 1, (m, k)
+        :param v10: Коэффициенты Пуассона по главной оси 2, (m, k)
+        :return: Коэффициенты упругости бетона (m, k, 2), углы главного направления 1 (m, k),
+            деформации бетона по главным направлениям (m, k, 2), коэффициенты упругости (m, ns)
+            и деформации (m, ns) арматуры, векторы внутренних усилий (m, 6)
+        """
+        vb, sb, sxyb, orientation, eps1, eps2, _ = self.abbd.conc(u, v01, v10, self.plb, Sgm.conc_law, self.e_b,
+                                                                  self.s_b, self.eb, self.eb)
+        vs, sxys, strain, stress, _ = self.abbd.reb(u, self.pls, Sgm.steel_law, self.eps_s, self.sig_s, self.es)
+        return vb, orientation, np.stack((eps1, eps2), axis=-1), vs, strain, self.abbd.forces(sxyb, sxys)
+
+    def residual(self, f, u, v01):
+        """
+        Невязки внутренних усилий и нагрузок.
+
+        :param f: Векторы нагрузки, (m, 6)
+        :param u: Векторы общих деформаций, (m, 6)
+        :param v01: Коэффициенты Пуассона в слоях бетона, (m, k)
+        :return: Невязки, (m, 6)
+        """
+        return f - self.state(u, v01, v01)[-1]
+
+    def elastic(self):
+        """
+        Матрица жесткости элемента с начальными модулями упругости бетона и арматуры.
+
+        :return: Матрица жесткости, (6, 6)
+        """
+        v01 = np.full(self.k, float(self.v))
+        return self.stiffness(np.ones((self.k, 2)), np.ones(self.ns), np.zeros(self.k), v01)[0]
+
+    def utilization(self, u):
+        """
+        Оценка использования предельных деформаций по векторам общих деформаций линейного расчета.
+
+        Оценка - наибольшее отношение минимальных главных деформаций слоев бетона к eb2 и деформаций
+        арматурных слоев к esc2, es2.
+
+        :param u: Векторы общих деформаций, (m, 6)
+        :return: Оценки использования предельных деформаций, (m,)
+        """
+        exx = u[:, None, 0] + u[:, None, 3] * self.zb
+        eyy = u[:, None, 1] + u[:, None, 4] * self.zb
+        gxy = u[:, None, 2] + u[:, None, 5] * self.zb
+        emin = (exx + eyy) / 2 - np.sqrt(((exx - eyy) / 2) ** 2 + (gxy / 2) ** 2)
+        strain = (u[:, :3] @ self.abbd.dc.T) + (u[:, 3:] @ self.abbd.dc.T) * self.zs
+        with np.errstate(invalid='ignore'):
+            util = np.max(emin / self.e_b[0], axis=1)
+            if self.ns:
+                util = np.maximum(util, np.max(np.maximum(strain / self.p_s[0], strain / self.p_s[3]), axis=1))
+        return util
+
+    def screen(self, f):
+        """
+        Оценка использования предельных деформаций по линейному упругому расчету.
+
+        :param f: Векторы нагрузки, (m, 6)
+        :return: Оценки использования предельных деформаций, (m,)
+        """
+        u = np.linalg.solve(self.elastic(), np.asarray(f, dtype=float).reshape(-1, 6).T).T
+        return self.utilization(u)
+
+    def solve(self, f, acc, maxit=1000, u0=None, v01=None, fallback=None, cmax=None, accel=None):
+        """
+        Итерационный расчет пакета элементов по нелинейной деформационной модели.
+
+        Расчет может быть продолжен от решенного состояния: начальные векторы общих деформаций u0
+        и коэффициенты Пуассона v01 (self.poisson предыдущего расчета). Коды состояния задач
+        сохраняются в self.status, журнал сходимости итераций - в self.trace.
+
+        :param f: Векторы нагрузки, (m, 6) [МН, МН, МН, МН*м, МН*м, МН*м]
+        :param acc: Точность расчета
+        :param maxit: Максимальное количество итераций
+        :param u0: Начальные векторы общих деформаций (m, 6), строки NaN - расчет от упругого состояния
+        :param v01: Начальные коэффициенты Пуассона в слоях бетона, (m, k)
+        :param fallback: Метод решения для вырожденных матриц жесткости: None, 'lstsq', 'regularize'
+        :param cmax: Максимальное число обусловленности матриц жесткости (None - без контроля)
+        :param accel: Ускорение итераций: None, 'aitken', 'anderson' (Solution.Acceleration)
+        :return: Векторы общих деформаций (m, 6), количество итераций (m,), признаки сходимости (m,)
+        """
+        f = np.asarray(f, dtype=float).reshape(-1, 6)
+        m = len(f)
+        if v01 is None:
+            v01 = np.full((m, self.k), float(self.v))
+        else:
+            v01 = np.array(np.broadcast_to(v01, (m, self.k)), dtype=float)
+        v0_1 = v01.copy()
+        d, v01, v10 = self.stiffness(np.ones((m, self.k, 2)), np.ones((m, self.ns)), np.zeros((m, self.k)), v01)
+        u, ok = Calculation.solve_batch(d, f, fallback, cmax)
+        if u0 is not None:
+            u0 = np.broadcast_to(np.asarray(u0, dtype=float).reshape(-1, 6), f.shape)
+            warm = np.all(np.isfinite(u0), axis=1)
+            u[warm] = u0[warm]
+            ok[warm] = True
+            v01[warm] = v0_1[warm]  # Коэффициенты Пуассона решенного состояния
+            v10[warm] = v0_1[warm]
+        status = np.where(ok, Solution.MAXITER, Solution.SINGULAR)
+        it = np.zeros(m, dtype=int)
+        active = ok.copy()
+        mix = Solution.Acceleration(m, 6, accel)
+        trace = Solution.Trace(m)
+        bb = np.full((m, self.k * 2 + self.ns), -1, dtype=np.int8)  # Ветви диаграмм бетонных и арматурных слоев
+        while np.any(active) and np.max(it) < maxit:
+            idx = np.flatnonzero(active)
+            vb, orientation, eps, vs, strain, fi = self.state(u[idx], v01[idx], v10[idx])
+            # Деформации за пределами физического смысла - нагрузка превышает несущую способность
+            div = np.maximum(np.max(np.abs(eps), axis=(1, 2)),
+                             np.max(np.abs(strain), axis=1, initial=0.0)) > Solution.EPS_MAX
+            d, v01[idx], v10[idx] = self.stiffness(vb, vs, orientation, v01[idx])
+            u_f, solved = Calculation.solve_batch(d, f[idx], fallback, cmax)
+            solved &= ~div
+            du = np.max(np.abs(u[idx] - u_f), axis=1)
+            br = np.hstack((Sgm.conc_branch(eps.reshape(len(idx), -1), *self.e_b[1:5]),
+                            Sgm.steel_branch(strain, self.p_s[1], self.p_s[2])))
+            changed = np.count_nonzero(br != bb[idx], axis=1)
+            changed[it[idx] == 0] = 0  # Первая итерация
+            bb[idx] = br
+            trace.record(idx, du, np.max(np.abs(f[idx] - fi), axis=1), changed)
+            done = solved & (du < acc)
+            u[idx[done]] = u_f[done]
+            nxt = solved & ~done
+            u[idx[nxt]] = mix.step(idx[nxt], u[idx[nxt]], u_f[nxt])
+            it[idx] += 1
+            status[idx[done]] = Solution.CONVERGED
+            status[idx[div]] = Solution.DIVERGED
+            status[idx[~solved & ~div]] = Solution.SINGULAR
+            active[idx[done | ~solved]] = False
+        self.poisson = v01
+        self.status = status
+        self.trace = trace
+        return u, it, status == Solution.CONVERGED
+
+    def continuation(self, f, acc, maxit=1000, levels=2, accel=None, tol=0.1):
+        """
+        Пакетный расчет с продолжением: задачи упорядочиваются по близости векторов нагрузки,
+        задача рассчитывается от решения ближайшей сошедшейся задачи, если их векторы нагрузки близки
+        (Calculation.waves) и невязка от этого решения меньше невязки от упругого решения (Calculation.closer),
+        иначе - от упругого состояния.
+
+        :param f: Векторы нагрузки, (m, 6) [МН, МН, МН, МН*м, МН*м, МН*м]
+        :param acc: Точность расчета
+        :param maxit: Максимальное количество итераций
+        :param levels: Количество волн расчета
+        :param accel: Ускорение итераций: None, 'aitken', 'anderson'
+        :param tol: Наибольшее относительное расстояние нормированных векторов нагрузки для продолжения
+        :return: Векторы общих деформаций (m, 6), количество итераций (m,), признаки сходимости (m,)
+        """
+        f = np.asarray(f, dtype=float).reshape(-1, 6)
+        m = len(f)
+        u = np.full(f.shape, np.nan)
+        it = np.zeros(m, dtype=int)
+        conv = np.zeros(m, dtype=bool)
+        status = np.full(m, Solution.MAXITER)
+        trace = Solution.Trace(m)
+        v01 = np.full((m, self.k), float(self.v))
+        for rows, parents in Calculation.waves(f, levels, tol):
+            warm = (parents >= 0) & conv[parents]
+            if np.any(warm):
+                fw = f[rows[warm]]
+                pw = parents[warm]
+                u_e = np.linalg.solve(self.elastic(), fw.T).T
+                warm[warm] = Calculation.closer(f, self.residual(fw, u[pw], v01[pw]),
+                                                self.residual(fw, u_e, np.full((len(fw), self.k), float(self.v))))
+            u0 = np.where(warm[:, None], u[parents], np.nan)
+            v0 = np.where(warm[:, None], v01[parents], float(self.v))
+            u[rows], it[rows], conv[rows] = self.solve(f[rows], acc, maxit, u0, v0, accel=accel)
+            v01[rows] = self.poisson
+            status[rows] = self.status
+            trace.extend(rows, self.trace)
+        self.poisson = v01
+        self.status = status
+        self.trace = trace
+        return u, it, conv
+
+
+class ShellMesh:
+    """Класс представляющий набор жб элементов оболочки конечно-элементной модели"""
+
+    def __init__(self):
+        """Инициализация набора элементов оболочки."""
+
+        self.elements = {}  # Словарь элементов: имя -> выделенный жб элемент оболочки (ShellElem)
+        self.forces = []  # Список усилий: (имя элемента, имя комбинации, вектор нагрузки)
+        self.rslt = None  # Результаты расчета
+        self.status = None  # Коды состояния задач (Solution.CONVERGED, ...)
+        self.trace = None  # Журнал сходимости задач (Solution.Trace)
+
+    def add_element(self, name, shell):
+        """
+        Добавляет элемент оболочки.
+
+        :param name: Имя элемента
+        :param shell: Выделенный жб элемент оболочки (ShellElem) с заданными бетоном и арматурными слоями
+        :return:
+        """
+        self.elements[name] = shell
+
+    def add_forces(self, name, combo, nxx, nyy, nxy, mxx, myy, mxy):
+        """
+        Добавляет усилия в элементе от комбинации нагрузок.
+
+        :param name: Имя элемента
+        :param combo: Имя комбинации нагрузок
+        :param nxx: Продольная сила по X, кН (+ растяжение)
+        :param nyy: Продольная сила по Y, кН (+ растяжение)
+        :param nxy: Сдвиговая сила XY, кН
+        :param mxx: Изгибающий момент вдоль оси X, кН*м
+        :param myy: Изгибающий момент вдоль оси Y, кН*м
+        :param mxy: Крутящий момент XY, кН*м
+        :return:
+        """
+        self.forces.append((name, combo, np.array([nxx, nyy, nxy, mxx, myy, mxy]) / 1000))
+
+    @staticmethod
+    def layup_key(shell):
+        """
+        Ключ армирования элемента для группировки.
+
+        :param shell: Выделенный жб элемент оболочки
+        :return: Кортеж параметров бетона и арматурных слоев
+        """
+        c = shell.cshell
+        return (c.grade, c.h, c.nh,
+                tuple((p.grade, p.ds, p.ns, p.z, p.alpha) for p in shell.plies.values()))
+
+    def groups(self):
+        """
+        Группы элементов с одинаковым армированием.
+
+        :return: Словарь: ключ армирования -> список номеров усилий
+        """
+        keys = {name: self.layup_key(shell) for name, shell in self.elements.items()}
+        grp = {}
+        for i, (name, combo, f) in enumerate(self.forces):
+            grp.setdefault(keys[name], []).append(i)
+        return grp
+
+    def analyze(self, kt, gb3, v, acc, chunk=20000, warm=False, accel=None, top=None, threshold=None,
+                report=False):
+        """
+        Расчет всех элементов на все комбинации.
+
+        При заданных top или threshold нелинейный расчет для каждого элемента выполняется только
+        на определяющие комбинации по линейному упругому расчету (Layup.screen), остальные задачи
+        получают код состояния Solution.SKIPPED.
+
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param v: Коэффициент Пуассона
+        :param acc: Точность расчета
+        :param chunk: Максимальное количество задач в одном пакете
+        :param warm: Расчет с продолжением от ближайших решенных задач группы
+        :param accel: Ускорение итераций: None, 'aitken', 'anderson'
+        :param top: Количество комбинаций элемента с наибольшими оценками линейного расчета
+        :param threshold: Минимальная оценка линейного расчета для нелинейного расчета задачи
+        :param report: Вывод сводки расчета
+        :return: Список (имя элемента, имя комбинации), векторы общих деформаций (n, 6),
+            количество итераций (n,), признаки сходимости (n,)
+        """
+        n = len(self.forces)
+        u = np.full((n, 6), np.nan)
+        it = np.zeros(n, dtype=int)
+        ok = np.zeros(n, dtype=bool)
+        status = np.full(n, Solution.SKIPPED)
+        trace = Solution.Trace(n)
+        for key, rows in self.groups().items():
+            rows = np.array(rows)
+            layup = Layup(self.elements[self.forces[rows[0]][0]], kt, gb3, v)
+            if top is not None or threshold is not None:
+                util = layup.screen(np.array([self.forces[i][2] for i in rows]))
+                names = np.array([self.forces[i][0] for i in rows])
+                keep = np.zeros(len(rows), dtype=bool)
+                for name in np.unique(names):
+                    own = np.flatnonzero(names == name)
+                    keep[own] = LoadCombos.governing(util[own], top, threshold)
+                rows = rows[keep]
+                if len(rows) == 0:
+                    continue
+            for part in np.array_split(rows, -(-len(rows) // chunk)):
+                f = np.array([self.forces[i][2] for i in part])
+                if warm:
+                    u[part], it[part], ok[part] = layup.continuation(f, acc, accel=accel)
+                else:
+                    u[part], it[part], ok[part] = layup.solve(f, acc, accel=accel)
+                status[part] = layup.status
+                trace.extend(part, layup.trace)
+        keys = [(name, combo) for name, combo, f in self.forces]
+        if report:
+            skipped = np.count_nonzero(status == Solution.SKIPPED)
+            if skipped:
+                print('Пропущено по линейному расчету', skipped, 'из', n, 'задач')
+            print('Решение получено для', np.count_nonzero(ok), 'из', n - skipped, 'задач в', len(self.groups()),
+                  'группах армирования')
+            for code in np.unique(status[~ok & (status != Solution.SKIPPED)]):
+                print('Решение не получено:', Solution.STATUS[code], '-', np.count_nonzero(status == code), 'задач')
+        self.status = status
+        self.trace = trace
+        self.rslt = keys, u, it, ok
+        return self.rslt
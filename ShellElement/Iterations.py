@@ -1,4 +1,6 @@
 import numpy as np
+import Sigma as Sgm
+import Solution
 from Solution import Calculation
 from ShellElement import ABBD
 
@@ -6,47 +8,156 @@ from ShellElement import ABBD
 class Calc:
     """Класс представляющий итерационный расчет"""
 
-    def __init__(self, args):
+    def __init__(self, args, method='secant', u0=None, maxit=1000, fallback=None, cmax=None, accel=None):
         """
         Инициализация итерационного расчета.
 
         :param args: Аргументы
+        :param method: Метод расчета: 'secant' - секущий модуль, 'newton' - касательный модуль (для v = 0:
+            при v != 0 коэффициенты Пуассона уточняются методом секущих после метода Ньютона,
+            и расчет требует больше итераций, чем метод секущих)
+        :param u0: Начальный вектор общих деформаций (продолжение от решенного состояния)
+        :param maxit: Максимальное количество итераций метода секущих
+        :param fallback: Метод решения для вырожденной матрицы жесткости: None, 'lstsq', 'regularize'
+        :param cmax: Максимальное число обусловленности матрицы жесткости (None - без контроля)
+        :param accel: Ускорение итераций метода секущих: None, 'aitken', 'anderson' (Solution.Acceleration)
         """
 
         self.args = args
+        self.method = method
+        self.u0 = u0
+        self.maxit = maxit
+        self.fallback = fallback
+        self.cmax = cmax
+        self.accel = accel
         self.rslt = None
+        self.state = None  # Вектор общих деформаций и коэффициенты Пуассона для продолжения расчета
+        self.status = None  # Код состояния расчета (Solution.CONVERGED, ...)
+        self.cond = np.nan  # Число обусловленности матрицы жесткости последней итерации
+        self.trace = None  # Журнал сходимости итераций (Solution.Trace)
+        self.it = 0  # Количество итераций
 
     def itrn(self):
         """Итерационный расчет по нелинейной деформационной модели."""
 
-        v01, k, eb, eb_, plb, es, pls, fg, t, zb, ns, alpha, a_s, zs, vsb, vss, e_b, s_b, e_s, s_s, acc = self.args
+        v01, k, eb, eb_, plb, es, pls, fg, t, zb, ns, alpha, a_s, zs, claw, slaw, e_b, s_b, e_s, s_s, acc = self.args
         orientation = np.zeros(k)  # Угол главного направления 1 от оси X
         vb = np.ones((k, 2))  # Коэффициенты упругости бетона
         vs = np.ones(ns)  # Коэффициенты упругости арматуры
         abbd = ABBD.D(k, t, zb, ns, a_s, zs, alpha)
         d, v01, v10 = abbd.d(eb, eb_, vb, es, vs, orientation, v01)
-        u = Calculation.calc(d, fg)  # Вектор общих деформаций
-        sb = np.zeros(k)  # Напряжения в бетоне
+        status = Solution.MAXITER
+        if self.u0 is None:
+            u = self.solve(d, fg)  # Вектор общих деформаций
+            if not np.all(np.isfinite(u)):
+                status = Solution.SINGULAR
+        else:
+            u = np.array(self.u0, dtype=float)
+        sb = np.zeros((k, 2, 1))  # Напряжения в бетоне
         eps1 = np.zeros(k)  # Деформации бетона по направлению 1
         eps2 = np.zeros(k)  # Деформации бетона по направлению 2
         strain = np.zeros(ns)  # Деформации арматуры
         stress = np.zeros(ns)  # Напряжения в арматуре
-        sxyb = np.zeros((k, 2))  # Напряжения в бетоне по осям X и Y
-        sxys = np.zeros((ns, 2))  # Напряжения в арматуре по осям X и Y
+        sxyb = np.zeros((k, 3, 1))  # Напряжения в бетоне по осям X и Y
+        sxys = np.zeros((ns, 3, 1))  # Напряжения в арматуре по осям X и Y
         du = 0.1  # Приращение общих деформаций
         it = 0  # Количество итераций
-        while du >= acc:
+        trace = Solution.Trace(1)
+        a = np.hstack((t, a_s)).reshape(-1, 1)  # Площади бетонных и арматурных слоев
+        z = np.hstack((zb, zs))  # Координаты бетонных и арматурных слоев
+        branch = None  # Ветви диаграмм состояния бетонных и арматурных слоев
+        if self.method == 'newton' and status != Solution.SINGULAR:
+            u_n, it_n, ok = Calculation.newton(self.tangent(abbd, v01, v10), u.reshape(1, 6), fg.reshape(1, 6), acc,
+                                               trace=trace)
+            it = it_n[0]
+            if ok[0]:
+                u = u_n[0]  # Вектор общих деформаций
+                vb, sb, sxyb, orientation, eps1, eps2, _ = abbd.conc(u, v01, v10, plb, claw, e_b, s_b, eb_, eb)
+                vs, sxys, strain, stress, _ = abbd.reb(u, pls, slaw, e_s, s_s, es)
+                if not np.any(v01):
+                    du = 0.0  # Иначе уточнение коэффициентов Пуассона методом секущих
+                    status = Solution.CONVERGED
+        elif self.method not in ('secant', 'newton'):
+            raise ValueError(f"Неизвестный метод расчета '{self.method}'")
+        n_it = 0  # Количество итераций метода секущих
+        mix = Solution.Acceleration(1, 6, self.accel)
+        while status == Solution.MAXITER and n_it < self.maxit:
             it += 1
-            vb, sb, sxyb, orientation, eps1, eps2 = abbd.conc(u, v01, v10, plb, vsb, e_b, s_b, eb_, eb)
-            vs, sxys, strain, stress = abbd.reb(u, pls, vss, e_s, s_s, es)
+            n_it += 1
+            vb, sb, sxyb, orientation, eps1, eps2, _ = abbd.conc(u, v01, v10, plb, claw, e_b, s_b, eb_, eb)
+            vs, sxys, strain, stress, _ = abbd.reb(u, pls, slaw, e_s, s_s, es)
+            if max(np.max(np.abs(eps1)), np.max(np.abs(eps2)), np.max(np.abs(strain))) > Solution.EPS_MAX:
+                status = Solution.DIVERGED  # Нагрузка превышает несущую способность
+                break
             d, v01, v10 = abbd.d(eb, eb_, vb, es, vs, orientation, v01)
-            u_f = Calculation.calc(d, fg)  # Вектор общих деформаций
+            u_f = self.solve(d, fg)  # Вектор общих деформаций
+            if not np.all(np.isfinite(u_f)):
+                status = Solution.SINGULAR
+                break
             du = np.max(abs(u - u_f))
-            u = u_f  # Вектор общих деформаций
-        print('Решение получено')
-        print('Выполнено', it, 'итераций')
+            sxy = np.vstack((sxyb.reshape(k, 3), sxys.reshape(ns, 3))) * a
+            fi = np.hstack((np.sum(sxy, axis=0), z @ sxy))  # Внутренние усилия
+            br = np.hstack((Sgm.conc_branch(np.hstack((eps1, eps2)), *e_b[1:5]),
+                            Sgm.steel_branch(strain, e_s[:, 0, 1], e_s[:, 0, 2])))
+            changed = 0 if branch is None else np.count_nonzero(br != branch)  # Переходы слоев на другие ветви
+            trace.record([0], [du], [np.max(np.abs(fg - fi))], [changed])
+            branch = br
+            if du < acc:
+                u = u_f  # Вектор общих деформаций
+                status = Solution.CONVERGED
+            else:
+                u = mix.step(np.zeros(1, dtype=int), u.reshape(1, 6), u_f.reshape(1, 6))[0]
+        self.status = status
+        self.trace = trace
+        self.it = it
         sig1 = sb[:][:, 0]  # Напряжения в бетоне по направлению 1
         sig2 = sb[:][:, 1]  # Напряжения в бетоне по направлению 2
         eps = np.append(eps1.reshape(k, 1), strain.reshape(ns, 1))  # Деформации бетонных и арматурных слоев
         sig = np.append(sig1.reshape(k, 1), stress.reshape(ns, 1))  # Напряжения в бетонных и арматурных слоях
         self.rslt = eps1, eps2, sig1, sig2, sxyb, sxys, orientation, strain, stress, eps, sig, u
+        self.state = u, v01
+
+    def solve(self, d, fg):
+        """
+        Вектор общих деформаций с контролем вырожденности матрицы жесткости.
+
+        :param d: Матрица жесткости (6, 6)
+        :param fg: Вектор нагрузки (6,)
+        :return: Вектор общих деформаций (NaN при вырожденной матрице без метода решения fallback)
+        """
+        u, _, cond = Calculation.solve(d.reshape(1, 6, 6), fg.reshape(1, 6), self.fallback, self.cmax)
+        self.cond = cond[0]
+        return u[0]
+
+    def tangent(self, abbd, v01, v10):
+        """
+        Функция внутренних усилий и касательной матрицы жесткости для метода Ньютона-Рафсона.
+
+        Коэффициенты Пуассона в слоях бетона принимаются постоянными, модуль сдвига бетона в главных осях
+        принимается по модели поворачивающихся трещин (s1 - s2) / 2 / (eps1 - eps2).
+
+        :param abbd: Матрица жесткости
+        :param v01: Коэффициенты Пуассона в слоях бетона по главной оси 1
+        :param v10: Коэффициенты Пуассона в слоях бетона по главной оси 2
+        :return: Функция state(u) -> (внутренние усилия (m, 6), касательные матрицы жесткости (m, 6, 6))
+        """
+
+        v0_1, k, eb, eb_, plb, es, pls, fg, t, zb, ns, alpha, a_s, zs, claw, slaw, e_b, s_b, e_s, s_s, acc = self.args
+        a = np.hstack((t, a_s)).reshape(-1, 1)  # Площади бетонных и арматурных слоев
+        z = np.hstack((zb, zs))  # Координаты бетонных и арматурных слоев
+
+        def state(u):
+            fi = np.zeros(u.shape)
+            kt = np.zeros(u.shape + (6,))
+            for j in range(len(u)):
+                _, sb, sxyb, orientation, eps1, eps2, etb = abbd.conc(u[j], v01, v10, plb, claw, e_b, s_b, eb_, eb)
+                _, sxys, _, _, ets = abbd.reb(u[j], pls, slaw, e_s, s_s, es)
+                sxy = np.vstack((sxyb.reshape(k, 3), sxys.reshape(ns, 3))) * a
+                fi[j] = np.hstack((np.sum(sxy, axis=0), z @ sxy))
+                de = eps1 - eps2
+                gb = np.where(np.abs(de) > 1e-12, (sb[:, 0, 0] - sb[:, 1, 0]) / 2 / np.where(de != 0, de, 1.0),
+                              eb_ / 2)  # Модули сдвига бетона
+                kt[j] = abbd.d(eb, eb_, etb / eb, es, ets / np.asarray(es), orientation, v01, gb)[0]
+            return fi, kt
+
+        return state
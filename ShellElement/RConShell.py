@@ -1,13 +1,13 @@
 import numpy as np
-import pandas as pd
-from Pynite.LoadCombo import LoadCombo
+import LoadCombos
+from LoadCombos import LoadCombo, LoadCases
 from ShellElement.RebarPlies import Ply
 from ShellElement.Shells import Shell
-import ShellElement.Scharts as Sch
-import Ccharts as Cch
 import Sigma as Sgm
+import Solution
 from ShellElement.Results import Result
 from ShellElement.Iterations import Calc
+from ShellElement.Batch import Layup
 
 
 class ShellElem:
@@ -20,10 +20,13 @@ class ShellElem:
         self.concrete = concrete  # Данные по бетону
         self.steel = steel  # Данные по стали
         self.plies = {}  # Словарь слоев арматурных стержней
-        self.Loads = []  # Список нагрузок
+        self.loads = LoadCases(6)  # Нагрузки загружений
         self.loadcombos = {}  # Словарь комбинаций нагрузок
         self.c_p = None  # Свойства бетона
         self.c_g = None  # Свойства геометрии
+        self.seed = None  # Состояние последнего расчета для продолжения
+        self.status = None  # Код состояния последнего расчета (Solution.CONVERGED, ...)
+        self.trace = None  # Журнал сходимости последнего расчета (Solution.Trace)
 
     def add_conc_element(self, grade, h, nh):
         """
@@ -71,7 +74,7 @@ class ShellElem:
         :param case: Имя загружения, строка
         :return:
         """
-        self.Loads.append((nxx, nyy, nxy, mxx, myy, mxy, case))
+        self.loads.add(case, (nxx, nyy, nxy, mxx, myy, mxy))
 
     def add_load_combo(self, name, factors, combo_type='strength'):
         """
@@ -87,6 +90,18 @@ class ShellElem:
         # Добавляет комбинацию к словарю
         self.loadcombos[name] = new_combo
 
+    def add_load_combos(self, combos):
+        """
+        Добавляет комбинации нагрузок, например созданные генератором LoadCombos.combinations.
+
+        :param combos: Комбинации нагрузок (LoadCombo), итерируемый объект
+        :return: Количество добавленных комбинаций
+        """
+        n = len(self.loadcombos)
+        for combo in combos:
+            self.loadcombos[combo.name] = combo
+        return len(self.loadcombos) - n
+
     def force(self, combo_name):
         """
         Собирает вектор нагрузки.
@@ -94,53 +109,41 @@ class ShellElem:
         :param combo_name: Имя комбинации для вектора нагрузки
         :return: Вектор нагрузки, [МН, МН, МН, МН*м, МН*м, МН*м]
         """
-        f = np.zeros(6)
-        combo = self.loadcombos[combo_name]
-        for case, factor in combo.factors.items():
-            for load in self.Loads:
-                if load[6] == case:
-                    f[0] += factor * load[0] / 1000
-                    f[1] += factor * load[1] / 1000
-                    f[2] += factor * load[2] / 1000
-                    f[3] += factor * load[3] / 1000
-                    f[4] += factor * load[4] / 1000
-                    f[5] += factor * load[5] / 1000
-        return f
-
-    def analyze(self, combo_name, kt, gb3, v, acc):
+        return self.forces([combo_name])[0]
+
+    def forces(self, combo_names=None):
         """
-        Расчет выделенного  жб элемента оболочки.
+        Векторы нагрузки комбинаций: произведение матрицы коэффициентов комбинаций на матрицу нагрузок.
+
+        :param combo_names: Имена комбинаций нагрузок (по умолчанию все)
+        :return: Векторы нагрузки, (m, 6) [МН, МН, МН, МН*м, МН*м, МН*м]
+        """
+        if combo_names is None:
+            combo_names = self.loadcombos.keys()
+        return self.loads.combine(self.loadcombos[name] for name in combo_names) / 1000
+
+    def diagrams(self, kt, gb3):
+        """
+        Параметры диаграммы состояния бетона.
 
-        :param combo_name: Имя расчетной комбинации нагрузок
         :param kt: Коэффициент учета растяжения бетона
         :param gb3: Коэффициент gb3 бетона
-        :param v: Коэффициент Пуассона
-        :param acc: Точность расчета
+        :return: Относительные деформации и напряжения диаграммы состояния бетона
         """
-
-        pl1 = np.eye(3)
-        fg = self.force(combo_name)
-        vsigmac = np.vectorize(Sgm.sigmac)  # Векторизованная функция диаграммы состояния бетона
-        t, zb = self.c_g
-        k = len(zb)  # Количество слоев бетона по высоте сечения
-        plb = np.zeros((k, 3, 6))  # Матрица коэффициентов деформаций бетонных слоев
-        for i in range(0, k):
-            pl2 = pl1 * zb[i]
-            plb[i, :, :] = np.hstack((pl1, pl2))
-        v0_1 = np.ones(k) * v  # Коэффициенты Пуассона в слоях бетона
-        # Параметры диаграммы состояния бетона
         s_b = [self.c_p['Rb'] * gb3, self.c_p['Rb'] * 0.6 * gb3, self.c_p['Rbt'] * 0.6 * kt, self.c_p['Rbt'] * kt]
-        e_b = [self.c_p['eb2'], self.c_p['eb0'], s_b[1] / self.c_p['E'], s_b[2] / self.c_p['E'] * kt , self.c_p['ebt0'] * kt,
+        e_b = [self.c_p['eb2'], self.c_p['eb0'], s_b[1] / self.c_p['E'], s_b[2] / self.c_p['E'] * kt, self.c_p['ebt0'] * kt,
                self.c_p['ebt2'] * kt]
-        eb = self.c_p['E']  # Начальный модуль упругости бетона, МПа
-        sigc = vsigmac(e_b, *e_b, *s_b, eb, 1)  # Напряжения в бетонных слоях
-        eb_ = np.linspace(eb, eb, k)  # Начальные модули упругости в слоях бетона, МПа
-        eb = np.stack((eb_, eb_), axis=-1)  # Начальные модули упругости в слоях бетона по главным направлениям, МПа
-        vsigmas = np.vectorize(Sgm.sigmas)  # Векторизованная функция диаграммы состояния арматурной стали
-        ds = []  # диаметры арматурных стержней в каждом арматурном слое, м
-        n_s = []  # Количество арматурных стержней в каждом арматурном слое
+        return e_b, s_b
+
+    def ply_arrays(self):
+        """
+        Массивы характеристик арматурных слоев.
+
+        :return: Координаты от центра элемента [м], углы от оси X [радиан], площади [м^2], модули упругости [МПа],
+            относительные деформации (ns, 1, 4) и напряжения (ns, 1, 2) диаграмм состояния арматуры
+        """
         zs = []  # Координаты арматурных слоев от центра элемента, м
-        alpha = []  # Углы направления арматурных слоев от оси X, градусы
+        alpha = []  # Углы направления арматурных слоев от оси X, радиан
         a_s = []  # Площади поперечного сечения слоев арматурных стержней, м^2
         rsc = []  # Расчетные сопротивления арматуры сжатию, МПа
         rs = []  # Расчетные сопротивления арматуры растяжению, МПа
@@ -150,8 +153,6 @@ class ShellElem:
         es2 = []  # Относительные деформации удлинения арматуры
         es = []  # Начальные модули упругости в слоях арматуры, МПа
         for name in self.plies.keys():
-            ds.append(self.plies[name].ds)
-            n_s.append(self.plies[name].ns)
             zs.append(self.plies[name].z)
             alpha.append(self.plies[name].alpha)
             a_s.append(self.plies[name].asj)
@@ -165,50 +166,141 @@ class ShellElem:
         ns = len(zs)  # Количество слоев арматуры по высоте сечения
         eps_s = np.array([esc2, esc0, es0, es2]).transpose().reshape(ns, 1, 4)
         sig_s = np.array([rsc, rs]).transpose().reshape(ns, 1, 2)
+        return np.array(zs), np.array(alpha), np.array(a_s), np.array(es), eps_s, sig_s
+
+    def screen(self, kt, gb3, v, combo_names=None):
+        """
+        Оценка использования предельных деформаций комбинациями по линейному упругому расчету.
+
+        Матрица жесткости элемента с начальными модулями упругости собирается один раз, решения для
+        загружений суммируются по коэффициентам комбинаций (принцип суперпозиции).
+
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param v: Коэффициент Пуассона
+        :param combo_names: Имена комбинаций нагрузок (по умолчанию все)
+        :return: Оценки использования предельных деформаций (Layup.utilization), (m,)
+        """
+        if combo_names is None:
+            combo_names = list(self.loadcombos.keys())
+        layup = Layup(self, kt, gb3, v)
+        u_cases = np.linalg.solve(layup.elastic(), self.loads.matrix.T / 1000).T  # Решения для загружений
+        u = self.loads.combine((self.loadcombos[name] for name in combo_names), u_cases)
+        return layup.utilization(u)
+
+    def check_combos(self, kt, gb3, v, acc, combo_names=None, accel=None, report=False):
+        """
+        Проверка несущей способности элемента на комбинации нагрузок с отсечением по выпуклой оболочке
+        векторов нагрузки (LoadCombos.prune), расчет пакетный (Layup.solve).
+
+        Комбинация проходит проверку, если решение получено и деформации слоев бетона и арматуры
+        не превышают предельных (Layup.utilization не более 1).
+
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param v: Коэффициент Пуассона
+        :param acc: Точность расчета
+        :param combo_names: Имена расчетных комбинаций нагрузок (по умолчанию все)
+        :param accel: Ускорение итераций метода секущих: None, 'aitken', 'anderson'
+        :param report: Вывод сводки расчета
+        :return: Словарь признаков прохождения проверки по комбинациям
+        """
+        if combo_names is None:
+            combo_names = list(self.loadcombos.keys())
+        layup = Layup(self, kt, gb3, v)
+
+        def check(f):
+            u, it, ok = layup.solve(f, acc, accel=accel)
+            return ok & (layup.utilization(u) <= 1.0)
+
+        ok, done = LoadCombos.prune(self.forces(combo_names), check)
+        if report:
+            print('Рассчитано', np.count_nonzero(done), 'из', len(combo_names), 'комбинаций, не прошли проверку',
+                  np.count_nonzero(~ok))
+        return dict(zip(combo_names, ok))
+
+    def calculate(self, combo_name, kt, gb3, v, acc, method='secant', seed=None, accel=None):
+        """
+        Итерационный расчет выделенного жб элемента оболочки без вывода результатов.
+
+        Код состояния, журнал сходимости и состояние для продолжения расчета сохраняются
+        в self.status, self.trace и self.seed.
+
+        :param combo_name: Имя расчетной комбинации нагрузок
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param v: Коэффициент Пуассона
+        :param acc: Точность расчета
+        :param method: Метод расчета: 'secant' - секущий модуль, 'newton' - касательный модуль (для v = 0:
+            при v != 0 коэффициенты Пуассона уточняются методом секущих после метода Ньютона,
+            и расчет требует больше итераций, чем метод секущих)
+        :param seed: Начальное состояние (вектор общих деформаций, коэффициенты Пуассона в слоях бетона),
+            например self.seed предыдущего расчета
+        :param accel: Ускорение итераций метода секущих: None, 'aitken', 'anderson'
+        :return: Итерационный расчет (Calc) с результатами calc.rslt
+        """
+        pl1 = np.eye(3)
+        fg = self.force(combo_name)
+        t, zb = self.c_g
+        k = len(zb)  # Количество слоев бетона по высоте сечения
+        plb = np.zeros((k, 3, 6))  # Матрица коэффициентов деформаций бетонных слоев
+        for i in range(0, k):
+            pl2 = pl1 * zb[i]
+            plb[i, :, :] = np.hstack((pl1, pl2))
+        v0_1 = np.ones(k) * v  # Коэффициенты Пуассона в слоях бетона
+        e_b, s_b = self.diagrams(kt, gb3)  # Параметры диаграммы состояния бетона
+        eb = self.c_p['E']  # Начальный модуль упругости бетона, МПа
+        eb_ = np.linspace(eb, eb, k)  # Начальные модули упругости в слоях бетона, МПа
+        eb = np.stack((eb_, eb_), axis=-1)  # Начальные модули упругости в слоях бетона по главным направлениям, МПа
+        zs, alpha, a_s, es, eps_s, sig_s = self.ply_arrays()
+        ns = len(zs)  # Количество слоев арматуры по высоте сечения
         pls = np.zeros((ns, 3, 6))  # Матрица коэффициентов деформаций арматурных слоев
         for i in range(0, ns):
             pl2 = np.eye(3) * zs[i]
             pls[i, :, :] = np.hstack((pl1, pl2))
-        v01 = v0_1
-        args = v01, k, eb, eb_, plb, es, pls, fg, t, zb, ns, alpha, np.array(a_s), np.array(
-            zs), vsigmac, vsigmas, e_b, s_b, eps_s, sig_s, acc
-        calc = Calc(args)
+        u0 = None
+        if seed is not None:
+            u0, v0_1 = seed
+        v01 = np.array(v0_1, dtype=float)
+        args = v01, k, eb, eb_, plb, es, pls, fg, t, zb, ns, alpha, a_s, zs, Sgm.conc_law, Sgm.steel_law, e_b, s_b, eps_s, sig_s, acc
+        calc = Calc(args, method, u0, accel=accel)
         calc.itrn()
-        eps1, eps2, sig1, sig2, sxyb, sxys, orientation, strain, stress, eps, sig, u = calc.rslt
-        res = Result(zb, zs, t, a_s)
-        result = res.results(orientation, alpha, k, eps1, eps2, sig1, sig2, t, ns, strain, stress)
-        cvrg = res.convergence(fg, sxyb, sxys, u)
-        print('Результаты расчета:')
-        print(result)
-        min_ = min(min(eps1), min(eps2), min(strain))
-        max_ = max(max(eps1), max(eps2), max(strain))
-        ep = np.zeros((1, 2))
-        ep[0, 0] = round(min_, 6)
-        ep[0, 1] = round(max_, 6)
-        res = pd.DataFrame(ep, columns=['Strain_min', 'Strain_max'])
-        print(res.head(np.size(res)))
-        print('Проверка сходимости:')
-        print(cvrg)
-        Cch.loads('ShellElement/shell_element.png')  # Правило знаков нагрузок
-        print('Бетон класса:', self.cshell.grade)
-        print('Коэффициент работы бетона на растяжение: ', kt)
-        print('Коэффициент gb3: ', gb3)
-        print('Коэффициент Пуассона: ', v)
-        Cch.strainstress(e_b, sigc, self.cshell.grade)  # Диаграмма состояния бетона
-        pls = {}  # Словарь арматурных стержней с уникальными классами
-        for key in self.plies.keys():
-            pls[self.plies[key].grade] = self.plies[key]
-        for key in pls.keys():
-            es = np.array([pls[key].st['esc2'], pls[key].st['esc0'], pls[key].st['es0'], pls[key].st['es2']])
-            ss = np.array([pls[key].st['Rsc'], pls[key].st['Rs']])
-            e_s = np.array([pls[key].st['E']])
-            sigmas = vsigmas(es, *es, *ss, e_s)
-            print('Арматура класса:', key)
-            Cch.strainstress(es, sigmas, key)  # Диаграмма состояния арматуры
-        df = result.iloc[:k, :]
-        Sch.strain(df)
-        rstress = result['Stress1'].values[k:]
-        z = result['Z'].values[k:]
-        Sch.stress(z, df, rstress)
-        Sch.reb3d(self.plies, rstress, 'Напряжения в слоях арматуры, МПа')
-        Sch.con3d(zb, sig1, sig2, orientation, 'Напряжения в слоях бетона, МПа')
+        self.status = calc.status
+        self.trace = calc.trace
+        if calc.status == Solution.CONVERGED:
+            self.seed = calc.state
+        return calc
+
+    def analyze(self, combo_name, kt, gb3, v, acc, method='secant', seed=None, accel=None, report=False,
+                charts=False):
+        """
+        Расчет выделенного  жб элемента оболочки.
+
+        Таблицы и графики результатов выводятся только по запросу (report, charts) или позднее
+        методами Result.report и Result.charts.
+
+        :param combo_name: Имя расчетной комбинации нагрузок
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param v: Коэффициент Пуассона
+        :param acc: Точность расчета
+        :param method: Метод расчета: 'secant' - секущий модуль, 'newton' - касательный модуль (для v = 0:
+            при v != 0 коэффициенты Пуассона уточняются методом секущих после метода Ньютона,
+            и расчет требует больше итераций, чем метод секущих)
+        :param seed: Начальное состояние (вектор общих деформаций, коэффициенты Пуассона в слоях бетона),
+            например self.seed предыдущего расчета
+        :param accel: Ускорение итераций метода секущих: None, 'aitken', 'anderson'
+        :param report: Вывод таблиц результатов
+        :param charts: Вывод графиков результатов
+        :return: Результаты расчета (Result)
+        """
+        calc = self.calculate(combo_name, kt, gb3, v, acc, method, seed, accel)
+        t, zb = self.c_g
+        zs, alpha, a_s, es, eps_s, sig_s = self.ply_arrays()
+        res = Result(combo_name, calc.status, calc.it, self.force(combo_name), calc.rslt[-1], zb, t, zs, a_s, alpha,
+                     calc.rslt)
+        if report:
+            res.report(self, kt, gb3, v)
+        if charts:
+            res.charts(self, kt, gb3)
+        return res
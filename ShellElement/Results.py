@@ -1,84 +1,186 @@
 import numpy as np
-import pandas as pd
+from Solution import CONVERGED, STATUS
 
 
 class Result:
     """Результаты расчета"""
 
-    def __init__(self, zb, zs, ab, a_s):
+    def __init__(self, combo, status, it, fg, u, zb, t, zs, a_s, alpha, rslt):
         """
-        Инициализация вывода результатов расчета.
+        Инициализация результатов расчета.
 
+        :param combo: Имя расчетной комбинации нагрузок
+        :param status: Код состояния расчета (Solution.CONVERGED, ...)
+        :param it: Количество итераций
+        :param fg: Вектор нагрузки, [МН, МН, МН, МН*м, МН*м, МН*м]
+        :param u: Вектор общих деформаций
         :param zb: Координаты слоя бетона от центра элемента, м
+        :param t: Площади бетонных слоев, м^2
         :param zs: Координаты слоя арматуры от центра элемента, м
-        :param ab: Площади бетонных слоев, м^2
-        :param as: Площади арматурных слоев, м^2
+        :param a_s: Площади арматурных слоев, м^2
+        :param alpha: Угол направления  стержней в арматурных слоях от оси X, радиан
+        :param rslt: Результаты итерационного расчета (Calc.rslt)
         """
+        self.combo = combo
+        self.status = status
+        self.it = it
+        self.fg = fg
+        self.u = u
         self.zb = zb
+        self.t = t
         self.zs = zs
-        self.z = ab
         self.a_s = a_s
+        self.alpha = alpha
+        eps1, eps2, sig1, sig2, sxyb, sxys, orientation, strain, stress, _, _, _ = rslt
+        self.eps1 = eps1  # Относительная деформация в слоях бетона по направлению 1
+        self.eps2 = eps2  # Относительная деформация в слоях бетона по направлению 2
+        self.sig1 = sig1.reshape(-1)  # Напряжения в слоях бетона по направлению 1, МПа
+        self.sig2 = sig2.reshape(-1)  # Напряжения в слоях бетона по направлению 2, МПа
+        self.orientation = orientation  # Угол направления напряжения 1 в слоях бетона от оси X, радиан
+        self.strain = strain  # Относительная деформация в слоях арматуры
+        self.stress = stress  # Напряжения в слоях арматуры, МПа
+        self.sxyb = sxyb.reshape(-1, 3)  # Напряжения в бетоне по осям X и Y, МПа
+        self.sxys = sxys.reshape(-1, 3)  # Напряжения в арматуре по осям X и Y, МПа
+        self.fi = self.forces(self.sxyb, self.sxys, zb, t, zs, a_s)  # Внутренние усилия
 
-    def results(self, orientation, alpha, k, eps1, eps2, sig1, sig2, t, ns, strain, stress):
+    @staticmethod
+    def forces(sxyb, sxys, zb, t, zs, a_s):
         """
-        Результаты расчета.
+        Внутренние усилия по напряжениям в слоях.
+
+        :param sxyb: Напряжения в бетоне по осям X и Y, МПа, (k, 3)
+        :param sxys: Напряжения в арматуре по осям X и Y, МПа, (ns, 3)
+        :param zb: Координаты слоев бетона, м
+        :param t: Площади бетонных слоев, м^2
+        :param zs: Координаты слоев арматуры, м
+        :param a_s: Площади арматурных слоев, м^2
+        :return: Внутренние усилия, [МН, МН, МН, МН*м, МН*м, МН*м]
+        """
+        w = np.vstack((sxyb, sxys)) * np.hstack((t, a_s))[:, None]
+        return np.hstack((np.sum(w, axis=0), np.hstack((zb, zs)) @ w))
+
+    @property
+    def converged(self):
+        """Признак получения решения"""
+        return self.status == CONVERGED
+
+    @property
+    def residual(self):
+        """Невязка внутренних усилий и нагрузки, [МН, МН, МН, МН*м, МН*м, МН*м]"""
+        return self.fi - self.fg
+
+    def results(self):
+        """
+        Результаты расчета в слоях бетона и арматуры.
 
-        :param orientation: Угол направления напряжения 1 в слоях бетона от оси X, радиан
-        :param alpha: Угол направления  стержней в арматурных слоях от оси X, радиан
-        :param k: Количество слоев бетона
-        :param eps1: Относительная деформация в слоях бетона по направлению 1
-        :param eps2: Относительная деформация в слоях бетона по направлению 2
-        :param sig1: Напряжения в слоях бетона по направлению 1, МПа
-        :param sig2: Напряжения в слоях бетона по направлению 2, МПа
-        :param t: Толщина слоев бетона, м
-        :param ns: Количество арматурных слоев
-        :param strain: Относительная деформация в слоях арматуры
-        :param stress: Напряжения в слоях арматуры, МПа
         :return: Таблица Pandas
         """
-        ang_c = np.degrees(orientation)
-        ang_s = np.degrees(alpha)
-        res1_b = np.hstack((self.zb.reshape(k, 1),
-                            np.round(eps1.reshape(k, 1), 5),
-                            np.round(eps2.reshape(k, 1), 5),
-                            np.round(sig1.reshape(k, 1), 2),
-                            np.round(sig2.reshape(k, 1), 2),
-                            np.round(ang_c.reshape(k, 1), 3),
-                            t.reshape(k, 1)))
-        res1_s = np.hstack((np.array(self.zs).reshape(ns, 1),
-                            np.round(strain.reshape(ns, 1), 5),
-                            np.zeros(ns).reshape(ns, 1),
-                            np.round(stress.reshape(ns, 1), 2),
-                            np.zeros(ns).reshape(ns, 1),
-                            np.round(ang_s.reshape(ns, 1), 3),
-                            np.array(self.a_s).reshape(ns, 1)))
-        res = np.vstack((res1_b, res1_s))
-        result = pd.DataFrame(res, columns=['Z', 'Strain1', 'Strain2', 'Stress1', 'Stress2', 'Angle', 'Area'])
-        return result
-
-    def convergence(self, fg, sxyb, sxys, u):
+        import pandas as pd
+
+        k = len(self.zb)
+        ns = len(self.zs)
+        res1_b = np.column_stack((self.zb,
+                                  np.round(self.eps1, 5),
+                                  np.round(self.eps2, 5),
+                                  np.round(self.sig1, 2),
+                                  np.round(self.sig2, 2),
+                                  np.round(np.degrees(self.orientation), 3),
+                                  self.t))
+        res1_s = np.column_stack((self.zs,
+                                  np.round(self.strain, 5),
+                                  np.zeros(ns),
+                                  np.round(self.stress, 2),
+                                  np.zeros(ns),
+                                  np.round(np.degrees(self.alpha), 3),
+                                  self.a_s))
+        res = np.vstack((res1_b.reshape(k, 7), res1_s.reshape(ns, 7)))
+        return pd.DataFrame(res, columns=['Z', 'Strain1', 'Strain2', 'Stress1', 'Stress2', 'Angle', 'Area'])
+
+    def convergence(self):
         """
         Проверка сходимости.
 
-        :param fg: Вектор нагрузки, [МН, МН, МН, МН*м, МН*м, МН*м]
-        :param sxyb: Напряжения в бетоне, МПа
-        :param sxys: Напряжения в арматуре, МПа
-        :param u: Вектор деформаций
         :return: Таблица Pandas
         """
+        import pandas as pd
+
+        cvr = np.column_stack((self.fg, np.round(self.fi, 4), self.u))
+        return pd.DataFrame(cvr, index=['Nxx', 'Nyy', 'Nxy', 'Mxx', 'Myy', 'Mxy'], columns=['Дано:', 'Получено:', 'u:'])
+
+    def report(self, elem, kt, gb3, v):
+        """
+        Вывод таблиц результатов расчета.
+
+        :param elem: Выделенный жб элемент оболочки (ShellElem)
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :param v: Коэффициент Пуассона
+        :return:
+        """
+        import pandas as pd
+
+        if not self.converged:
+            print('Решение не получено:', STATUS[self.status])
+            print('Выполнено', self.it, 'итераций')
+            return
+        print('Решение получено')
+        print('Выполнено', self.it, 'итераций')
+        print('Результаты расчета:')
+        print(self.results())
+        ep = np.round([[min(np.min(self.eps1), np.min(self.eps2), np.min(self.strain, initial=np.inf)),
+                        max(np.max(self.eps1), np.max(self.eps2), np.max(self.strain, initial=-np.inf))]], 6)
+        res = pd.DataFrame(ep, columns=['Strain_min', 'Strain_max'])
+        print(res.head(np.size(res)))
+        print('Проверка сходимости:')
+        print(self.convergence())
+        print('Бетон класса:', elem.cshell.grade)
+        print('Коэффициент работы бетона на растяжение: ', kt)
+        print('Коэффициент gb3: ', gb3)
+        print('Коэффициент Пуассона: ', v)
+        for key in dict.fromkeys(ply.grade for ply in elem.plies.values()):
+            print('Арматура класса:', key)
+
+    def figures(self, elem, kt, gb3):
+        """
+        Графики результатов расчета для вывода на экран или в файлы (Export.export).
 
-        z = np.hstack((self.zb, self.zs))
-        sxy = np.vstack((sxyb, sxys))
-        a = np.hstack((self.z, self.a_s))
-        ff = np.zeros(6)
-        n = len(z)
-        for i in range(0, n):
-            ff[0] = ff[0] + sxy[i][0] * a[i]
-            ff[1] = ff[1] + sxy[i][1] * a[i]
-            ff[2] = ff[2] + sxy[i][2] * a[i]
-            ff[3] = ff[3] + sxy[i][0] * a[i] * z[i]
-            ff[4] = ff[4] + sxy[i][1] * a[i] * z[i]
-            ff[5] = ff[5] + sxy[i][2] * a[i] * z[i]
-        cvr = np.hstack((fg.reshape(6, 1), np.round(ff.reshape(6, 1), 4), u.reshape(6, 1)))
-        cvrg = pd.DataFrame(cvr, index=['Nxx', 'Nyy', 'Nxy', 'Mxx', 'Myy', 'Mxy'], columns=['Дано:', 'Получено:', 'u:'])
-        return cvrg
+        :param elem: Выделенный жб элемент оболочки (ShellElem)
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :return: Список графиков [(имя, функция, аргументы)]
+        """
+        import ShellElement.Scharts as Sch
+        import Ccharts as Cch
+        import Sigma as Sgm
+
+        e_b, s_b = elem.diagrams(kt, gb3)  # Параметры диаграммы состояния бетона
+        sigc = Sgm.vsigmac(e_b, *e_b, *s_b, elem.c_p['E'], 1)  # Напряжения диаграммы состояния бетона
+        figs = [('loads', Cch.loads, ('ShellElement/shell_element.png',)),  # Правило знаков нагрузок
+                (elem.cshell.grade, Cch.strainstress, (e_b, sigc, elem.cshell.grade))]  # Диаграмма бетона
+        pls = {ply.grade: ply for ply in elem.plies.values()}  # Слои арматуры с уникальными классами
+        for key, ply in pls.items():
+            es = np.array([ply.st['esc2'], ply.st['esc0'], ply.st['es0'], ply.st['es2']])
+            ss = np.array([ply.st['Rsc'], ply.st['Rs']])
+            sigmas = Sgm.vsigmas(es, *es, *ss, np.array([ply.st['E']]))
+            figs.append((key, Cch.strainstress, (es, sigmas, key)))  # Диаграмма состояния арматуры
+        df = self.results().iloc[:len(self.zb), :]
+        figs += [('strain', Sch.strain, (df,)),
+                 ('stress', Sch.stress, (self.zs, df, self.stress)),
+                 ('reb3d', Sch.reb3d, (elem.plies, self.stress, 'Напряжения в слоях арматуры, МПа')),
+                 ('con3d', Sch.con3d, (self.zb, self.sig1, self.sig2, self.orientation,
+                                       'Напряжения в слоях бетона, МПа'))]
+        return figs
+
+    def charts(self, elem, kt, gb3):
+        """
+        Графики результатов расчета.
+
+        :param elem: Выделенный жб элемент оболочки (ShellElem)
+        :param kt: Коэффициент учета растяжения бетона
+        :param gb3: Коэффициент gb3 бетона
+        :return:
+        """
+        if not self.converged:
+            return
+        for name, func, args in self.figures(elem, kt, gb3):
+            func(*args)
@@ -1,10 +1,11 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from Ccharts import show
 
-def strain(df):
+def strain(df, path=None):
     """Относительные деформации в слоях железобетонной оболочки."""
 
-    plt.figure(num=strain.__doc__)
+    fig = plt.figure(num=strain.__doc__)
     ax = plt.gca()
     df.plot(kind='line', x='Z', y='Strain1', color='green', ax=ax)
     df.plot(kind='line', x='Z', y='Strain2', color='red', ax=ax)
@@ -13,13 +14,13 @@ def strain(df):
     ax.set_ylabel('Относительные деформации в слоях бетона')
     plt.subplots_adjust(left=0.185, right=0.815, bottom=0.1, top=0.85)
 
-    plt.show()
+    show(fig, path)
 
 
-def stress(z, df, rstress):
+def stress(z, df, rstress, path=None):
     """Напряжения в слоях железобетонной оболочки, МПа."""
 
-    plt.figure(num=stress.__doc__)
+    fig = plt.figure(num=stress.__doc__)
     ax = plt.gca()
     df.plot(kind='line', x='Z', y='Stress1', color='green', ax=ax)
     df.plot(kind='line', x='Z', y='Stress2', color='red', ax=ax)
@@ -31,10 +32,10 @@ def stress(z, df, rstress):
     ax.set_xlabel('Центры слоев плиты и арматуры, м')
     ax.set_ylabel('Напряжения в слоях бетона и арматуры, МПа')
     plt.subplots_adjust(left=0.185, right=0.815, bottom=0.1, top=0.9)
-    plt.show()
+    show(fig, path)
 
 
-def reb3d(plies, rstress, name):
+def reb3d(plies, rstress, name, path=None):
     """3D"""
     i = 0
     fig = plt.figure(num=name)
@@ -58,16 +59,16 @@ def reb3d(plies, rstress, name):
     ax.set_xlabel('X, м')
     ax.set_ylabel('Y, м')
     ax.set_zlabel('Z, м')
-    plt.show()
+    show(fig, path)
 
 
-def con3d(zb, sig1, sig2, orn, name):
+def con3d(zb, sig1, sig2, orn, name, path=None):
     """3D"""
     fig = plt.figure(num=name)
     ax = fig.add_subplot(111, projection='3d')
     for i in range(len(zb)):
-        s1 = sig1[i][0]
-        s2 = sig2[i][0]
+        s1 = sig1[i]
+        s2 = sig2[i]
         a1 = orn[i]
         a2 = a1 - np.pi / 2
         x = 0
@@ -84,4 +85,4 @@ def con3d(zb, sig1, sig2, orn, name):
     ax.set_xlabel('X')
     ax.set_ylabel('Y')
     ax.set_zlabel('Z, м')
-    plt.show()
+    show(fig, path)
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def sigmac(eps, eb2, eb0, eb1, ebt1, ebt0, ebt2, rb, sb1, sbt1, rbt, e, k_rc):
     """
     Диаграмма состояния бетона.
@@ -60,3 +63,150 @@ def sigmas(eps, esc2, esc0, es0, es2, rsc, rs, e):
     else:
         s = 0.0
     return s
+
+
+def conc_law(eps, eb2, eb0, eb1, ebt1, ebt0, ebt2, rb, sb1, sbt1, rbt, e, k_rc=1.0):
+    """
+    Диаграмма состояния бетона для массивов деформаций.
+
+    Ветви диаграммы совпадают с sigmac, дополнительно за один проход вычисляются коэффициент упругости
+    (секущий модуль к начальному) и касательный модуль.
+
+    :param eps: Относительные деформации, массив
+    :param eb2: Относительная деформация укорочения
+    :param eb0: Относительная деформация укорочения
+    :param eb1: Относительная деформация укорочения
+    :param ebt1: Относительная деформация удлинения
+    :param ebt0: Относительная деформация удлинения
+    :param ebt2: Относительная деформация удлинения
+    :param rb: Расчетное сопротивление бетона осевому сжатию, МПа
+    :param sb1: Напряжение сжатия
+    :param sbt1: Напряжение растяжения
+    :param rbt: Расчетное сопротивление бетона осевому растяжению, МПа
+    :param e: Mодуль упругости, МПа (число или массив)
+    :param k_rc: Коэффициент уменьшения прочности бетона (число или массив)
+    :return: Напряжения [МПа], коэффициенты упругости, касательные модули [МПа]
+    """
+
+    eps = np.asarray(eps, dtype=float)
+    # Номер ветви диаграммы: 0 - площадка сжатия, 1 - нисходящая ветвь сжатия, 2 - упругая ветвь,
+    # 3 - ветвь растяжения, 4 - площадка растяжения
+    seg = (eps > eb0).view(np.int8) + (eps >= eb1) + (eps > ebt1) + (eps >= ebt0)
+    et_b = (rb - sb1) / (eb0 - eb1)  # Наклон ветви сжатия
+    et_t = (rbt - sbt1) / (ebt0 - ebt1) if ebt0 != ebt1 and rbt != 0.0 else 0.0  # Наклон ветви растяжения
+    a0 = np.array([rb, sb1 - et_b * eb1, 0.0, sbt1 - et_t * ebt1 if et_t != 0.0 else 0.0, rbt])[seg]
+    a1 = np.array([0.0, et_b, 0.0, et_t, 0.0])[seg]
+    elastic = seg == 2
+    et = np.where(elastic, e, a1)
+    s = a0 + et * eps
+    if np.any(k_rc != 1.0):
+        kr = np.where(seg <= 1, k_rc, 1.0)
+        s *= kr
+        et *= kr
+    nz = eps != 0.0
+    v = np.ones(eps.shape)
+    np.divide(s / e, eps, out=v, where=nz)
+    et = np.where(nz, et, e)
+    return s, v, et
+
+
+def steel_law(eps, esc2, esc0, es0, es2, rsc, rs, e):
+    """
+    Диаграмма состояния арматурной стали для массивов деформаций.
+
+    :param eps: Относительные деформации, массив
+    :param esc2: Относительная деформация укорочения
+    :param esc0: Относительная деформация укорочения
+    :param es0: Относительная деформация удлинения
+    :param es2: Относительная деформация удлинения
+    :param rsc: Расчетное сопротивление арматуры сжатию, МПа
+    :param rs: Расчетное сопротивление арматуры растяжению, МПа
+    :param e: Mодуль упругости, МПа
+    :return: Напряжения [МПа], коэффициенты упругости, касательные модули [МПа]
+    """
+
+    eps = np.asarray(eps, dtype=float)
+    elastic = (esc0 < eps) & (eps < es0)
+    s = np.where(esc0 >= eps, rsc, np.where(elastic, e * eps, rs))
+    et = np.where(elastic, e, 0.0)
+    nz = eps != 0.0
+    v = np.ones(eps.shape)
+    np.divide(s / e, eps, out=v, where=nz)
+    et = np.where(nz, et, e)
+    return s, v, et
+
+
+def vsigmac(eps, eb2, eb0, eb1, ebt1, ebt0, ebt2, rb, sb1, sbt1, rbt, e, k_rc=1.0):
+    """
+    Напряжения по диаграмме состояния бетона для массивов деформаций.
+
+    :return: Напряжения, МПа
+    """
+    return conc_law(eps, eb2, eb0, eb1, ebt1, ebt0, ebt2, rb, sb1, sbt1, rbt, e, k_rc)[0]
+
+
+def vsigmas(eps, esc2, esc0, es0, es2, rsc, rs, e):
+    """
+    Напряжения по диаграмме состояния арматурной стали для массивов деформаций.
+
+    :return: Напряжения, МПа
+    """
+    return steel_law(eps, esc2, esc0, es0, es2, rsc, rs, e)[0]
+
+
+def conc_segments(eb2, eb0, eb1, ebt1, ebt0, ebt2, rb, sb1, sbt1, rbt, e):
+    """
+    Линейные участки диаграммы состояния бетона s = a0 + a1 * eps.
+
+    Участки совпадают с conc_law: 0 - площадка сжатия, 1 - нисходящая ветвь сжатия, 2 - упругая ветвь,
+    3 - ветвь растяжения, 4 - площадка растяжения.
+
+    :param eb2: Относительная деформация укорочения
+    :param eb0: Относительная деформация укорочения
+    :param eb1: Относительная деформация укорочения
+    :param ebt1: Относительная деформация удлинения
+    :param ebt0: Относительная деформация удлинения
+    :param ebt2: Относительная деформация удлинения
+    :param rb: Расчетное сопротивление бетона осевому сжатию, МПа
+    :param sb1: Напряжение сжатия
+    :param sbt1: Напряжение растяжения
+    :param rbt: Расчетное сопротивление бетона осевому растяжению, МПа
+    :param e: Mодуль упругости, МПа
+    :return: Точки перелома (4,), коэффициенты a0 [МПа] (5,), a1 [МПа] (5,)
+    """
+
+    et_b = (rb - sb1) / (eb0 - eb1)  # Наклон ветви сжатия
+    et_t = (rbt - sbt1) / (ebt0 - ebt1) if ebt0 != ebt1 and rbt != 0.0 else 0.0  # Наклон ветви растяжения
+    a0 = np.array([rb, sb1 - et_b * eb1, 0.0, sbt1 - et_t * ebt1 if et_t != 0.0 else 0.0, rbt])
+    a1 = np.array([0.0, et_b, e, et_t, 0.0])
+    return np.array([eb0, eb1, ebt1, ebt0], dtype=float), a0, a1
+
+
+def conc_branch(eps, eb0, eb1, ebt1, ebt0):
+    """
+    Номера ветвей диаграммы состояния бетона (как в conc_law).
+
+    :param eps: Относительные деформации, массив
+    :param eb0: Относительная деформация укорочения
+    :param eb1: Относительная деформация укорочения
+    :param ebt1: Относительная деформация удлинения
+    :param ebt0: Относительная деформация удлинения
+    :return: Номера ветвей: 0 - площадка сжатия, 1 - нисходящая ветвь сжатия, 2 - упругая ветвь,
+        3 - ветвь растяжения, 4 - площадка растяжения
+    """
+    eps = np.asarray(eps, dtype=float)
+    return (eps > eb0).view(np.int8) + (eps >= eb1) + (eps > ebt1) + (eps >= ebt0)
+
+
+def steel_branch(eps, esc0, es0):
+    """
+    Номера ветвей диаграммы состояния арматурной стали (как в steel_law).
+
+    :param eps: Относительные деформации, массив
+    :param esc0: Относительная деформация укорочения
+    :param es0: Относительная деформация удлинения
+    :return: Номера ветвей: 0 - площадка сжатия, 1 - упругая ветвь, 2 - площадка растяжения
+    """
+    eps = np.asarray(eps, dtype=float)
+    return (esc0 < eps).view(np.int8) + (eps >= es0)
+
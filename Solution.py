@@ -1,28 +1,412 @@
 import numpy as np
 
 
+# Коды состояния расчета
+CONVERGED = 0  # Решение получено
+SINGULAR = 1  # Вырожденная матрица жесткости
+DIVERGED = 2  # Расходимость итераций
+MAXITER = 3  # Превышено максимальное количество итераций
+SKIPPED = 4  # Расчет не выполнялся: комбинация не определяющая по линейному упругому расчету
+STATUS = ('converged', 'singular', 'diverged', 'max-iterations', 'skipped')  # Имена кодов состояния
+EPS_MAX = 1.0  # Относительная деформация, при превышении которой итерации считаются расходящимися
+
+
 class Calculation:
     """Решение"""
 
     @staticmethod
-    def calc(d, f):
+    def solve(d, f, fallback=None, cmax=None, reg=1e-10):
         """
-        Получение вектора деформаций.
+        Решение пакета систем уравнений с контролем вырожденности.
+
+        Вырожденными считаются матрицы, для которых не удалось решение, и матрицы с числом обусловленности
+        больше cmax. Для вырожденных матриц решение определяется методом fallback: 'lstsq' - псевдообратной
+        матрицей (решение с минимальной нормой), 'regularize' - с добавлением к диагонали reg * max|d_ii|.
 
-        :param d: Матрица жесткости
-        :param f: Вектор нагрузок
-        :return: Вектор деформаций
+        :param d: Матрицы жесткости, (m, n, n)
+        :param f: Векторы нагрузок, (m, n)
+        :param fallback: Метод решения для вырожденных матриц: None (решение NaN), 'lstsq', 'regularize'
+        :param cmax: Максимальное число обусловленности (None - без контроля)
+        :param reg: Относительный параметр регуляризации
+        :return: Векторы деформаций (m, n), признаки вырожденности (m,), числа обусловленности (m,)
+            (NaN без контроля)
         """
+        if fallback not in (None, 'lstsq', 'regularize'):
+            raise ValueError(f"Неизвестный метод решения вырожденных систем '{fallback}'")
+        m = len(f)
+        cond = np.full(m, np.nan)
+        bad = np.zeros(m, dtype=bool)
+        if cmax is not None:
+            cond = np.linalg.cond(d)
+            bad = ~(cond <= cmax)
+        u = np.full(f.shape, np.nan)
+        rows = np.flatnonzero(~bad)
         try:
-            dr =d
-            fr = f
-            u = np.linalg.solve(d, f)
-        except np.linalg.LinAlgError as var1:
-            d = np.eye(3)
-            fi = np.array(([0.0, 0.0, 0.0]))
-            u = np.linalg.solve(d, fi)
-            print('Решение невозможно:', var1)
-            print(dr)
-            print(fr)
-            quit()
-        return u
+            u[rows] = np.linalg.solve(d[rows], f[rows][..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            for i in rows:
+                try:
+                    u[i] = np.linalg.solve(d[i], f[i])
+                except np.linalg.LinAlgError:
+                    bad[i] = True
+        bad |= ~np.all(np.isfinite(u), axis=1)
+        rows = np.flatnonzero(bad)
+        if len(rows) and fallback == 'lstsq':
+            u[rows] = (np.linalg.pinv(d[rows]) @ f[rows][..., None])[..., 0]
+        elif len(rows) and fallback == 'regularize':
+            dr = d[rows].copy()
+            diag = np.einsum('mii->mi', dr)
+            diag += reg * np.max(np.abs(diag), axis=1, initial=0.0)[:, None] + np.finfo(float).tiny
+            try:
+                u[rows] = np.linalg.solve(dr, f[rows][..., None])[..., 0]
+            except np.linalg.LinAlgError:
+                u[rows] = (np.linalg.pinv(dr) @ f[rows][..., None])[..., 0]
+        return u, bad, cond
+
+    @staticmethod
+    def solve_batch(d, f, fallback=None, cmax=None):
+        """
+        Получение векторов деформаций для пакета задач без прерывания расчета.
+
+        :param d: Матрицы жесткости, (m, n, n)
+        :param f: Векторы нагрузок, (m, n)
+        :param fallback: Метод решения для вырожденных матриц: None (решение NaN), 'lstsq', 'regularize'
+        :param cmax: Максимальное число обусловленности (None - без контроля)
+        :return: Векторы деформаций (m, n), признаки успешного решения (m,)
+        """
+        u, bad, _ = Calculation.solve(d, f, fallback, cmax)
+        ok = np.all(np.isfinite(u), axis=1)
+        return u, ok
+
+    @staticmethod
+    def newton(state, u, f, acc, maxit=50, ls=4, trace=None):
+        """
+        Метод Ньютона-Рафсона с касательной матрицей жесткости и линейным поиском.
+
+        :param state: Функция state(u) -> (внутренние усилия (m, n), касательные матрицы жесткости (m, n, n))
+        :param u: Начальные векторы деформаций, (m, n)
+        :param f: Векторы нагрузок, (m, n)
+        :param acc: Точность расчета
+        :param maxit: Максимальное количество итераций
+        :param ls: Максимальное количество делений шага при линейном поиске
+        :param trace: Журнал сходимости (Trace) для записи итераций
+        :return: Векторы деформаций (m, n), количество итераций (m,), признаки сходимости (m,)
+        """
+        u = np.array(u, dtype=float)
+        m = len(f)
+        it = np.zeros(m, dtype=int)  # Количество итераций
+        ok = np.zeros(m, dtype=bool)  # Сошедшиеся задачи
+        fi, kt = state(u)
+        r = f - fi  # Невязки
+        active = np.ones(m, dtype=bool)
+        for _ in range(maxit):
+            idx = np.flatnonzero(active)
+            if len(idx) == 0:
+                break
+            du, solved = Calculation.solve_batch(kt[idx], r[idx])
+            active[idx[~solved]] = False
+            idx = idx[solved]
+            du = du[solved]
+            it[idx] += 1
+            r0 = np.linalg.norm(r[idx], axis=1)
+            alpha = np.ones(len(idx))  # Множители шага
+            left = np.arange(len(idx))  # Задачи без принятого шага
+            for j in range(ls + 1):
+                ut = u[idx[left]] + alpha[left, None] * du[left]
+                fit, ktt = state(ut)
+                rt = f[idx[left]] - fit
+                accept = (np.linalg.norm(rt, axis=1) < r0[left]) | (j == ls)
+                sel = idx[left[accept]]
+                u[sel] = ut[accept]
+                r[sel] = rt[accept]
+                kt[sel] = ktt[accept]
+                left = left[~accept]
+                alpha[left] *= 0.5
+                if len(left) == 0:
+                    break
+            step = np.max(np.abs(du), axis=1)  # Полный шаг Ньютона без учета линейного поиска
+            if trace is not None:
+                trace.record(idx, step, np.max(np.abs(r[idx]), axis=1))
+            done = step < acc
+            ok[idx[done]] = True
+            active[idx[done]] = False
+            active[idx[~np.isfinite(step)]] = False
+        ok &= np.all(np.isfinite(u), axis=1)
+        return u, it, ok
+
+    @staticmethod
+    def scale(f):
+        """
+        Масштабы компонент векторов нагрузки пакета для нормирования.
+
+        :param f: Векторы нагрузок, (m, n)
+        :return: Наибольшие по пакету абсолютные значения компонент (нулевые заменяются единицей), (n,)
+        """
+        scale = np.max(np.abs(f), axis=0)
+        return np.where(scale > 0, scale, 1.0)
+
+    @staticmethod
+    def near(f, rows, parents, tol):
+        """
+        Признаки близости векторов нагрузки задач к векторам нагрузки ближайших решенных задач.
+
+        :param f: Векторы нагрузок пакета, (m, n)
+        :param rows: Номера задач, (k,)
+        :param parents: Номера ближайших решенных задач, (k,)
+        :param tol: Наибольшее расстояние нормированных векторов нагрузки, отнесенное к длине вектора задачи
+        :return: Признаки близости, (k,)
+        """
+        g = f / Calculation.scale(f)
+        d = np.linalg.norm(g[rows] - g[parents], axis=1)
+        return d <= tol * np.linalg.norm(g[rows], axis=1)
+
+    @staticmethod
+    def closer(f, r1, r0):
+        """
+        Признаки меньшей невязки от решений ближайших задач, чем от упругих решений.
+
+        :param f: Векторы нагрузок пакета, (m, n)
+        :param r1: Невязки от решений ближайших задач, (k, n)
+        :param r0: Невязки от упругих решений, (k, n)
+        :return: Признаки, (k,)
+        """
+        scale = Calculation.scale(f)
+        return np.linalg.norm(r1 / scale, axis=1) < np.linalg.norm(r0 / scale, axis=1)
+
+    @staticmethod
+    def waves(f, levels=2, tol=None):
+        """
+        Порядок расчета пакета задач с продолжением от ближайших решенных задач.
+
+        Опорные задачи выбираются последовательным выбором наиболее удаленной задачи в пространстве
+        нормированных векторов нагрузки. Первая волна (около m^(1/levels) задач) решается от упругого
+        состояния, задачи каждой следующей волны - от ближайшей задачи предыдущих волн. При заданном tol
+        задачи, не близкие к ближайшей решенной задаче (Calculation.near), переносятся в первую волну.
+
+        :param f: Векторы нагрузок, (m, n)
+        :param levels: Количество волн
+        :param tol: Наибольшее относительное расстояние нормированных векторов нагрузки для продолжения
+        :return: Список волн: (номера задач, номера ближайших решенных задач или -1)
+        """
+        f = np.asarray(f, dtype=float)
+        f = f.reshape(len(f), -1)
+        m = len(f)
+        if m == 0:
+            return []
+        g = f / Calculation.scale(f)  # Нормированные векторы нагрузки
+        near = np.full(m, -1)  # Ближайшие решенные задачи
+        dist = np.full(m, np.inf)  # Расстояния до ближайших решенных задач
+        solved = np.zeros(m, dtype=bool)
+        i = int(np.argmin(np.linalg.norm(g - np.mean(g, axis=0), axis=1)))  # Задача, ближайшая к центру
+        sizes = [int(np.ceil(m ** (lv / levels))) for lv in range(1, levels)] + [m]
+        count = 0
+        res = []
+        for n in sizes:
+            parents = near.copy()
+            if n >= m:
+                rows = np.flatnonzero(~solved)
+            else:
+                rows = []
+                while count < n:
+                    rows.append(i)
+                    solved[i] = True
+                    count += 1
+                    d = np.linalg.norm(g - g[i], axis=1)
+                    upd = d < dist
+                    dist[upd] = d[upd]
+                    near[upd] = i
+                    dist[solved] = -1.0
+                    i = int(np.argmax(dist))
+                rows = np.array(rows, dtype=int)
+            if len(rows):
+                res.append((rows, parents[rows]))
+            solved[rows] = True
+            count = np.count_nonzero(solved)
+            if count == m:
+                break
+        if tol is not None and len(res) > 1:
+            far = [~Calculation.near(f, rows, parents, tol) for rows, parents in res[1:]]
+            first = np.hstack([res[0][0]] + [rows[d] for (rows, parents), d in zip(res[1:], far)])
+            res = [(first, np.full(len(first), -1))] + [(rows[~d], parents[~d])
+                                                         for (rows, parents), d in zip(res[1:], far) if not np.all(d)]
+        return res
+
+
+class Trace:
+    """Журнал сходимости итераций пакета задач"""
+
+    def __init__(self, m):
+        """
+        Инициализация журнала сходимости.
+
+        На каждой итерации для рассчитываемых задач записываются: максимальное приращение вектора
+        деформаций du, максимальная невязка внутренних усилий и нагрузки и количество волокон (слоев),
+        перешедших на другую ветвь диаграммы состояния. Журнал хранится по итерациям, массивы по задачам
+        (m, s) формируются при обращении.
+
+        :param m: Количество задач
+        """
+        self.m = m
+        self.count = np.zeros(m, dtype=int)  # Количество записанных итераций задач
+        self._log = []  # Записи итераций: (номера задач, номера итераций задач, du, невязки, переходы)
+        self._arrays = None
+
+    def record(self, rows, du, residual, branch=None):
+        """
+        Запись итерации.
+
+        :param rows: Номера задач, (k,)
+        :param du: Максимальные приращения векторов деформаций, (k,)
+        :param residual: Максимальные невязки усилий, МН и МН*м, (k,)
+        :param branch: Количество переходов на другие ветви диаграмм (None - не определяется), (k,)
+        :return:
+        """
+        rows = np.asarray(rows, dtype=int)
+        if branch is None:
+            branch = np.full(len(rows), -1)
+        self._log.append((rows, self.count[rows], np.asarray(du, dtype=float), np.asarray(residual, dtype=float),
+                          np.asarray(branch, dtype=int)))
+        self.count[rows] += 1
+        self._arrays = None
+
+    def extend(self, rows, other):
+        """
+        Добавление журнала части пакета (волны продолжения, блока, уровня сгущения сетки).
+
+        :param rows: Номера задач пакета, соответствующие задачам журнала other, (other.m,)
+        :param other: Журнал сходимости части пакета
+        :return:
+        """
+        rows = np.asarray(rows, dtype=int)
+        for r, k, du, res, br in other._log:
+            self.record(rows[r], du, res, br)
+
+    def arrays(self):
+        """
+        Журнал по задачам, отсутствующие итерации заполнены NaN (du, невязки) и -1 (переходы).
+
+        :return: Приращения du (m, s), невязки (m, s), количество переходов (m, s)
+        """
+        if self._arrays is None:
+            s = int(np.max(self.count, initial=0))
+            du = np.full((self.m, s), np.nan)
+            res = np.full((self.m, s), np.nan)
+            br = np.full((self.m, s), -1)
+            for r, k, d, e, b in self._log:
+                du[r, k] = d
+                res[r, k] = e
+                br[r, k] = b
+            self._arrays = du, res, br
+        return self._arrays
+
+    @property
+    def du(self):
+        """Максимальные приращения векторов деформаций по итерациям, (m, s)"""
+        return self.arrays()[0]
+
+    @property
+    def residual(self):
+        """Максимальные невязки внутренних усилий и нагрузки по итерациям, (m, s)"""
+        return self.arrays()[1]
+
+    @property
+    def branch(self):
+        """Количество переходов волокон (слоев) на другие ветви диаграмм по итерациям, (m, s)"""
+        return self.arrays()[2]
+
+    def summary(self):
+        """
+        Сводка журнала по задачам.
+
+        :return: Словарь массивов (m,): количество итераций, последние du и невязки, всего переходов
+        """
+        du, res, br = self.arrays()
+        last = np.maximum(self.count - 1, 0)
+        rows = np.arange(self.m)
+        has = self.count > 0
+        return {
+            'iterations': self.count.copy(),
+            'du': np.where(has, du[rows, last] if du.size else np.nan, np.nan),
+            'residual': np.where(has, res[rows, last] if res.size else np.nan, np.nan),
+            'branch': np.sum(np.maximum(br, 0), axis=1),
+        }
+
+
+class Acceleration:
+    """Ускорение сходимости итераций неподвижной точки u = g(u) для пакета задач"""
+
+    def __init__(self, m, n, method=None, depth=3):
+        """
+        Инициализация ускорения итераций.
+
+        Методы: 'aitken' - релаксация Эйткена (Irons-Tuck) с общим множителем шага для задачи,
+        'anderson' - смешивание Андерсона по depth предыдущим итерациям. Если невязка задачи возрастает,
+        история сбрасывается и выполняется обычный шаг u = g(u). Неподвижная точка, а значит и решение
+        при заданной точности, от метода не зависит.
+
+        :param m: Количество задач
+        :param n: Количество неизвестных задачи
+        :param method: Метод ускорения: None (без ускорения), 'aitken', 'anderson'
+        :param depth: Глубина истории метода Андерсона
+        """
+        if method not in (None, 'aitken', 'anderson'):
+            raise ValueError(f"Неизвестный метод ускорения итераций '{method}'")
+        self.method = method
+        self.depth = depth
+        self.x = np.zeros((m, n))  # Предыдущие приближения
+        self.r = np.zeros((m, n))  # Предыдущие невязки g(u) - u
+        self.count = np.zeros(m, dtype=int)  # Количество итераций в истории задач
+        self.omega = np.ones(m)  # Множители шага метода Эйткена
+        self.dx = np.zeros((m, n, depth))  # Разности приближений (метод Андерсона)
+        self.dr = np.zeros((m, n, depth))  # Разности невязок (метод Андерсона)
+
+    def step(self, rows, x, g):
+        """
+        Следующее приближение для задач пакета.
+
+        :param rows: Номера задач, (k,)
+        :param x: Текущие приближения, (k, n)
+        :param g: Значения отображения g(x), (k, n)
+        :return: Следующие приближения, (k, n)
+        """
+        if self.method is None:
+            return g
+        r = g - x  # Невязки
+        rn = np.linalg.norm(r, axis=1)
+        prev = self.count[rows] > 0
+        # Сброс истории при возрастании невязки
+        reset = prev & (rn >= np.linalg.norm(self.r[rows], axis=1))
+        dx = x - self.x[rows]
+        dr = r - self.r[rows]
+        x_new = g.copy()
+        if self.method == 'aitken':
+            omega = self.omega[rows]
+            den = np.sum(dr * dr, axis=1)
+            upd = prev & ~reset & (den > 0)
+            omega[upd] = -omega[upd] * np.sum(self.r[rows][upd] * dr[upd], axis=1) / den[upd]
+            omega = np.where(reset | ~np.isfinite(omega), 1.0, np.clip(omega, 0.1, 2.0))
+            x_new = x + omega[:, None] * r
+            self.omega[rows] = omega
+        else:
+            hx = self.dx[rows]
+            hr = self.dr[rows]
+            hx[prev] = np.roll(hx[prev], 1, axis=2)
+            hr[prev] = np.roll(hr[prev], 1, axis=2)
+            hx[prev, :, 0] = dx[prev]
+            hr[prev, :, 0] = dr[prev]
+            hx[reset] = 0.0
+            hr[reset] = 0.0
+            act = prev & ~reset
+            if np.any(act):
+                # Коэффициенты смешивания: min |r - hr @ gamma|
+                gamma = (np.linalg.pinv(hr[act]) @ r[act][..., None])[..., 0]
+                x_new[act] = x[act] + r[act] - ((hx[act] + hr[act]) @ gamma[..., None])[..., 0]
+            self.dx[rows] = hx
+            self.dr[rows] = hr
+        bad = ~np.all(np.isfinite(x_new), axis=1)
+        x_new[bad] = g[bad]
+        self.x[rows] = x
+        self.r[rows] = r
+        self.count[rows] = np.where(reset, 0, self.count[rows] + 1)
+        return x_new
+
@@ -0,0 +1,134 @@
+import os
+import numpy as np
+import pandas as pd
+from Solution import STATUS, Trace
+
+
+FRAME_COLUMNS = ['element', 'combo', 'N', 'Mx', 'My']  # Столбцы усилий в стержневых КЭ
+SHELL_COLUMNS = ['element', 'combo', 'Nxx', 'Nyy', 'Nxy', 'Mxx', 'Myy', 'Mxy']  # Столбцы усилий в КЭ оболочек
+
+
+def read_forces(path, columns, chunksize=100000):
+    """
+    Потоковое чтение усилий в элементах из файла CSV или Parquet.
+
+    :param path: Путь к файлу (.csv или .parquet)
+    :param columns: Список читаемых столбцов
+    :param chunksize: Количество строк в блоке
+    :return: Генератор блоков усилий (pandas.DataFrame)
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.parquet', '.pq'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Для чтения файлов Parquet требуется пакет pyarrow") from e
+        pf = pq.ParquetFile(path)
+        for batch in pf.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize):
+            yield chunk[columns]
+
+
+def frame_results(sections, chunks, kt, gb3, acc, method='secant'):
+    """
+    Потоковый расчет сечений стержневых КЭ.
+
+    :param sections: Сечение (FrameSec) для всех элементов или словарь: имя элемента -> сечение
+    :param chunks: Блоки усилий со столбцами FRAME_COLUMNS, кН и кН*м
+    :param kt: Коэффициент учета растяжения бетона
+    :param gb3: Коэффициент gb3 бетона
+    :param acc: Точность расчета
+    :param method: Метод расчета: 'secant' - секущий модуль, 'newton' - касательный модуль
+    :return: Генератор блоков результатов (pandas.DataFrame)
+    """
+    for chunk in chunks:
+        f = chunk[FRAME_COLUMNS[2:]].to_numpy(dtype=float) / 1000
+        u = np.zeros((len(chunk), 3))
+        it = np.zeros(len(chunk), dtype=int)
+        status = np.zeros(len(chunk), dtype=int)
+        trace = Trace(len(chunk))
+        groups = {}  # Номера строк блока по сечениям
+        for i, name in enumerate(chunk['element']):
+            fs = sections[name] if isinstance(sections, dict) else sections
+            groups.setdefault(id(fs), (fs, []))[1].append(i)
+        for fs, rows in groups.values():
+            rows = np.array(rows)
+            u[rows], it[rows] = fs.iterate(f[rows], kt, gb3, acc, method)
+            status[rows] = fs.status
+            trace.extend(rows, fs.trace)
+        res = chunk[FRAME_COLUMNS[:2]].reset_index(drop=True)
+        res[['u0', 'u1', 'u2']] = u
+        res['it'] = it
+        res['status'] = np.array(STATUS)[status]
+        summary = trace.summary()
+        res['residual'] = summary['residual']
+        res['branch'] = summary['branch']
+        yield res
+
+
+def shell_results(shells, chunks, kt, gb3, v, acc):
+    """
+    Потоковый расчет элементов оболочки.
+
+    Элементы каждого блока группируются по армированию и рассчитываются пакетами.
+
+    :param shells: Элемент оболочки (ShellElem) для всех элементов или словарь: имя элемента -> элемент оболочки
+    :param chunks: Блоки усилий со столбцами SHELL_COLUMNS, кН и кН*м
+    :param kt: Коэффициент учета растяжения бетона
+    :param gb3: Коэффициент gb3 бетона
+    :param v: Коэффициент Пуассона
+    :param acc: Точность расчета
+    :return: Генератор блоков результатов (pandas.DataFrame)
+    """
+    from ShellElement.Batch import Layup, ShellMesh
+
+    layups = {}  # Пакетные расчеты по ключам армирования
+    keys = {}  # Ключи армирования элементов оболочки
+    for chunk in chunks:
+        f = chunk[SHELL_COLUMNS[2:]].to_numpy(dtype=float) / 1000
+        u = np.zeros((len(chunk), 6))
+        it = np.zeros(len(chunk), dtype=int)
+        ok = np.zeros(len(chunk), dtype=bool)
+        status = np.zeros(len(chunk), dtype=int)
+        trace = Trace(len(chunk))
+        groups = {}  # Номера строк блока по ключам армирования
+        for i, name in enumerate(chunk['element']):
+            shell = shells[name] if isinstance(shells, dict) else shells
+            if id(shell) not in keys:
+                keys[id(shell)] = ShellMesh.layup_key(shell)
+                if keys[id(shell)] not in layups:
+                    layups[keys[id(shell)]] = Layup(shell, kt, gb3, v)
+            groups.setdefault(keys[id(shell)], []).append(i)
+        for key, rows in groups.items():
+            rows = np.array(rows)
+            u[rows], it[rows], ok[rows] = layups[key].solve(f[rows], acc)
+            status[rows] = layups[key].status
+            trace.extend(rows, layups[key].trace)
+        res = chunk[SHELL_COLUMNS[:2]].reset_index(drop=True)
+        res[['u0', 'u1', 'u2', 'u3', 'u4', 'u5']] = u
+        res['it'] = it
+        res['ok'] = ok
+        res['status'] = np.array(STATUS)[status]
+        summary = trace.summary()
+        res['residual'] = summary['residual']
+        res['branch'] = summary['branch']
+        yield res
+
+
+def write_results(results, path):
+    """
+    Потоковая запись результатов в файл CSV.
+
+    :param results: Генератор блоков результатов
+    :param path: Путь к файлу
+    :return: Количество записанных строк
+    """
+    n = 0
+    header = True
+    for res in results:
+        res.to_csv(path, mode='w' if header else 'a', header=header, index=False)
+        header = False
+        n += len(res)
+    return n
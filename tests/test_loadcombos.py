@@ -0,0 +1,81 @@
+# Регрессионные тесты отсечения комбинаций нагрузок по выпуклой оболочке
+import itertools
+import os
+import numpy as np
+import pytest
+import LoadCombos
+import Materials as Mtr
+import Solution
+
+DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'materials.db')
+
+
+def test_nnls_optimality():
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        a = rng.normal(size=(8, 5))
+        b = rng.normal(size=8)
+        x, res = LoadCombos.nnls(a, b)
+        w = a.T @ (b - a @ x)  # Антиградиент
+        assert np.all(x >= 0)
+        assert np.all(w <= 1e-9)
+        assert np.allclose(w[x > 0], 0.0, atol=1e-9)
+        assert res == pytest.approx(np.linalg.norm(a @ x - b))
+
+
+def test_nnls_exact():
+    rng = np.random.default_rng(2)
+    a = rng.normal(size=(6, 4))
+    x0 = np.array([0.5, 0.0, 2.0, 1.0])
+    x, res = LoadCombos.nnls(a, a @ x0)
+    assert np.allclose(x, x0)
+    assert res < 1e-10
+
+
+def test_inside_cube():
+    cube = np.array(list(itertools.product((-1.0, 1.0), repeat=3)))
+    points = np.array([[0.0, 0.0, 0.0], [0.9, -0.9, 0.5], [1.0, 1.0, 1.0], [1.1, 0.0, 0.0], [0.0, 0.0, -2.0]])
+    assert list(LoadCombos.inside(points, cube)) == [True, True, True, False, False]
+    assert not np.any(LoadCombos.inside(points, np.zeros((0, 3))))
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_hull_contains_all_points(seed):
+    rng = np.random.default_rng(seed)
+    points = rng.normal(size=(300, 3)) * [1000.0, 50.0, 5.0]  # Разные масштабы компонент
+    vert = LoadCombos.hull(points, directions=200)
+    assert 3 < np.count_nonzero(vert) < len(points)
+    assert np.all(LoadCombos.inside(points[~vert], points[vert]))
+
+
+def test_prune_ellipsoid():
+    rng = np.random.default_rng(3)
+    f = rng.normal(size=(400, 3))
+
+    def check(x):
+        return np.sum((x / [3.0, 2.0, 1.5]) ** 2, axis=1) <= 1.0
+
+    for level in (0.5, 1.0, 2.0):
+        ok, done = LoadCombos.prune(f * level, check)
+        assert np.array_equal(ok, check(f * level))
+        assert np.all(done[~ok])
+
+
+@pytest.mark.parametrize('level', (1.0, 1.5, 2.0))
+def test_prune_frame_section(level):
+    import Benchmarks
+    from MemberSection import LoadPath
+
+    concrete, steel = Mtr.tables(DB)
+    rect = Benchmarks.frame_section(concrete, steel, 10, 8, 4, 60)
+    f = rect.forces() * level
+    limit = LoadPath.limits(rect, 0, 1)
+
+    def check(x):
+        u, it = rect.iterate(x, 0, 1, 1e-7)
+        return (rect.status == Solution.CONVERGED) & limit(u)
+
+    ok, done = LoadCombos.prune(f, check)
+    assert np.array_equal(ok, check(f))
+    assert np.all(done[~ok])
+    assert not np.all(done)